@@ -172,7 +172,7 @@ class PageableDeviceComponent(DeviceComponent):
         page = pages[self._page_index[self._bank_index]]
         raise len(page) >= len(self._parameter_controls) or AssertionError
         for index in range(len(self._parameter_controls)):
-            parameter = get_parameter_by_name(self._device, page[index])
+            parameter = self._parameter_bank_cache.parameter_by_name(self._device, page[index])
             if parameter != None:
                 self._parameter_controls[index].connect_to(parameter)
             else:
@@ -204,7 +204,7 @@ class PageableDeviceComponent(DeviceComponent):
                 self._bank_name = 'Bank ' + str(self._bank_index + 1)
             raise len(bank) >= len(self._parameter_controls) or AssertionError
             for index in range(len(self._parameter_controls)):
-                parameter = get_parameter_by_name(self._device, bank[index])
+                parameter = self._parameter_bank_cache.parameter_by_name(self._device, bank[index])
                 if parameter != None:
                     self._parameter_controls[index].connect_to(parameter)
                 else:
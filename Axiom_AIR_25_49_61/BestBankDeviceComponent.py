@@ -1,6 +1,6 @@
 #Embedded file name: /Users/versonator/Jenkins/live/Binary/Core_Release_64_static/midi-remote-scripts/Axiom_AIR_25_49_61/BestBankDeviceComponent.py
 from _Framework.DeviceComponent import DeviceComponent
-from _Generic.Devices import parameter_bank_names, parameter_banks, DEVICE_DICT, BANK_NAME_DICT, DEVICE_BOB_DICT
+from _Generic.Devices import parameter_bank_names, parameter_banks, DEVICE_DICT, BANK_NAME_DICT, DEVICE_BOB_DICT, ParameterBankCache
 BOP_BANK_NAME = 'Best of Parameters'
 
 class BestBankDeviceComponent(DeviceComponent):
@@ -22,6 +22,7 @@ class BestBankDeviceComponent(DeviceComponent):
 
         self._device_banks = new_banks
         self._device_bank_names = new_bank_names
+        self._parameter_bank_cache = ParameterBankCache(self._device_banks)
 
     def set_parameter_controls(self, controls):
         if self._parameter_controls != None:
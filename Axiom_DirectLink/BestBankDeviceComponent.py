@@ -2,7 +2,7 @@
 import Live
 from _Framework.DeviceComponent import DeviceComponent
 from _Framework.DisplayDataSource import DisplayDataSource
-from _Generic.Devices import parameter_bank_names, parameter_banks, DEVICE_DICT, BANK_NAME_DICT, DEVICE_BOB_DICT
+from _Generic.Devices import parameter_bank_names, parameter_banks, DEVICE_DICT, BANK_NAME_DICT, DEVICE_BOB_DICT, ParameterBankCache
 BOP_BANK_NAME = 'Best of Parameters'
 
 class BestBankDeviceComponent(DeviceComponent):
@@ -25,6 +25,7 @@ class BestBankDeviceComponent(DeviceComponent):
 
         self._device_banks = new_banks
         self._device_bank_names = new_bank_names
+        self._parameter_bank_cache = ParameterBankCache(self._device_banks)
         self._bank_name_data_source = DisplayDataSource()
 
     def disconnect(self):
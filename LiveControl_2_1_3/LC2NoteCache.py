@@ -0,0 +1,108 @@
+#Embedded file name: /Applications/Ableton Live 9 Suite.app/Contents/App-Resources/MIDI Remote Scripts/LiveControl_2_13/LC2NoteCache.py
+
+def _bisect(times, time, right):
+    lo = 0
+    hi = len(times)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if times[mid] < time or right and times[mid] == time:
+            lo = mid + 1
+        else:
+            hi = mid
+
+    return lo
+
+
+class LC2NoteCache:
+    """ The notes of the sequenced clip as [pitch, time, length, velocity, mute]
+        lists, in the order they were added, and indexed by pitch and time so
+        that the notes of a pitch within a time range are found without looking
+        at all notes. Notes whose pitch or time are changed in place need to be
+        reindexed. """
+
+    def __init__(self, notes = ()):
+        self._notes = []
+        self._times = {}
+        self._by_pitch = {}
+        self.extend(notes)
+
+    def __iter__(self):
+        return iter(self._notes)
+
+    def __len__(self):
+        return len(self._notes)
+
+    def extend(self, notes):
+        for note in notes:
+            self._notes.append(note)
+            self._index(note)
+
+    def pitches(self):
+        return sorted(self._by_pitch.keys())
+
+    def notes_with_pitch(self, pitch):
+        return list(self._by_pitch.get(pitch, []))
+
+    def notes_in_range(self, pitch, start, end):
+        """ Returns the notes of the pitch with start <= time < end, sorted by time """
+        if pitch not in self._by_pitch:
+            return []
+        times = self._times[pitch]
+        return self._by_pitch[pitch][_bisect(times, start, False):_bisect(times, end, False)]
+
+    def notes_at(self, pitch, time):
+        if pitch not in self._by_pitch:
+            return []
+        times = self._times[pitch]
+        return self._by_pitch[pitch][_bisect(times, time, False):_bisect(times, time, True)]
+
+    def remove_range(self, pitch, start, end):
+        """ Removes the notes of the pitch with start <= time < end and returns them """
+        removed = self.notes_in_range(pitch, start, end)
+        if removed:
+            for note in removed:
+                self._unindex(note)
+
+            ids = set([ id(note) for note in removed ])
+            self._notes = [ note for note in self._notes if id(note) not in ids ]
+        return removed
+
+    def set_param(self, note, param, value):
+        """ Changes the given parameter of a note of the cache """
+        if param < 2:
+            self._unindex(note)
+            note[param] = value
+            self._index(note)
+        else:
+            note[param] = value
+
+    def reindex(self):
+        """ To be called after changing the pitch or time of notes in place """
+        self._times = {}
+        self._by_pitch = {}
+        for note in self._notes:
+            self._index(note)
+
+    def _index(self, note):
+        pitch = note[0]
+        if pitch not in self._by_pitch:
+            self._times[pitch] = []
+            self._by_pitch[pitch] = []
+        times = self._times[pitch]
+        index = _bisect(times, note[1], True)
+        times.insert(index, note[1])
+        self._by_pitch[pitch].insert(index, note)
+
+    def _unindex(self, note):
+        pitch = note[0]
+        times = self._times[pitch]
+        notes = self._by_pitch[pitch]
+        index = _bisect(times, note[1], False)
+        while notes[index] is not note:
+            index += 1
+
+        del times[index]
+        del notes[index]
+        if not notes:
+            del self._times[pitch]
+            del self._by_pitch[pitch]
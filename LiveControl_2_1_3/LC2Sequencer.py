@@ -1,8 +1,10 @@
 #Embedded file name: /Applications/Ableton Live 9 Suite.app/Contents/App-Resources/MIDI Remote Scripts/LiveControl_2_13/LC2Sequencer.py
 from _Framework.ControlSurfaceComponent import ControlSurfaceComponent
 from LC2Sysex import LC2Sysex, LC2SysexParser
+from LC2NoteCache import LC2NoteCache
 import random
 import math
+NOTE_TIME_EPSILON = 1e-05
 
 class LC2Sequencer(ControlSurfaceComponent):
 
@@ -11,7 +13,7 @@ class LC2Sequencer(ControlSurfaceComponent):
         self._register_timer_callback(self._on_timer)
         self._refresh = 0
         self._clip = None
-        self._note_cache = []
+        self._note_cache = LC2NoteCache()
         self._last_note = 36
         self._last_pos = 0
         self._quantisation = 0.25
@@ -131,12 +133,8 @@ class LC2Sequencer(ControlSurfaceComponent):
         sysex.send()
         self._cache_notes()
         if self._clip is not None:
-            min = 128
-            for note in self._note_cache:
-                if note[0] < min:
-                    min = note[0]
-
-            self._note_offset = len(self._note_cache) == 0 and 36 or min
+            pitches = self._note_cache.pitches()
+            self._note_offset = len(pitches) == 0 and 36 or pitches[0]
         self._fold_notes = 0
         self._save_note = 0
         self._send_offsets()
@@ -156,16 +154,16 @@ class LC2Sequencer(ControlSurfaceComponent):
         if self._clip is not None:
             self._clip.select_all_notes()
             self._mutes = [ 0 for i in range(127) ]
-            for n in self._clip.get_selected_notes():
-                self._note_cache.append(list(n))
+            notes = [ list(n) for n in self._clip.get_selected_notes() ]
+            for n in notes:
                 if not self._mutes[n[0]]:
                     if n[4] == True:
                         self._mutes[n[0]] = 1
 
-            self._note_cache = [ list(n) for n in self._clip.get_selected_notes() ]
+            self._note_cache = LC2NoteCache(notes)
             self._clip.deselect_all_notes()
         else:
-            self._note_cache = []
+            self._note_cache = LC2NoteCache()
 
     def handle_sysex(self, sysex):
         cmds = [self._note_press,
@@ -289,13 +287,14 @@ class LC2Sequencer(ControlSurfaceComponent):
         return [selection, remainder]
 
     def _in_selection(self, pos, pitch):
-        sel, rem = self._get_selection()
+        time_lower = self._pos(self._selection[2])
+        time_upper = self._pos(self._selection[3])
+        pitch_upper = self._note(self._selection[0])
+        pitch_lower = self._note(self._selection[1])
         found = 0
-        for note in sel:
-            if pos == note[1] and pitch == note[0]:
+        if pitch >= pitch_lower and pitch <= pitch_upper and pos >= time_lower and pos <= time_upper:
+            if self._note_cache.notes_at(pitch, pos):
                 found = 1
-                break
-
         return found
 
     def _arpeggiate(self, args):
@@ -362,6 +361,7 @@ class LC2Sequencer(ControlSurfaceComponent):
         for note in selection:
             note[1] = self._pos(self._step(note[1]) + dire)
 
+        self._note_cache.reindex()
         self._clip.select_all_notes()
         self._clip.replace_selected_notes(tuple(selection + left))
         self._selection[2] += dire
@@ -378,6 +378,7 @@ class LC2Sequencer(ControlSurfaceComponent):
                 note[0] = self._note(id + pitch)
                 LC2Sysex.log_message('new ' + str(note[0]) + ' ' + str(id))
 
+            self._note_cache.reindex()
             self._clip.select_all_notes()
             self._clip.replace_selected_notes(tuple(selection + left))
             self._selection[0] += pitch
@@ -401,6 +402,7 @@ class LC2Sequencer(ControlSurfaceComponent):
                 note[2] = note[2] * 0.5
             LC2Sysex.log_message('after: ' + str(note))
 
+        self._note_cache.reindex()
         self._clip.select_all_notes()
         self._clip.replace_selected_notes(tuple(sel + rem))
 
@@ -428,6 +430,7 @@ class LC2Sequencer(ControlSurfaceComponent):
                     new_step = cs + (cs - self._note_step(note[0]))
                     note[0] = self._note(int(new_step))
 
+                self._note_cache.reindex()
                 self._clip.select_all_notes()
                 self._clip.replace_selected_notes(tuple(sel + rem))
         else:
@@ -443,6 +446,7 @@ class LC2Sequencer(ControlSurfaceComponent):
             for note in sel:
                 note[1] = centre + (centre - note[1])
 
+            self._note_cache.reindex()
             LC2Sysex.log_message('cent' + str(centre) + ' ' + str(min) + ' ' + str(max))
             self._clip.select_all_notes()
             self._clip.replace_selected_notes(tuple(sel + rem))
@@ -461,6 +465,7 @@ class LC2Sequencer(ControlSurfaceComponent):
             for i, note in enumerate(group):
                 note[1] += pow(i, 2) * offset
 
+        self._note_cache.reindex()
         self._clip.select_all_notes()
         self._clip.replace_selected_notes(tuple(sel + rem))
 
@@ -471,6 +476,7 @@ class LC2Sequencer(ControlSurfaceComponent):
             if int(random.random() * 127) > 127 - args[0]:
                 n[1] = self._pos(int(random.random() * (self._selection[3] - self._selection[2])) + self._selection[2])
 
+        self._note_cache.reindex()
         self._clip.select_all_notes()
         self._clip.replace_selected_notes(tuple(sel + rem))
 
@@ -495,12 +501,7 @@ class LC2Sequencer(ControlSurfaceComponent):
         self.update()
 
     def _get_last_notes(self):
-        notes = []
-        for note in self._note_cache:
-            if note[0] == self._last_note:
-                notes.append(note)
-
-        return notes
+        return self._note_cache.notes_with_pitch(self._last_note)
 
     def _set_quick_chord(self, sysex):
         self._quick_chord = sysex.parse('b')
@@ -554,16 +555,12 @@ class LC2Sequencer(ControlSurfaceComponent):
         y, state = sysex.parse('bb')
         pitch = self._note(y)
         self._mutes[pitch] = state
-        found = 0
-        for note in self._note_cache:
-            if note[0] == pitch:
-                found = 1
-                note[4] = bool(state)
+        notes = self._note_cache.notes_with_pitch(pitch)
+        for note in notes:
+            note[4] = bool(state)
 
-        if found:
-            self._clip.select_all_notes()
-            self._clip.replace_selected_notes(tuple(self._note_cache))
-            self._clip.deselect_all_notes()
+        if notes:
+            self._write_notes(pitch, notes[0][1], notes[-1][1] - notes[0][1] + NOTE_TIME_EPSILON, notes)
 
     def _note_press(self, sysex):
         x, y = sysex.parse('bb')
@@ -571,10 +568,9 @@ class LC2Sequencer(ControlSurfaceComponent):
         pos2 = self._pos(x + 1)
         pitch = self._note(y)
         found = 0
-        for note in self._note_cache:
-            if note[1] >= pos and note[1] < pos2 and note[0] == pitch:
-                LC2Sysex.log_message(str(note[1]) + ' ' + str(pos) + ' ' + str(pos2))
-                found = 1
+        for note in self._note_cache.notes_in_range(pitch, pos, pos2):
+            LC2Sysex.log_message(str(note[1]) + ' ' + str(pos) + ' ' + str(pos2))
+            found = 1
 
         if found:
             self.rem_note(pos, pos2, pitch)
@@ -664,16 +660,10 @@ class LC2Sequencer(ControlSurfaceComponent):
 
     def rem_note(self, pos, pos2, pitch):
         if self._clip is not None:
-            new_notes = []
-            for nt in self._note_cache:
-                self._last_details = nt[0] == pitch and nt[1] >= pos and nt[1] < pos2 and nt
-                continue
-                new_notes.append(nt)
-
-            self._clip.select_all_notes()
-            self._clip.replace_selected_notes(tuple(new_notes))
-            self._clip.deselect_all_notes()
-            self._note_cache = new_notes
+            removed = self._note_cache.remove_range(pitch, pos, pos2)
+            if removed:
+                self._last_details = removed[-1]
+            self._write_notes(pitch, pos, pos2 - pos, ())
             if len(self._note_keys()) == 0:
                 self._fold_notes = 0
             self.update()
@@ -681,14 +671,18 @@ class LC2Sequencer(ControlSurfaceComponent):
     def update(self):
         array = [ 0 for i in range(self._height) ]
         array_l = [ 0 for i in range(self._height) ]
-        for note in self._note_cache:
-            step = self._step(note[1])
-            nstep = self._note_step(note[0])
-            if step in range(16) and nstep in range(self._height):
-                array[self._height - 1 - nstep] |= 1 << step
-                last = self._step(note[1] + note[2])
-                for j in range(step + 1, min(last, 16)):
-                    array_l[self._height - 1 - nstep] |= 1 << j
+        window_start = self._pos(-2)
+        window_end = self._pos(17)
+        for pitch in self._note_cache.pitches():
+            nstep = self._note_step(pitch)
+            if nstep in range(self._height):
+                for note in self._note_cache.notes_in_range(pitch, window_start, window_end):
+                    step = self._step(note[1])
+                    if step in range(16):
+                        array[self._height - 1 - nstep] |= 1 << step
+                        last = self._step(note[1] + note[2])
+                        for j in range(step + 1, min(last, 16)):
+                            array_l[self._height - 1 - nstep] |= 1 << j
 
         sysex = LC2Sysex('STEPS')
         for b in array:
@@ -702,8 +696,9 @@ class LC2Sequencer(ControlSurfaceComponent):
         sysex.send()
         sysex = LC2Sysex('SEQ_FADERS')
         states = 0
+        faders = self._get_faders()
         for i in range(16):
-            fad = self._get_fader(i)[0]
+            fad = faders[i][0]
             if fad == -1:
                 sysex.byte(0)
             else:
@@ -752,19 +747,30 @@ class LC2Sequencer(ControlSurfaceComponent):
     def _get_fader(self, step):
         val = -1
         pos = -1
-        for note in self._note_cache:
-            if note[0] == self._last_note:
-                if self._step(note[1]) == step:
-                    pos = note[1]
-                    if self._fader_type == 0:
-                        val = note[3]
-                    elif self._fader_type == 1:
-                        val = int(round(self._nearest(self._durations, note[2]) * 15.875, 0))
-                    else:
-                        val = int(note[1] % self._quantisation / self._quantisation * 127)
+        for note in self._note_cache.notes_in_range(self._last_note, self._pos(step - 1), self._pos(step + 2)):
+            if self._step(note[1]) == step:
+                pos = note[1]
+                val = self._fader_value(note)
 
         return [val, pos]
 
+    def _get_faders(self):
+        faders = [ [-1, -1] for i in range(16) ]
+        for note in self._note_cache.notes_in_range(self._last_note, self._pos(-2), self._pos(17)):
+            step = self._step(note[1])
+            if step in range(16):
+                faders[step] = [self._fader_value(note), note[1]]
+
+        return faders
+
+    def _fader_value(self, note):
+        if self._fader_type == 0:
+            return note[3]
+        elif self._fader_type == 1:
+            return int(round(self._nearest(self._durations, note[2]) * 15.875, 0))
+        else:
+            return int(note[1] % self._quantisation / self._quantisation * 127)
+
     def _nearest(self, list, val):
         for i, v in enumerate(list):
             if val <= v:
@@ -812,7 +818,7 @@ class LC2Sequencer(ControlSurfaceComponent):
 
     def _note_keys(self):
         if self._fold_notes == 1:
-            return sorted(dict(([note[0], 1] for note in self._note_cache)).keys())
+            return self._note_cache.pitches()
         else:
             return [ self._note(i) for i in range(self._height) ]
 
@@ -828,16 +834,22 @@ class LC2Sequencer(ControlSurfaceComponent):
                 self._last_pos = step
 
     def _set_note_param(self, pitch, start, param, val):
-        found = 0
-        for note in self._note_cache:
-            if note[0] == pitch and note[1] == start:
-                note[param] = val
-                self._clip.select_all_notes()
-                self._clip.replace_selected_notes(tuple(self._note_cache))
-                self._clip.deselect_all_notes()
-                found = 1
-
-        return found
+        notes = self._note_cache.notes_at(pitch, start)
+        for note in notes:
+            self._note_cache.set_param(note, param, val)
+
+        if notes:
+            self._write_notes(pitch, start, NOTE_TIME_EPSILON, notes)
+        return len(notes) > 0 and 1 or 0
+
+    def _write_notes(self, pitch, time, time_span, notes):
+        """ Replaces the notes of the pitch starting within the time span in the clip
+            with the given ones, leaving the other notes of the clip alone """
+        self._clip.remove_notes(time, pitch, time_span, 1)
+        self._clip.deselect_all_notes()
+        if notes:
+            self._clip.replace_selected_notes(tuple(notes))
+            self._clip.deselect_all_notes()
 
     def _get_timeline(self):
         sysex = LC2Sysex('SEQ_TIMELINE')
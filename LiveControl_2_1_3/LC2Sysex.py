@@ -39,6 +39,7 @@ class LC2Sysex:
     TEMPO = [5, 1]
     TIME = [5, 0]
     RESET = [5, 2]
+    _templates = {}
 
     @staticmethod
     def l9():
@@ -59,25 +60,37 @@ class LC2Sysex:
         LC2Sysex.log_message = None
         LC2Sysex._midi_callback = None
 
+    @staticmethod
+    def _template(type):
+        """ Returns the start of every message of the given type """
+        template = LC2Sysex._templates.get(type)
+        if template is None:
+            template = bytearray([240] + getattr(LC2Sysex, type))
+            LC2Sysex._templates[type] = template
+        return template
+
     def __init__(self, type):
-        self._msg = [240] + getattr(self, type)
+        self._msg = bytearray(LC2Sysex._template(type))
+        self._valid = True
 
     def msg(self):
-        return tuple(self._msg + [247])
+        return tuple(self._msg) + (247,)
 
     def int(self, int):
-        self._msg += [int >> 7 & 127, int & 127]
+        msg = self._msg
+        msg.append(int >> 7 & 127)
+        msg.append(int & 127)
 
     def int2(self, int):
-        b1 = int >> 14 & 127
-        b2 = int >> 7 & 127
-        b3 = int & 127
-        self._msg += [b1, b2, b3]
+        msg = self._msg
+        msg.append(int >> 14 & 127)
+        msg.append(int >> 7 & 127)
+        msg.append(int & 127)
 
     def ascii(self, string):
-        self._msg += [ ord(c) for c in string if not (ord(c) > 127 and 32) ]
+        self._msg.extend([ ord(c) for c in string if not (ord(c) > 127 and 32) ])
         if len(string) == 0:
-            self._msg += [0]
+            self._msg.append(0)
         self._msg.append(127)
 
     def trim(self, display_string, length):
@@ -100,6 +113,10 @@ class LC2Sysex:
         self.ascii(display_string[0:length])
 
     def byte(self, byte):
+        byte = int(byte)
+        if byte < 0 or byte > 127:
+            self._valid = False
+            byte &= 127
         self._msg.append(byte)
 
     def bool(self, val):
@@ -109,24 +126,19 @@ class LC2Sysex:
             self._msg.append(0)
 
     def rgb(self, rgb, inv = 0):
-        byte1 = rgb >> 21 & 127
-        byte2 = rgb >> 14 & 127
-        byte3 = rgb >> 7 & 127
-        byte4 = rgb & 127
-        self._msg += [byte1,
-         byte2,
-         byte3,
-         byte4]
+        msg = self._msg
+        msg.append(rgb >> 21 & 127)
+        msg.append(rgb >> 14 & 127)
+        msg.append(rgb >> 7 & 127)
+        msg.append(rgb & 127)
 
     def send(self):
         if self._midi_callback is not None:
-            valid = True
-            if max(self.msg()[1:-2]) > 127:
-                valid = False
-            if valid:
-                self._midi_callback(self.msg())
+            msg = self.msg()
+            if self._valid:
+                self._midi_callback(msg)
             else:
-                self.log_message('INVALID SYSEX MESSAGE' + str(self.msg()))
+                self.log_message('INVALID SYSEX MESSAGE' + str(msg))
 
 
 class LC2SysexParser:
@@ -146,15 +158,17 @@ class LC2SysexParser:
         else:
             return 0
 
+    _sysex_types = {'b': (_byte, 1),
+     'i': (_int, 2)}
+
     def parse(self, types):
         out = []
         i = 0
-        sysex_types = {'b': [self._byte, 1],
-         'i': [self._int, 2]}
+        sysex_types = self._sysex_types
         for c in types:
             if c in sysex_types:
                 fn, size = sysex_types[c]
-                out.append(fn(i))
+                out.append(fn(self, i))
                 i += size
 
         return len(out) > 1 and out or out[0]
\ No newline at end of file
@@ -17,7 +17,7 @@ class ChannelStrip(MackieControlComponent):
         self.__v_pot_display_mode = VPOT_DISPLAY_SINGLE_DOT
         self.__fader_parameter = None
         self.__meters_enabled = False
-        self.__last_meter_value = -1
+        self.__meter_engine = main_script.meter_engine()
         self.__send_meter_mode()
         self.__within_track_added_or_deleted = False
         self.__within_destroy = False
@@ -29,6 +29,7 @@ class ChannelStrip(MackieControlComponent):
             self.__remove_listeners()
         self.__assigned_track = None
         self.send_midi((208, 0 + (self.__strip_index << 4)))
+        self.__meter_engine.forget_meter_level(self.__strip_index, 0)
         self.__meters_enabled = False
         self.__send_meter_mode()
         self.refresh_state()
@@ -159,7 +160,6 @@ class ChannelStrip(MackieControlComponent):
         self.__update_arm_led()
         if not self.__within_destroy and self.__assigned_track != None:
             self.__send_meter_mode()
-            self.__last_meter_value = -1
         if not self.__assigned_track:
             self.reset_fader()
             self.unlight_vpot_leds()
@@ -173,10 +173,7 @@ class ChannelStrip(MackieControlComponent):
                     meter_value = self.__assigned_track.output_meter_level
             else:
                 meter_value = 0.0
-            meter_byte = int(meter_value * 12.0) + (self.__strip_index << 4)
-            if self.__last_meter_value != meter_value or meter_value != 0.0:
-                self.__last_meter_value = meter_value
-                self.send_midi((208, meter_byte))
+            self.__meter_engine.report_meter_value(self.__strip_index, meter_value)
 
     def build_midi_map(self, midi_map_handle):
         needs_takeover = False
@@ -254,6 +251,7 @@ class ChannelStrip(MackieControlComponent):
          self.__strip_index,
          mode,
          247))
+        self.__meter_engine.forget_meter_level(self.__strip_index)
 
     def __toggle_arm_track(self, exclusive):
         if self.__assigned_track and self.__assigned_track.can_be_armed:
@@ -55,6 +55,7 @@ class ChannelStripController(MackieControlComponent):
         self.__plugin_mode_offsets = [ 0 for x in range(PCM_NUMMODES) ]
         self.__chosen_plugin = None
         self.__ordered_plugin_parameters = []
+        self.__parameter_bank_cache = ParameterBankCache()
         self.__displayed_plugins = []
         self.__last_attached_selected_track = None
         self.__send_mode_offset = 0
@@ -849,13 +850,13 @@ class ChannelStripController(MackieControlComponent):
 
     def __reorder_parameters(self):
         result = []
+        self.__parameter_bank_cache.invalidate()
         if self.__chosen_plugin:
             if self.__chosen_plugin.class_name in DEVICE_DICT.keys():
                 device_banks = DEVICE_DICT[self.__chosen_plugin.class_name]
-                for bank in device_banks:
-                    for param_name in bank:
+                for bank_index in range(len(device_banks)):
+                    for parameter in self.__parameter_bank_cache.parameter_bank(self.__chosen_plugin, bank_index):
                         parameter_name = ''
-                        parameter = get_parameter_by_name(self.__chosen_plugin, param_name)
                         if parameter:
                             parameter_name = parameter.name
                         result.append((parameter, parameter_name))
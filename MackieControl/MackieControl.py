@@ -5,8 +5,10 @@ from MainDisplayController import MainDisplayController
 from TimeDisplay import TimeDisplay
 from ChannelStrip import ChannelStrip, MasterChannelStrip
 from ChannelStripController import ChannelStripController
+from MeterEngine import MeterEngine
 from SoftwareController import SoftwareController
 from Transport import Transport
+from functools import partial
 import Live
 import MidiRemoteScript
 
@@ -32,6 +34,7 @@ class MackieControl:
         self.__components.append(self.__software_controller)
         self.__transport = Transport(self)
         self.__components.append(self.__transport)
+        self.__meter_engine = MeterEngine(self)
         self.__channel_strips = [ ChannelStrip(self, i) for i in range(NUM_CHANNEL_STRIPS) ]
         for s in self.__channel_strips:
             self.__components.append(s)
@@ -40,13 +43,49 @@ class MackieControl:
         self.__components.append(self.__master_strip)
         self.__channel_strip_controller = ChannelStripController(self, self.__channel_strips, self.__master_strip, self.__main_display_controller)
         self.__components.append(self.__channel_strip_controller)
+        self.__components.append(self.__meter_engine)
         self.__shift_is_pressed = False
         self.__option_is_pressed = False
-        self.__ctrl_is_pressed = False
+        self.__control_is_pressed = False
         self.__alt_is_pressed = False
         self.is_pro_version = False
         self._received_firmware_version = False
         self._refresh_state_next_time = 0
+        self.__build_midi_handler_tables()
+
+    def __build_midi_handler_tables(self):
+        """ Maps every note and CC number to the handlers that are interested in it,
+            so that receive_midi neither has to search the switch id lists nor ask
+            every channel strip whether a message is meant for it
+        """
+        note_handlers = [ [] for i in range(128) ]
+
+        def add_note_handler(switch_ids, handler):
+            for i in switch_ids:
+                note_handlers[i].append(handler)
+
+        add_note_handler(display_switch_ids, self.__handle_display_switch_ids)
+        for i, s in enumerate(self.__channel_strips):
+            add_note_handler((SID_RECORD_ARM_BASE + i,
+             SID_SOLO_BASE + i,
+             SID_MUTE_BASE + i,
+             SID_SELECT_BASE + i,
+             SID_VPOD_PUSH_BASE + i,
+             SID_FADER_TOUCH_SENSE_BASE + i), s.handle_channel_strip_switch_ids)
+
+        add_note_handler(channel_strip_control_switch_ids, self.__channel_strip_controller.handle_assignment_switch_ids)
+        add_note_handler(function_key_control_switch_ids, self.__software_controller.handle_function_key_switch_ids)
+        add_note_handler(software_controls_switch_ids, self.__software_controller.handle_software_controls_switch_ids)
+        add_note_handler(transport_control_switch_ids, self.__transport.handle_transport_switch_ids)
+        add_note_handler(marker_control_switch_ids, self.__transport.handle_marker_switch_ids)
+        add_note_handler(jog_wheel_switch_ids, self.__transport.handle_jog_wheel_switch_ids)
+        self.__note_handlers = tuple([ tuple(h) for h in note_handlers ])
+        cc_handlers = [None] * 128
+        cc_handlers[JOG_WHEEL_CC_NO] = self.__transport.handle_jog_wheel_rotation
+        for i, s in enumerate(self.__channel_strips):
+            cc_handlers[FID_PANNING_BASE + i] = partial(s.handle_vpot_rotation, i)
+
+        self.__cc_handlers = tuple(cc_handlers)
 
     def disconnect(self):
         for c in self.__components:
@@ -111,6 +150,9 @@ class MackieControl:
         self.request_firmware_version()
         self._refresh_state_next_time = 30
 
+    def meter_engine(self):
+        return self.__meter_engine
+
     def is_extension(self):
         return False
 
@@ -155,37 +197,17 @@ class MackieControl:
         self.__c_instance.send_midi(midi_event_bytes)
 
     def receive_midi(self, midi_bytes):
-        if midi_bytes[0] & 240 == NOTE_ON_STATUS or midi_bytes[0] & 240 == NOTE_OFF_STATUS:
+        status = midi_bytes[0] & 240
+        if status == NOTE_ON_STATUS or status == NOTE_OFF_STATUS:
             note = midi_bytes[1]
             value = BUTTON_PRESSED if midi_bytes[2] > 0 else BUTTON_RELEASED
-            if note in range(SID_FIRST, SID_LAST + 1):
-                if note in display_switch_ids:
-                    self.__handle_display_switch_ids(note, value)
-                if note in channel_strip_switch_ids + fader_touch_switch_ids:
-                    for s in self.__channel_strips:
-                        s.handle_channel_strip_switch_ids(note, value)
-
-                if note in channel_strip_control_switch_ids:
-                    self.__channel_strip_controller.handle_assignment_switch_ids(note, value)
-                if note in function_key_control_switch_ids:
-                    self.__software_controller.handle_function_key_switch_ids(note, value)
-                if note in software_controls_switch_ids:
-                    self.__software_controller.handle_software_controls_switch_ids(note, value)
-                if note in transport_control_switch_ids:
-                    self.__transport.handle_transport_switch_ids(note, value)
-                if note in marker_control_switch_ids:
-                    self.__transport.handle_marker_switch_ids(note, value)
-                if note in jog_wheel_switch_ids:
-                    self.__transport.handle_jog_wheel_switch_ids(note, value)
-        elif midi_bytes[0] & 240 == CC_STATUS:
-            cc_no = midi_bytes[1]
-            cc_value = midi_bytes[2]
-            if cc_no == JOG_WHEEL_CC_NO:
-                self.__transport.handle_jog_wheel_rotation(cc_value)
-            elif cc_no in range(FID_PANNING_BASE, FID_PANNING_BASE + NUM_CHANNEL_STRIPS):
-                for s in self.__channel_strips:
-                    s.handle_vpot_rotation(cc_no - FID_PANNING_BASE, cc_value)
+            for handler in self.__note_handlers[note]:
+                handler(note, value)
 
+        elif status == CC_STATUS:
+            handler = self.__cc_handlers[midi_bytes[1]]
+            if handler != None:
+                handler(midi_bytes[2])
         elif midi_bytes[0] == 240 and len(midi_bytes) == 12 and midi_bytes[5] == 20:
             version_bytes = midi_bytes[6:-2]
             major_version = version_bytes[1]
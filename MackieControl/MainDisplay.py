@@ -1,13 +1,22 @@
 #Embedded file name: /Users/versonator/Jenkins/live/Binary/Core_Release_64_static/midi-remote-scripts/MackieControl/MainDisplay.py
 from MackieControlComponent import *
+DISPLAY_SYSEX_OVERHEAD = 8
+SPAN_MERGE_THRESHOLD = DISPLAY_SYSEX_OVERHEAD
 
 class MainDisplay(MackieControlComponent):
     """ Representing one main 2 row display of a Mackie Control or Extension
+    
+        When sending spans, only the runs of characters that changed since
+        the last update are sent, each with its own cursor offset. Runs that
+        are at most SPAN_MERGE_THRESHOLD characters apart are sent as one,
+        as resending the unchanged characters in between is cheaper than the
+        DISPLAY_SYSEX_OVERHEAD bytes of another message.
     """
 
-    def __init__(self, main_script):
+    def __init__(self, main_script, send_spans = True):
         MackieControlComponent.__init__(self, main_script)
         self.__stack_offset = 0
+        self.__send_spans = send_spans
         self.__last_send_messages = [[], []]
 
     def destroy(self):
@@ -39,20 +48,45 @@ class MainDisplay(MackieControlComponent):
             if message_string[i] >= 128:
                 message_string[i] = 0
 
-        if self.__last_send_messages[display_row] != message_string:
+        if self.__send_spans:
+            self.__send_changed_spans(message_string, display_row, offset, cursor_offset)
+        elif self.__last_send_messages[display_row] != message_string:
             self.__last_send_messages[display_row] = message_string
-            if self.main_script().is_extension():
-                device_type = SYSEX_DEVICE_TYPE_XT
-            else:
-                device_type = SYSEX_DEVICE_TYPE
-            display_sysex = (240,
-             0,
-             0,
-             102,
-             device_type,
-             18,
-             offset) + tuple(message_string) + (247,)
-            self.send_midi(display_sysex)
+            self.__send_display_sysex(offset, message_string)
+
+    def __send_changed_spans(self, message_string, display_row, offset, cursor_offset):
+        """ Compares the message with what was last sent at the same place of the
+            row, which is unknown after a refresh, and sends the changed runs
+        """
+        last_line = self.__last_send_messages[display_row]
+        end = cursor_offset + len(message_string)
+        if len(last_line) < end:
+            last_line.extend([None] * (end - len(last_line)))
+        spans = []
+        for index, char in enumerate(message_string):
+            if last_line[cursor_offset + index] != char:
+                if spans and index - spans[-1][1] <= SPAN_MERGE_THRESHOLD:
+                    spans[-1][1] = index + 1
+                else:
+                    spans.append([index, index + 1])
+
+        last_line[cursor_offset:end] = message_string
+        for start, stop in spans:
+            self.__send_display_sysex(offset + start, message_string[start:stop])
+
+    def __send_display_sysex(self, offset, message_string):
+        if self.main_script().is_extension():
+            device_type = SYSEX_DEVICE_TYPE_XT
+        else:
+            device_type = SYSEX_DEVICE_TYPE
+        display_sysex = (240,
+         0,
+         0,
+         102,
+         device_type,
+         18,
+         offset) + tuple(message_string) + (247,)
+        self.send_midi(display_sysex)
 
     def refresh_state(self):
         self.__last_send_messages = [[], []]
@@ -0,0 +1,60 @@
+#Embedded file name: /Users/versonator/Jenkins/live/Binary/Core_Release_64_static/midi-remote-scripts/MackieControl/MeterEngine.py
+from MackieControlComponent import *
+from _Framework.Defaults import TIMER_DELAY
+METER_DECAY_TIME = 0.3
+METER_DECAY_TICKS = int(round(METER_DECAY_TIME / TIMER_DELAY))
+
+class MeterEngine(MackieControlComponent):
+    """Collects the meter levels the channel strips report during a display timer
+       tick and sends the ones that need sending in one batch, after all strips
+       were updated (so the engine must be the last component to be updated).
+       The meters of the Mackie Control fall by one segment every METER_DECAY_TIME
+       (300 ms) on their own, so a level is only sent when it differs from what
+       the device shows by now, assuming it decayed one segment every
+       METER_DECAY_TICKS display timer ticks since the level was last sent.
+       The number of sent and suppressed meter messages is counted in
+       'sent_meter_messages' and 'suppressed_meter_messages'.
+    """
+
+    def __init__(self, main_script):
+        MackieControlComponent.__init__(self, main_script)
+        self.__sent_levels = [-1] * NUM_CHANNEL_STRIPS
+        self.__ticks_since_sent = [0] * NUM_CHANNEL_STRIPS
+        self.__reported_levels = [None] * NUM_CHANNEL_STRIPS
+        self.sent_meter_messages = 0
+        self.suppressed_meter_messages = 0
+
+    def report_meter_value(self, strip_index, meter_value):
+        """Quantizes the given meter value (0.0 - 1.0) to the 13 levels of a meter,
+           to be sent with the next batch"""
+        self.__reported_levels[strip_index] = int(meter_value * 12.0)
+
+    def forget_meter_level(self, strip_index, level = -1):
+        """To be called when the level of the meter was changed, or might have been,
+           without the engine knowing"""
+        self.__sent_levels[strip_index] = level
+        self.__ticks_since_sent[strip_index] = 0
+
+    def refresh_state(self):
+        for strip_index in range(NUM_CHANNEL_STRIPS):
+            self.forget_meter_level(strip_index)
+
+    def on_update_display_timer(self):
+        for strip_index, level in enumerate(self.__reported_levels):
+            self.__ticks_since_sent[strip_index] += 1
+            if level == None:
+                continue
+            self.__reported_levels[strip_index] = None
+            if level != self.__displayed_level(strip_index):
+                self.send_midi((208, level + (strip_index << 4)))
+                self.__sent_levels[strip_index] = level
+                self.__ticks_since_sent[strip_index] = 0
+                self.sent_meter_messages += 1
+            else:
+                self.suppressed_meter_messages += 1
+
+    def __displayed_level(self, strip_index):
+        sent_level = self.__sent_levels[strip_index]
+        if sent_level == -1:
+            return -1
+        return max(0, sent_level - self.__ticks_since_sent[strip_index] / METER_DECAY_TICKS)
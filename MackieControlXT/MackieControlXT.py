@@ -2,6 +2,8 @@
 from MackieControl.consts import *
 from MackieControl.MainDisplay import MainDisplay
 from MackieControl.ChannelStrip import ChannelStrip
+from MackieControl.MeterEngine import MeterEngine
+from functools import partial
 import Live
 
 class MackieControlXT:
@@ -14,14 +16,37 @@ class MackieControlXT:
         self.__components = []
         self.__main_display = MainDisplay(self)
         self.__components.append(self.__main_display)
+        self.__meter_engine = MeterEngine(self)
         self.__channel_strips = [ ChannelStrip(self, i) for i in range(NUM_CHANNEL_STRIPS) ]
         for s in self.__channel_strips:
             self.__components.append(s)
 
+        self.__components.append(self.__meter_engine)
         self.__mackie_control_main = None
         self.is_pro_version = False
         self._received_firmware_version = False
         self._refresh_state_next_time = 0
+        self.__build_midi_handler_tables()
+
+    def __build_midi_handler_tables(self):
+        """ Maps every note and CC number to the channel strip it is meant for, so
+            that receive_midi does not have to ask every strip
+        """
+        note_handlers = [None] * 128
+        cc_handlers = [None] * 128
+        for i, s in enumerate(self.__channel_strips):
+            for sw_id in (SID_RECORD_ARM_BASE + i,
+             SID_SOLO_BASE + i,
+             SID_MUTE_BASE + i,
+             SID_SELECT_BASE + i,
+             SID_VPOD_PUSH_BASE + i,
+             SID_FADER_TOUCH_SENSE_BASE + i):
+                note_handlers[sw_id] = s.handle_channel_strip_switch_ids
+
+            cc_handlers[FID_PANNING_BASE + i] = partial(s.handle_vpot_rotation, i)
+
+        self.__note_handlers = tuple(note_handlers)
+        self.__cc_handlers = tuple(cc_handlers)
 
     def disconnect(self):
         for c in self.__components:
@@ -41,6 +66,9 @@ class MackieControlXT:
              0,
              247))
 
+    def meter_engine(self):
+        return self.__meter_engine
+
     def is_extension(self):
         return True
 
@@ -121,21 +149,15 @@ class MackieControlXT:
         self.__c_instance.send_midi(midi_event_bytes)
 
     def receive_midi(self, midi_bytes):
-        if midi_bytes[0] & 240 == NOTE_ON_STATUS or midi_bytes[0] & 240 == NOTE_OFF_STATUS:
-            note = midi_bytes[1]
-            value = BUTTON_PRESSED if midi_bytes[2] > 0 else BUTTON_RELEASED
-            if note in range(SID_FIRST, SID_LAST + 1):
-                if note in channel_strip_switch_ids + fader_touch_switch_ids:
-                    for s in self.__channel_strips:
-                        s.handle_channel_strip_switch_ids(note, value)
-
-        elif midi_bytes[0] & 240 == CC_STATUS:
-            cc_no = midi_bytes[1]
-            cc_value = midi_bytes[2]
-            if cc_no in range(FID_PANNING_BASE, FID_PANNING_BASE + NUM_CHANNEL_STRIPS):
-                for s in self.__channel_strips:
-                    s.handle_vpot_rotation(cc_no - FID_PANNING_BASE, cc_value)
-
+        status = midi_bytes[0] & 240
+        if status == NOTE_ON_STATUS or status == NOTE_OFF_STATUS:
+            handler = self.__note_handlers[midi_bytes[1]]
+            if handler != None:
+                handler(midi_bytes[1], BUTTON_PRESSED if midi_bytes[2] > 0 else BUTTON_RELEASED)
+        elif status == CC_STATUS:
+            handler = self.__cc_handlers[midi_bytes[1]]
+            if handler != None:
+                handler(midi_bytes[2])
         elif midi_bytes[0] == 240 and len(midi_bytes) == 12 and midi_bytes[5] == 20:
             version_bytes = midi_bytes[6:-2]
             major_version = version_bytes[1]
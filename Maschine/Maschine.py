@@ -410,8 +410,7 @@ class Maschine(ControlSurface):
 
     def update_display(self):
         with self.component_guard():
-            with self._is_sending_scheduled_messages():
-                self._task_group.update(0.1)
+            self._task_group.update(0.1)
             self._modeselect.notify(self.blink_state)
             self.blink_state = (self.blink_state + 1) % 4
             self.display_task.tick()
@@ -5,6 +5,7 @@ from MackieControl.MainDisplayController import MainDisplayController
 from MackieControl.ChannelStripController import ChannelStripController
 from MackieControl.ChannelStrip import ChannelStrip
 from MackieControl.ChannelStrip import MasterChannelStrip
+from MackieControl.MeterEngine import MeterEngine
 from MackieControl.SoftwareController import SoftwareController
 from MackieControl.Transport import Transport
 import Live
@@ -25,6 +26,7 @@ class ProjectMixIO:
         self.__components.append(self.__software_controller)
         self.__transport = Transport(self)
         self.__components.append(self.__transport)
+        self.__meter_engine = MeterEngine(self)
         self.__channel_strips = [ ChannelStrip(self, i) for i in range(NUM_CHANNEL_STRIPS) ]
         for s in self.__channel_strips:
             self.__components.append(s)
@@ -33,9 +35,10 @@ class ProjectMixIO:
         self.__components.append(self.__master_strip)
         self.__channel_strip_controller = ChannelStripController(self, self.__channel_strips, self.__master_strip, self.__main_display_controller)
         self.__components.append(self.__channel_strip_controller)
+        self.__components.append(self.__meter_engine)
         self.__shift_is_pressed = False
         self.__option_is_pressed = False
-        self.__ctrl_is_pressed = False
+        self.__control_is_pressed = False
         self.__alt_is_pressed = False
         self.is_pro_version = False
 
@@ -68,6 +71,9 @@ class ProjectMixIO:
         for c in self.__components:
             c.refresh_state()
 
+    def meter_engine(self):
+        return self.__meter_engine
+
     def is_extension(self):
         return False
 
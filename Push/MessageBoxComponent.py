@@ -177,9 +177,10 @@ class NotificationComponent(CompoundComponent):
         self._message_box = self.register_component(MessageBoxComponent())
         self._message_box.set_enabled(False)
         self._notification_timeout_task = self._tasks.add(Task.sequence(Task.wait(notification_time), Task.run(self.hide_notification))).kill() if notification_time != -1 else self._tasks.add(Task.Task())
-        self._blink_text_task = self._tasks.add(Task.loop(Task.sequence(Task.run(lambda : self._message_box.__setattr__('text', self._original_text)), Task.wait(blinking_time), Task.run(lambda : self._message_box.__setattr__('text', self._blink_text)), Task.wait(blinking_time)))).kill()
+        self._blink_text_task = self._tasks.add(Task.TimedCallback(blinking_time, self._toggle_blink_text))
         self._original_text = None
         self._blink_text = None
+        self._is_showing_blink_text = False
 
     message_box_layer = forward_property('_message_box')('layer')
 
@@ -192,6 +193,7 @@ class NotificationComponent(CompoundComponent):
         if blink_text is not None:
             self._original_text = text
             self._blink_text = blink_text
+            self._is_showing_blink_text = False
             self._blink_text_task.restart()
         self._message_box.text = text
         self._message_box.set_enabled(True)
@@ -204,6 +206,11 @@ class NotificationComponent(CompoundComponent):
         self._blink_text_task.kill()
         self._message_box.set_enabled(False)
 
+    def _toggle_blink_text(self):
+        self._is_showing_blink_text = not self._is_showing_blink_text
+        self._message_box.text = self._blink_text if self._is_showing_blink_text else self._original_text
+        self._blink_text_task.restart()
+
     def use_single_line(self, line_index, line_slice = None, align = align_none):
         """
         Returns a control, that will change the notification to a single line view,
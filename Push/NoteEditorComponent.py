@@ -1,8 +1,10 @@
 #Embedded file name: /Users/versonator/Jenkins/live/Binary/Core_Release_64_static/midi-remote-scripts/Push/NoteEditorComponent.py
 from __future__ import with_statement
+from bisect import bisect_left, bisect_right
 from functools import partial
 from itertools import chain, imap, ifilter
 from _Framework.SubjectSlot import subject_slot, Subject
+from _Framework.Skin import compile_skin_path
 from _Framework.CompoundComponent import CompoundComponent
 from _Framework.Util import sign, product, in_range, clamp, forward_property, first
 from _Framework import Task, Defaults
@@ -10,6 +12,11 @@ from LoopSelectorComponent import create_clip_in_selected_slot
 from MatrixMaps import PAD_FEEDBACK_CHANNEL
 DEFAULT_VELOCITY = 100
 BEAT_TIME_EPSILON = 1e-05
+NOTE_COLORS = ('Full', 'High', 'Low', 'Muted')
+STEP_DISABLED_COLOR = compile_skin_path('NoteEditor.StepDisabled')
+STEP_SELECTED_COLOR = compile_skin_path('NoteEditor.StepSelected')
+STEP_COLORS = dict([ (note_color, compile_skin_path('NoteEditor.Step.' + note_color)) for note_color in NOTE_COLORS ])
+STEP_EDITING_COLORS = dict([ (note_color, compile_skin_path('NoteEditor.StepEditing.' + note_color)) for note_color in NOTE_COLORS ])
 
 def color_for_note(note):
     velocity = note[3]
@@ -71,6 +78,13 @@ class TimeStep(object):
     def filter_notes(self, notes):
         return filter(self.includes_note, notes)
 
+    def note_time_ranges(self):
+        """
+        Returns a list of (start_time, end_time) ranges containing the
+        start times of all notes in the step, and possibly of some more
+        """
+        return [(self.start - self.offset, self.start - self.offset + self.length)]
+
     def clamp(self, time, extra_time = 0.0):
         return clamp(time + extra_time, self.left_boundary(), self.right_boundary())
 
@@ -101,6 +115,9 @@ class LoopingTimeStep(TimeStep):
         else:
             return [(self.start - self.offset, self.length)]
 
+    def note_time_ranges(self):
+        return super(LoopingTimeStep, self).note_time_ranges() + [(self.clip_end - self.offset, self.clip_end)]
+
     def _looped_time(self, time, extra_time = 0.0):
         if in_range(time, self.clip_end - self.offset, self.clip_end):
             time = time - self.clip_end + self.clip_start
@@ -110,6 +127,33 @@ class LoopingTimeStep(TimeStep):
         return in_range(self._looped_time(time) + self.offset - self.start, 0, self.length) and in_range(time, self.clip_start, self.clip_end)
 
 
+class NoteIndex(object):
+    """
+    The notes returned by get_notes, sorted by start time for finding
+    the notes in a step without looking at all of them
+    """
+
+    def __init__(self, notes = (), *a, **k):
+        super(NoteIndex, self).__init__(*a, **k)
+        self.notes = notes
+        self._order = sorted(xrange(len(notes)), key=lambda index: notes[index][1])
+        self._start_times = [ notes[index][1] for index in self._order ]
+
+    def notes_in_step(self, time_step):
+        """
+        Returns the same notes as time_step.filter_notes(self.notes), in
+        the same order
+        """
+        indices = set()
+        for start_time, end_time in time_step.note_time_ranges():
+            lower = bisect_left(self._start_times, start_time - BEAT_TIME_EPSILON)
+            upper = bisect_right(self._start_times, end_time + BEAT_TIME_EPSILON)
+            indices.update(self._order[lower:upper])
+
+        notes = self.notes
+        return [ notes[index] for index in sorted(indices) if time_step.includes_note(notes[index]) ]
+
+
 class NoteEditorComponent(CompoundComponent, Subject):
     __subject_events__ = ('page_length', 'active_steps', 'notes_changed')
 
@@ -125,6 +169,7 @@ class NoteEditorComponent(CompoundComponent, Subject):
         self._height = 0
         self._sequencer_clip = None
         self._step_colors = []
+        self._sent_step_colors = []
         if settings_mode:
             self._settings_mode = self.register_component(settings_mode)
             self._mute_button = None
@@ -136,6 +181,7 @@ class NoteEditorComponent(CompoundComponent, Subject):
             self._modify_all_notes_enabled = False
             self._step_tap_tasks = {}
             self._clip_notes = []
+            self._clip_note_index = NoteIndex()
             self._note_index = 36
             self._grid_resolution = grid_resolution
             self._on_resolution_changed.subject = self._grid_resolution
@@ -149,6 +195,14 @@ class NoteEditorComponent(CompoundComponent, Subject):
         self._update_from_grid()
         self.background_color = 'NoteEditor.StepEmpty'
 
+    def _get_background_color(self):
+        return self._background_color
+
+    def _set_background_color(self, color):
+        self._background_color = compile_skin_path(color)
+
+    background_color = property(_get_background_color, _set_background_color)
+
     note_settings_layer = forward_property('_settings')('layer')
 
     @property
@@ -205,6 +259,7 @@ class NoteEditorComponent(CompoundComponent, Subject):
     def set_button_matrix(self, matrix):
         last_page_length = self.page_length
         self._matrix = matrix
+        self._sent_step_colors = []
         self._on_matrix_value.subject = matrix
         if matrix:
             self._width = matrix.width()
@@ -229,6 +284,7 @@ class NoteEditorComponent(CompoundComponent, Subject):
 
     def update(self):
         super(NoteEditorComponent, self).update()
+        self._sent_step_colors = []
         self._update_editor_matrix_leds()
         self._grid_resolution.update()
 
@@ -249,6 +305,7 @@ class NoteEditorComponent(CompoundComponent, Subject):
             self._clip_notes = self._sequencer_clip.get_notes(time_start, self._note_index, time_length, 1)
         else:
             self._clip_notes = []
+        self._clip_note_index = NoteIndex(self._clip_notes)
         self._update_editor_matrix()
         self.notify_notes_changed()
 
@@ -257,29 +314,29 @@ class NoteEditorComponent(CompoundComponent, Subject):
         update offline array of button LED values, based on note
         velocity and mute states
         """
-        step_colors = ['NoteEditor.StepDisabled'] * self._get_step_count()
+        step_colors = [STEP_DISABLED_COLOR] * self._get_step_count()
         width = self._width
         coords_to_index = lambda (x, y): x + y * width
         editing_indices = set(map(coords_to_index, self._modified_steps))
         selected_indices = set(map(coords_to_index, self._pressed_steps))
         last_editing_notes = []
         for time_step, index in self._visible_steps():
-            notes = time_step.filter_notes(self._clip_notes)
+            notes = self._clip_note_index.notes_in_step(time_step)
             if len(notes) > 0:
                 last_editing_notes = []
                 if index in selected_indices:
-                    color = 'NoteEditor.StepSelected'
+                    color = STEP_SELECTED_COLOR
                 elif index in editing_indices:
                     note_color = color_for_note(most_significant_note(notes))
-                    color = 'NoteEditor.StepEditing.' + note_color
+                    color = STEP_EDITING_COLORS[note_color]
                     last_editing_notes = notes
                 else:
                     note_color = color_for_note(most_significant_note(notes))
-                    color = 'NoteEditor.Step.' + note_color
+                    color = STEP_COLORS[note_color]
             elif any(imap(time_step.overlaps_note, last_editing_notes)):
-                color = 'NoteEditor.StepEditing.' + note_color
+                color = STEP_EDITING_COLORS[note_color]
             elif index in editing_indices or index in selected_indices:
-                color = 'NoteEditor.StepSelected'
+                color = STEP_SELECTED_COLOR
                 last_editing_notes = []
             else:
                 color = self.background_color
@@ -299,12 +356,22 @@ class NoteEditorComponent(CompoundComponent, Subject):
         return [ (self._time_step(first_time + k * step_length), index) for k, index in enumerate(indices) ]
 
     def _update_editor_matrix_leds(self):
-        """ update hardware LEDS to match offline array values """
+        """
+        update hardware LEDS to match offline array values, skipping
+        the ones already showing their color
+        """
         if self.is_enabled() and self._matrix:
+            sent_step_colors = self._sent_step_colors
+            if len(sent_step_colors) != len(self._step_colors):
+                sent_step_colors = [None] * len(self._step_colors)
             for row, col in product(xrange(self._height), xrange(self._width)):
                 index = row * self._width + col
                 color = self._step_colors[index]
-                self._matrix.set_light(col, row, color)
+                if sent_step_colors[index] != color:
+                    self._matrix.set_light(col, row, color)
+                    sent_step_colors[index] = color
+
+            self._sent_step_colors = sent_step_colors
 
     def _get_step_count(self):
         return self._width * self._height
@@ -406,7 +473,7 @@ class NoteEditorComponent(CompoundComponent, Subject):
         if self._sequencer_clip != None:
             x, y = step
             time = self._get_step_start_time(x, y)
-            notes = self._time_step(time).filter_notes(self._clip_notes)
+            notes = self._clip_note_index.notes_in_step(self._time_step(time))
             if notes:
                 if modify_existing:
                     most_significant_velocity = most_significant_note(notes)[3]
@@ -512,11 +579,11 @@ class NoteEditorComponent(CompoundComponent, Subject):
         """ modify all notes in the current pitch """
         return self._modify_notes_in_time(TimeStep(0.0, MAX_CLIP_LENGTH), self._clip_notes)
 
-    def _limited_nudge_offset(self, steps, notes, nudge_offset):
+    def _limited_nudge_offset(self, steps, nudge_offset):
         limited_nudge_offset = MAX_CLIP_LENGTH
         for x, y in steps:
             time_step = self._time_step(self._get_step_start_time(x, y))
-            for note in time_step.filter_notes(notes):
+            for note in self._clip_note_index.notes_in_step(time_step):
                 time_after_nudge = time_step.clamp(note[1], nudge_offset)
                 limited_nudge_offset = min(limited_nudge_offset, abs(note[1] - time_after_nudge))
 
@@ -525,7 +592,7 @@ class NoteEditorComponent(CompoundComponent, Subject):
     def _modify_step_notes(self, steps):
         """ Return a new list with all notes within steps modified. """
         notes = self._clip_notes
-        self._nudge_offset = self._limited_nudge_offset(steps, notes, self._nudge_offset)
+        self._nudge_offset = self._limited_nudge_offset(steps, self._nudge_offset)
         for x, y in steps:
             time_step = self._time_step(self._get_step_start_time(x, y))
             notes = self._modify_notes_in_time(time_step, notes)
@@ -533,7 +600,7 @@ class NoteEditorComponent(CompoundComponent, Subject):
         return notes
 
     def _modify_notes_in_time(self, time_step, notes):
-        step_notes = time_step.filter_notes(self._clip_notes)
+        step_notes = self._clip_note_index.notes_in_step(time_step)
         step_mute = all(map(lambda note: note[4], step_notes))
         return map(partial(self._modify_single_note, step_mute, time_step), notes)
 
@@ -582,7 +649,7 @@ class NoteEditorComponent(CompoundComponent, Subject):
             min_max_values = None
             for x, y in chain(self._modified_steps, self._pressed_steps):
                 start_time = self._get_step_start_time(x, y)
-                min_max_values = self._min_max_for_notes(self._time_step(start_time).filter_notes(self._clip_notes), start_time, min_max_values)
+                min_max_values = self._min_max_for_notes(self._clip_note_index.notes_in_step(self._time_step(start_time)), start_time, min_max_values)
 
             return min_max_values
 
@@ -16,7 +16,7 @@ class DeviceComponent(DeviceComponentBase, CompoundComponent):
     def _current_bank_details(self):
         bank_name = ''
         bank = []
-        if self._bank_index in range(len(self._parameter_banks())):
+        if self._bank_index in range(super(DeviceComponent, self)._number_of_parameter_banks()):
             bank_name, bank = super(DeviceComponent, self)._current_bank_details()
         return (bank_name, bank)
 
@@ -10,6 +10,7 @@ class Encoders:
         self.__parent = parent
         self.__bank = 0
         self.__selected_device = None
+        self.__parameter_bank_cache = ParameterBankCache()
         self.__extended = extended
         self.__modifier = False
         self.__device_locked = False
@@ -84,7 +85,7 @@ class Encoders:
                         parameter = 0
                         if param_bank:
                             if param_bank[encoder] != '':
-                                parameter = get_parameter_by_name(self.__selected_device, param_bank[encoder])
+                                parameter = self.__parameter_bank_cache.parameter_by_name(self.__selected_device, param_bank[encoder])
                             else:
                                 free_encoders += 1
                         elif len(device_parameters) > parameter_index:
@@ -150,4 +151,5 @@ class Encoders:
         self.__parent.request_rebuild_midi_map()
 
     def __on_device_parameters_changed(self):
+        self.__parameter_bank_cache.invalidate()
         self.__parent.request_rebuild_midi_map()
\ No newline at end of file
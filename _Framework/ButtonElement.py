@@ -2,7 +2,7 @@
 from __future__ import absolute_import
 import Live
 from .InputControlElement import InputControlElement, MIDI_CC_TYPE
-from .Skin import Skin, SkinColorMissingError
+from .Skin import Skin, SkinColorMissingError, SkinHandle
 from .Util import nop
 
 class ButtonValue(object):
@@ -108,7 +108,10 @@ class ButtonElement(InputControlElement, ButtonElementMixin):
 
     def _set_skin_light(self, value):
         try:
-            color = self._skin[value]
+            if value.__class__ is SkinHandle:
+                color = self._skin.color_for_handle(value)
+            else:
+                color = self._skin[value]
             color.draw(self)
         except SkinColorMissingError:
             super(ButtonElement, self).set_light(value)
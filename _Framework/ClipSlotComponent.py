@@ -5,15 +5,73 @@ from .ControlSurfaceComponent import ControlSurfaceComponent
 from .SubjectSlot import subject_slot
 from .Util import in_range
 
-def find_nearest_color(rgb_table, src_hex_color):
+def hex_to_channels(color_in_hex):
+    return ((color_in_hex & 16711680) >> 16, (color_in_hex & 65280) >> 8, color_in_hex & 255)
+
+
+class ColorTableQuantizer(object):
+    """
+    Finds the value of the color nearest to a given color in an
+    rgb_table, a list of (value, hex-rgb color) pairs, remembering the
+    results.  With use_lookup_cube, the nearest colors of the 4096
+    colors made of 4 bits per channel are computed upfront and every
+    color is looked up through the top 4 bits of its channels, which
+    is faster but no longer exact.
+    """
+
+    def __init__(self, rgb_table, use_lookup_cube = False, *a, **k):
+        super(ColorTableQuantizer, self).__init__(*a, **k)
+        self._table = [ (value,) + hex_to_channels(color) for value, color in rgb_table ]
+        self._cache = {}
+        self._cube = None
+        if use_lookup_cube:
+            self._cube = [ self._find_nearest_channels((index >> 8) * 17, (index >> 4 & 15) * 17, (index & 15) * 17) for index in xrange(4096) ]
+
+    def nearest(self, color):
+        try:
+            return self._cache[color]
+        except KeyError:
+            if self._cube is not None:
+                value = self._cube[(color & 15728640) >> 12 | (color & 61440) >> 8 | (color & 240) >> 4]
+            else:
+                value = self._find_nearest_channels(*hex_to_channels(color))
+            self._cache[color] = value
+            return value
 
-    def hex_to_channels(color_in_hex):
-        return ((color_in_hex & 16711680) >> 16, (color_in_hex & 65280) >> 8, color_in_hex & 255)
+    def _find_nearest_channels(self, red, green, blue):
+        nearest_value = None
+        nearest_distance = None
+        for value, r, g, b in self._table:
+            distance = (red - r) ** 2 + (green - g) ** 2 + (blue - b) ** 2
+            if nearest_distance is None or distance < nearest_distance:
+                nearest_value = value
+                nearest_distance = distance
 
-    def squared_distance(color):
-        return sum([ (a - b) ** 2 for a, b in zip(hex_to_channels(src_hex_color), hex_to_channels(color[1])) ])
+        return nearest_value
 
-    return min(rgb_table, key=squared_distance)[0]
+
+_quantizers = {}
+
+def quantizer_for_table(rgb_table, use_lookup_cube = False):
+    """
+    Returns the ColorTableQuantizer for the given rgb_table, which is
+    shared by everyone asking for the same table and use_lookup_cube.
+    """
+    key = (id(rgb_table), bool(use_lookup_cube))
+    try:
+        table, quantizer = _quantizers[key]
+        if table is rgb_table:
+            return quantizer
+    except KeyError:
+        pass
+
+    quantizer = ColorTableQuantizer(rgb_table, use_lookup_cube=use_lookup_cube)
+    _quantizers[key] = (rgb_table, quantizer)
+    return quantizer
+
+
+def find_nearest_color(rgb_table, src_hex_color):
+    return quantizer_for_table(rgb_table).nearest(src_hex_color)
 
 
 class ClipSlotComponent(ControlSurfaceComponent):
@@ -31,6 +89,7 @@ class ClipSlotComponent(ControlSurfaceComponent):
         self._stopped_value = 0
         self._clip_palette = []
         self._clip_rgb_table = None
+        self._clip_rgb_quantizer = None
         self._record_button_value = None
         self._has_fired_slot = False
         self._delete_button = None
@@ -92,10 +151,11 @@ class ClipSlotComponent(ControlSurfaceComponent):
         self._stopped_value = None
         self._clip_palette = palette
 
-    def set_clip_rgb_table(self, rgb_table):
+    def set_clip_rgb_table(self, rgb_table, use_lookup_cube = False):
         """ A list of velocity, hex-rgb color pairs that is used, if the color could not
-        be matched to the clip palette """
+        be matched to the clip palette.  See ColorTableQuantizer for use_lookup_cube. """
         self._clip_rgb_table = rgb_table
+        self._clip_rgb_quantizer = quantizer_for_table(rgb_table, use_lookup_cube) if rgb_table != None else None
 
     def has_clip(self):
         raise self._clip_slot != None or AssertionError
@@ -121,8 +181,8 @@ class ClipSlotComponent(ControlSurfaceComponent):
         try:
             return self._clip_palette[color]
         except (KeyError, IndexError):
-            if self._clip_rgb_table != None:
-                return find_nearest_color(self._clip_rgb_table, color)
+            if self._clip_rgb_quantizer != None:
+                return self._clip_rgb_quantizer.nearest(color)
             else:
                 return self._stopped_value
 
@@ -238,7 +238,7 @@ class DoublePressElement(WrapperElement):
         super(DoublePressElement, self).__init__(wrapped_control=wrapped_control, *a, **k)
         self.register_control_element(self._wrapped_control)
         self._double_press_context = double_press_context
-        self._double_press_task = self._tasks.add(Task.sequence(Task.wait(self.DOUBLE_PRESS_MAX_DELAY), Task.run(self.finish_single_press))).kill()
+        self._double_press_task = self._tasks.add(Task.TimedCallback(self.DOUBLE_PRESS_MAX_DELAY, self.finish_single_press))
         self.request_listen_nested_control_elements()
 
     def on_nested_control_element_value(self, value, control):
@@ -236,7 +236,7 @@ class ButtonControl(Control):
 
         @lazy_attribute
         def _delay_task(self):
-            return self._manager._tasks.add(Task.sequence(Task.wait(ButtonControl.DELAY_TIME), Task.run(self._on_pressed_delayed)))
+            return self._manager._tasks.add(Task.TimedCallback(ButtonControl.DELAY_TIME, self._on_pressed_delayed))
 
         def _has_delayed_event(self):
             return self._pressed_delayed_listener is not None or self._released_delayed_listener is not None or self._released_immediately_listener is not None
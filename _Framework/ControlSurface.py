@@ -1,8 +1,10 @@
 #Embedded file name: /Users/versonator/Jenkins/live/Binary/Core_Release_64_static/midi-remote-scripts/_Framework/ControlSurface.py
 from __future__ import absolute_import, with_statement
 from functools import partial, wraps
-from itertools import chain, imap
+from array import array
+from itertools import imap, islice
 from contextlib import contextmanager
+import sys
 import traceback
 import Live
 from . import Defaults
@@ -14,7 +16,7 @@ from .InputControlElement import InputControlElement, MIDI_CC_TYPE, MIDI_PB_TYPE
 from .PhysicalDisplayElement import PhysicalDisplayElement
 from .Profile import profile
 from .SubjectSlot import SlotManager
-from .Util import BooleanContext, first, find_if, const, in_range
+from .Util import BooleanContext, find_if, const, in_range
 
 class _ModuleLoadedCheck(object):
     """
@@ -43,6 +45,215 @@ def _scheduled_method(method):
     return wrapper
 
 
+def _describe_midi_message(surface, midi_bytes):
+    if surface.is_sysex_message(midi_bytes):
+        recipient = surface.get_recipient_for_sysex_midi_message(midi_bytes)
+        recipient = recipient[1] if recipient is not None else None
+    else:
+        recipient = surface.get_recipient_for_nonsysex_midi_message(midi_bytes)
+    return '%s %s' % (getattr(recipient, 'name', None) or recipient.__class__.__name__, midi_bytes[:3])
+
+
+def _describe_listener(surface, listener):
+    return listener.name
+
+
+class _ForwardingRegistry(dict):
+    """
+    Maps (status, data1) -- or (status,) for pitchbend -- forwarding
+    keys to their recipient controls.  Every change is mirrored into a
+    flat table indexed by (status << 7) | data1, so the recipient of a
+    non-sysex message can be found with a single list index.
+    """
+    TABLE_SIZE = 256 << 7
+
+    def __init__(self, *a, **k):
+        super(_ForwardingRegistry, self).__init__(*a, **k)
+        self.table = [None] * self.TABLE_SIZE
+        for key, recipient in self.iteritems():
+            self._update_table(key, recipient)
+
+    def __setitem__(self, key, recipient):
+        super(_ForwardingRegistry, self).__setitem__(key, recipient)
+        self._update_table(key, recipient)
+
+    def __delitem__(self, key):
+        super(_ForwardingRegistry, self).__delitem__(key)
+        self._update_table(key, None)
+
+    def clear(self):
+        super(_ForwardingRegistry, self).clear()
+        self.table[:] = [None] * self.TABLE_SIZE
+
+    def update(self, *a, **k):
+        for key, recipient in dict(*a, **k).iteritems():
+            self[key] = recipient
+
+    def setdefault(self, key, recipient = None):
+        if key not in self:
+            self[key] = recipient
+        return self[key]
+
+    def pop(self, key, *default):
+        had_key = key in self
+        recipient = super(_ForwardingRegistry, self).pop(key, *default)
+        if had_key:
+            self._update_table(key, None)
+        return recipient
+
+    def popitem(self):
+        key, recipient = super(_ForwardingRegistry, self).popitem()
+        self._update_table(key, None)
+        return (key, recipient)
+
+    def _update_table(self, key, recipient):
+        index = key[0] << 7
+        if len(key) == 1:
+            self.table[index:index + 128] = [recipient] * 128
+        else:
+            self.table[index | key[1]] = recipient
+
+
+class _ComponentGuard(object):
+    """
+    Reusable context manager implementing ControlSurface.component_guard.
+
+    Entering the outermost guard sets, in this order, the in-guard
+    flag, the listener caller, the control surface injector, the
+    rebuild request suppression and the MIDI message accumulation.
+    They are undone in reverse order when the outermost guard is
+    exited.  Nested guards do nothing, and so do guards entered while
+    the outermost one is being exited, e.g. from the MIDI flush or the
+    rebuild.  This has the same semantics as nesting the individual
+    context managers, but all of it happens in a single flat frame.
+    """
+
+    def __init__(self, control_surface = None, *a, **k):
+        super(_ComponentGuard, self).__init__(*a, **k)
+        self._control_surface = control_surface
+        self._in_component_guard = control_surface._in_component_guard()
+        self._accumulating_midi_messages = control_surface._accumulate_midi_messages()
+        self._depth = 0
+        self._entered_layers = 0
+
+    def __enter__(self):
+        if self._depth == 0:
+            try:
+                self._enter_layers()
+            except:
+                self._exit_layers()
+                raise
+
+        self._depth += 1
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        try:
+            if self._depth == 1:
+                self._exit_layers()
+        finally:
+            self._depth -= 1
+
+    def _enter_layers(self):
+        control_surface = self._control_surface
+        self._in_component_guard.__enter__()
+        self._entered_layers = 1
+        control_surface._c_instance.set_listener_caller(control_surface._call_guarded_listener)
+        control_surface._control_surface_injector.__enter__()
+        self._entered_layers = 2
+        control_surface._set_suppress_rebuild_requests(True)
+        self._entered_layers = 3
+        self._accumulating_midi_messages.__enter__()
+        self._entered_layers = 4
+
+    def _exit_layers(self):
+        control_surface = self._control_surface
+        entered_layers = self._entered_layers
+        self._entered_layers = 0
+        try:
+            if entered_layers >= 4:
+                try:
+                    control_surface._flush_midi_messages()
+                finally:
+                    self._accumulating_midi_messages.__exit__()
+
+        finally:
+            try:
+                if entered_layers >= 3:
+                    control_surface._set_suppress_rebuild_requests(False)
+            finally:
+                try:
+                    if entered_layers >= 2:
+                        control_surface._control_surface_injector.__exit__()
+                finally:
+                    try:
+                        if entered_layers >= 1:
+                            control_surface._c_instance.set_listener_caller(None)
+                    finally:
+                        if entered_layers >= 1:
+                            self._in_component_guard.__exit__()
+
+
+class _OptimizedComponentGuard(_ComponentGuard):
+    """
+    Component guard of the OptimizedControlSurface.  On top of the
+    regular guard, every guarded scope -- nested or not -- injects the
+    ownership handler and commits the ownership changes when it is
+    left without an exception.
+    """
+
+    def __enter__(self):
+        super(_OptimizedComponentGuard, self).__enter__()
+        try:
+            self._control_surface._ownership_handler_injector.__enter__()
+        except:
+            super(_OptimizedComponentGuard, self).__exit__(*sys.exc_info())
+            raise
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        try:
+            try:
+                if exc_type is None:
+                    self._control_surface._optimized_ownership_handler.commit_ownership_changes()
+            finally:
+                self._control_surface._ownership_handler_injector.__exit__()
+
+        finally:
+            super(_OptimizedComponentGuard, self).__exit__(exc_type, exc_value, exc_traceback)
+
+
+class MidiMapStatistics(object):
+    """
+    Counters describing how much work rebuilding the MIDI map costs.
+    
+    - rebuilds_requested: rebuild requests passed on to Live
+    - rebuilds_coalesced: requests that were merged into another one
+      while rebuild requests were suppressed
+    - rebuilds: calls to build_midi_map
+    - controls_installed: controls whose connections were installed,
+      every control on every rebuild
+    - controls_changed: installed controls whose connection signature
+      changed since the previous rebuild
+    """
+
+    def __init__(self, *a, **k):
+        super(MidiMapStatistics, self).__init__(*a, **k)
+        self.reset()
+
+    def reset(self):
+        self.rebuilds_requested = 0
+        self.rebuilds_coalesced = 0
+        self.rebuilds = 0
+        self.controls_installed = 0
+        self.controls_changed = 0
+
+    def as_dict(self):
+        return dict(rebuilds_requested=self.rebuilds_requested, rebuilds_coalesced=self.rebuilds_coalesced, rebuilds=self.rebuilds, controls_installed=self.controls_installed, controls_changed=self.controls_changed)
+
+    def __str__(self):
+        return ', '.join([ '%s: %d' % item for item in sorted(self.as_dict().iteritems()) ])
+
+
+SYSEX_STATUS_BYTE = 240
 CS_LIST_KEY = 'control_surfaces'
 
 def publish_control_surface(control_surface):
@@ -85,20 +296,26 @@ class ControlSurface(SlotManager):
         self._device_component = None
         self._device_selection_follows_track_selection = False
         self._forwarding_long_identifier_registry = {}
-        self._forwarding_registry = {}
-        self._is_sending_scheduled_messages = BooleanContext()
-        self._remaining_scheduled_messages = []
+        self._forwarding_long_identifier_lengths = []
+        self._forwarding_registry = _ForwardingRegistry()
         self._task_group = Task.TaskGroup(auto_kill=False)
+        self._scheduled_messages = self._task_group.add(Task.ScheduleTask())
+        self._timed_messages = self._task_group.add(Task.ClockScheduleTask())
         self._in_build_midi_map = BooleanContext()
         self._suppress_requests_counter = 0
         self._rebuild_requests_during_suppression = 0
+        self._connection_signatures = {}
+        self._midi_map_statistics = MidiMapStatistics()
         self._enabled = True
         self._in_component_guard = BooleanContext()
         self._accumulate_midi_messages = BooleanContext()
-        self._midi_message_dict = {}
-        self._midi_message_list = []
+        self._midi_message_queue = []
         self._midi_message_count = 0
-        self._control_surface_injector = inject(parent_task_group=const(self._task_group), show_message=const(self.show_message), log_message=const(self.log_message), register_component=const(self._register_component), register_control=const(self._register_control), request_rebuild_midi_map=const(self.request_rebuild_midi_map), set_pad_translations=const(self.set_pad_translations), send_midi=const(self._send_midi), song=self.song).everywhere()
+        self._midi_message_slots = array('i', [-1]) * 65536
+        self._taken_midi_message_slots = []
+        self._send_midi_many = getattr(c_instance, 'send_midi_many', None) if type(self)._do_send_midi.im_func is ControlSurface._do_send_midi.im_func else None
+        self._control_surface_injector = inject(parent_task_group=const(self._task_group), show_message=const(self.show_message), log_message=const(self.log_message), register_component=const(self._register_component), register_control=const(self._register_control), request_rebuild_midi_map=const(self.request_rebuild_midi_map), set_pad_translations=const(self.set_pad_translations), send_midi=const(self._send_midi), schedule_timed_message=const(self.schedule_timed_message), cancel_timed_message=const(self.cancel_timed_message), song=self.song).everywhere()
+        self._component_guard = self._create_component_guard()
         with self.setting_listener_caller():
             self.register_slot(self.song(), self._on_track_list_changed, 'visible_tracks')
             self.register_slot(self.song(), self._on_scene_list_changed, 'scenes')
@@ -144,6 +361,7 @@ class ControlSurface(SlotManager):
         cs_list = self._control_surfaces()
         if self in cs_list:
             cs_list.remove(self)
+        self._timed_messages.clear()
         self._task_group.clear()
         super(ControlSurface, self).disconnect()
 
@@ -284,8 +502,13 @@ class ControlSurface(SlotManager):
             raise AssertionError
             self._suppress_requests_counter > 0 and self._rebuild_requests_during_suppression += 1
         else:
+            self._midi_map_statistics.rebuilds_requested += 1
             self._c_instance.request_rebuild_midi_map()
 
+    @property
+    def midi_map_statistics(self):
+        return self._midi_map_statistics
+
     def build_midi_map(self, midi_map_handle):
         """ Live -> Script
             Build DeviceParameter Mappings, that are processed in Audio time, or
@@ -296,9 +519,23 @@ class ControlSurface(SlotManager):
         with self._in_build_midi_map():
             self._forwarding_registry.clear()
             self._forwarding_long_identifier_registry.clear()
+            self._forwarding_long_identifier_lengths[:] = []
+            statistics = self._midi_map_statistics
+            statistics.rebuilds += 1
+            old_signatures = self._connection_signatures
+            new_signatures = {}
+            install_mapping = partial(self._install_mapping, midi_map_handle)
+            install_forwarding = partial(self._install_forwarding, midi_map_handle)
             for control in self.controls:
                 if isinstance(control, InputControlElement):
-                    control.install_connections(self._translate_message, partial(self._install_mapping, midi_map_handle), partial(self._install_forwarding, midi_map_handle))
+                    signature = control.connection_signature()
+                    new_signatures[control] = signature
+                    if old_signatures.get(control) != signature:
+                        statistics.controls_changed += 1
+                    statistics.controls_installed += 1
+                    control.install_connections(self._translate_message, install_mapping, install_forwarding)
+
+            self._connection_signatures = new_signatures
 
             if self._pad_translations != None:
                 self._c_instance.set_pad_translation(self._pad_translations)
@@ -340,10 +577,9 @@ class ControlSurface(SlotManager):
             parts of the controller
         """
         with self.component_guard():
-            with self._is_sending_scheduled_messages():
-                self._task_group.update(Defaults.TIMER_DELAY)
+            self._task_group.update(Defaults.TIMER_DELAY)
 
-    @profile
+    @profile(describe=_describe_midi_message)
     def receive_midi(self, midi_bytes):
         """ Live -> Script
             MIDI messages are only received through this function, when explicitly
@@ -351,6 +587,19 @@ class ControlSurface(SlotManager):
         """
         with self.component_guard():
             self._do_receive_midi(midi_bytes)
+            self._timed_messages.run_due()
+
+    @profile
+    def receive_midi_batch(self, messages):
+        """
+        Like receive_midi, but handles a whole burst of MIDI messages
+        within a single component guard.
+        """
+        with self.component_guard():
+            for midi_bytes in messages:
+                self._do_receive_midi(midi_bytes)
+
+            self._timed_messages.run_due()
 
     def is_sysex_message(self, midi_bytes):
         return len(midi_bytes) != 3
@@ -362,10 +611,7 @@ class ControlSurface(SlotManager):
             self.handle_sysex(midi_bytes)
 
     def get_recipient_for_nonsysex_midi_message(self, midi_bytes):
-        is_pitchbend = midi_bytes[0] & 240 == MIDI_PB_STATUS
-        forwarding_key = midi_bytes[:1 if is_pitchbend else 2]
-        if forwarding_key in self._forwarding_registry:
-            return self._forwarding_registry[forwarding_key]
+        return self._forwarding_registry.table[midi_bytes[0] << 7 | midi_bytes[1]]
 
     def handle_nonsysex(self, midi_bytes):
         is_pitchbend = midi_bytes[0] & 240 == MIDI_PB_STATUS
@@ -376,8 +622,21 @@ class ControlSurface(SlotManager):
         else:
             self.log_message('Got unknown message: ' + str(midi_bytes))
 
+    def get_recipient_for_sysex_midi_message(self, midi_bytes):
+        """
+        Returns the (identifier, control) pair registered for the
+        longest sysex prefix of midi_bytes, or None.  Only one lookup
+        per distinct registered prefix length is needed, independently
+        of how many prefixes are registered.
+        """
+        registry = self._forwarding_long_identifier_registry
+        for length in self._forwarding_long_identifier_lengths:
+            id = midi_bytes[:length]
+            if id in registry:
+                return (id, registry[id])
+
     def handle_sysex(self, midi_bytes):
-        result = find_if(lambda (id, _): midi_bytes[:len(id)] == id, self._forwarding_long_identifier_registry.iteritems())
+        result = self.get_recipient_for_sysex_midi_message(midi_bytes)
         if result != None:
             id, control = result
             control.receive_value(midi_bytes[len(id):-1])
@@ -407,13 +666,15 @@ class ControlSurface(SlotManager):
             self._set_suppress_rebuild_requests(False)
 
     def _set_suppress_rebuild_requests(self, suppress_requests):
-        if not not self._in_build_midi_map:
-            raise AssertionError
-            suppress_requests and self._suppress_requests_counter += 1
-        elif not self._suppress_requests_counter > 0:
-            raise AssertionError
+        if suppress_requests:
+            assert not self._in_build_midi_map
+            self._suppress_requests_counter += 1
+        else:
+            assert self._suppress_requests_counter > 0
             self._suppress_requests_counter -= 1
-            self._suppress_requests_counter == 0 and self._rebuild_requests_during_suppression > 0 and self.request_rebuild_midi_map()
+            if self._suppress_requests_counter == 0 and self._rebuild_requests_during_suppression > 0:
+                self._midi_map_statistics.rebuilds_coalesced += self._rebuild_requests_during_suppression - 1
+                self.request_rebuild_midi_map()
             self._rebuild_requests_during_suppression = 0
 
     def set_pad_translations(self, pad_translations):
@@ -441,30 +702,38 @@ class ControlSurface(SlotManager):
 
     def schedule_message(self, delay_in_ticks, callback, parameter = None):
         """ Schedule a callback to be called after a specified time """
-        if not delay_in_ticks > 0:
-            raise AssertionError
-            if not callable(callback):
-                raise AssertionError
-                self._is_sending_scheduled_messages or delay_in_ticks -= 1
-            message_reference = [None]
-
-            def message(delta):
-                if parameter:
-                    callback(parameter)
-                else:
-                    callback()
-                self._remaining_scheduled_messages.remove(message_reference)
+        assert delay_in_ticks > 0
+        assert callable(callback)
+        if parameter:
+            message = partial(callback, parameter)
+        else:
+            message = callback
+        return self._scheduled_messages.schedule(delay_in_ticks, message)
 
-            message_reference[0] = message
-            self._remaining_scheduled_messages.append(message_reference)
-            delay_in_ticks and self._task_group.add(Task.sequence(Task.delay(delay_in_ticks), message))
+    def schedule_timed_message(self, delay_in_seconds, callback, parameter = None):
+        """
+        Schedule a callback to be called after the given time has
+        elapsed.  Unlike schedule_message this is not quantised to the
+        timer period: pending callbacks are also checked whenever the
+        script receives MIDI or a listener notification.
+        """
+        assert delay_in_seconds >= 0
+        assert callable(callback)
+        if parameter:
+            message = partial(callback, parameter)
         else:
-            self._task_group.add(message)
+            message = callback
+        return self._timed_messages.schedule(delay_in_seconds, message)
+
+    def cancel_timed_message(self, entry):
+        """
+        Cancels a callback scheduled with schedule_timed_message, given
+        the entry it returned.
+        """
+        self._timed_messages.cancel(entry)
 
     def _process_remaining_scheduled_messages(self):
-        current_scheduled_messages = tuple(self._remaining_scheduled_messages)
-        for message, in current_scheduled_messages:
-            message(None)
+        self._scheduled_messages.flush()
 
     def set_feedback_channels(self, channels):
         self._c_instance.set_feedback_channels(channels)
@@ -504,22 +773,16 @@ class ControlSurface(SlotManager):
         self.set_highlighting_session_component(None)
         self.set_device_component(None)
 
-    @contextmanager
     def component_guard(self):
         """
         Context manager that guards user code.  This prevents
         unnecesary updating and enables several optimisations.  Should
         be used to guard calls to components or control elements.
         """
-        if not self._in_component_guard:
-            with self._in_component_guard():
-                with self.setting_listener_caller():
-                    with self._control_surface_injector:
-                        with self.suppressing_rebuild_requests():
-                            with self.accumulating_midi_messages():
-                                yield
-        else:
-            yield
+        return self._component_guard
+
+    def _create_component_guard(self):
+        return _ComponentGuard(self)
 
     @property
     def in_component_guard(self):
@@ -533,7 +796,7 @@ class ControlSurface(SlotManager):
         finally:
             self._c_instance.set_listener_caller(None)
 
-    @profile
+    @profile(describe=_describe_listener)
     def _call_guarded_listener(self, listener):
         if _ModuleLoadedCheck == None or self._c_instance == None:
             self.log_message('Disconnecting leaked listener at:', listener.name)
@@ -542,6 +805,7 @@ class ControlSurface(SlotManager):
             try:
                 with self.component_guard():
                     listener()
+                    self._timed_messages.run_due()
             except:
                 self.log_message('Detected broken listener at:', listener.name)
                 raise 
@@ -568,25 +832,62 @@ class ControlSurface(SlotManager):
         given (channel, key) has visible effects.
         """
         if self._accumulate_midi_messages:
-            sysex_status_byte = 240
-            entry = (self._midi_message_count, midi_event_bytes)
-            if optimized and midi_event_bytes[0] != sysex_status_byte:
-                self._midi_message_dict[midi_event_bytes[0], midi_event_bytes[1]] = entry
+            queue = self._midi_message_queue
+            position = self._midi_message_count
+            if optimized and midi_event_bytes[0] != SYSEX_STATUS_BYTE and len(midi_event_bytes) > 1:
+                slot = midi_event_bytes[0] << 8 | midi_event_bytes[1]
+                previous_position = self._midi_message_slots[slot]
+                if previous_position >= 0:
+                    queue[previous_position] = None
+                else:
+                    self._taken_midi_message_slots.append(slot)
+                self._midi_message_slots[slot] = position
+            if position < len(queue):
+                queue[position] = midi_event_bytes
             else:
-                self._midi_message_list.append(entry)
-            self._midi_message_count += 1
+                queue.append(midi_event_bytes)
+            self._midi_message_count = position + 1
         else:
             self._do_send_midi(midi_event_bytes)
         return True
 
     def _flush_midi_messages(self):
-        raise self._accumulate_midi_messages or AssertionError
-        for _, message in sorted(chain(self._midi_message_list, self._midi_message_dict.itervalues()), key=first):
-            self._do_send_midi(message)
+        """
+        Sends the accumulated messages in the order they were last
+        sent.  The queue is reused between flushes and superseded
+        messages are left as holes, so no sorting is needed.
+        """
+        assert self._accumulate_midi_messages
+        count = self._midi_message_count
+        if count > 0:
+            queue = self._midi_message_queue
+            slots = self._midi_message_slots
+            messages = [ message for message in islice(queue, count) if message is not None ]
+            self._midi_message_count = 0
+            for slot in self._taken_midi_message_slots:
+                slots[slot] = -1
 
-        self._midi_message_dict.clear()
-        self._midi_message_list[:] = []
-        self._midi_message_count = 0
+            del self._taken_midi_message_slots[:]
+
+            self._do_send_midi_many(messages)
+
+    def _do_send_midi_many(self, messages):
+        """
+        Sends several messages at once.  Uses the bulk send_midi_many
+        of the c_instance when available, unless _do_send_midi is
+        specialised.
+        """
+        if self._send_midi_many is not None:
+            try:
+                self._send_midi_many(messages)
+            except:
+                self.log_message('Error while sending midi messages', messages)
+                traceback.print_exc()
+                return False
+
+            return True
+        else:
+            return all(map(self._do_send_midi, messages))
 
     def _do_send_midi(self, midi_event_bytes):
         try:
@@ -649,11 +950,19 @@ class ControlSurface(SlotManager):
             forwarding_keys = success and control.identifier_bytes()
             for key in forwarding_keys:
                 registry = self._forwarding_registry if control.message_type() != MIDI_SYSEX_TYPE else self._forwarding_long_identifier_registry
-                raise key not in registry.keys() or AssertionError, 'Registry key %s registered twice. Check Midi messages!' % str(key)
+                raise key not in registry or AssertionError, 'Registry key %s registered twice. Check Midi messages!' % str(key)
                 registry[key] = control
+                if registry is self._forwarding_long_identifier_registry:
+                    self._register_long_identifier_length(len(key))
 
         return success
 
+    def _register_long_identifier_length(self, length):
+        lengths = self._forwarding_long_identifier_lengths
+        if length not in lengths:
+            lengths.append(length)
+            lengths.sort(reverse=True)
+
     def _translate_message(self, type, from_identifier, from_channel, to_identifier, to_channel):
         if not type in (MIDI_CC_TYPE, MIDI_NOTE_TYPE):
             raise AssertionError
@@ -733,9 +1042,5 @@ class OptimizedControlSurface(ControlSurface):
         injecting = inject(element_ownership_handler=const(self._optimized_ownership_handler))
         self._ownership_handler_injector = injecting.everywhere()
 
-    @contextmanager
-    def component_guard(self):
-        with super(OptimizedControlSurface, self).component_guard():
-            with self._ownership_handler_injector:
-                yield
-                self._optimized_ownership_handler.commit_ownership_changes()
\ No newline at end of file
+    def _create_component_guard(self):
+        return _OptimizedComponentGuard(self)
\ No newline at end of file
@@ -12,25 +12,33 @@ in general will be called whenever they are needed.
 from __future__ import absolute_import
 __all__ = ('inject', 'depends', 'dependency')
 from functools import wraps
-from .Util import union
 
 class DependencyError(Exception):
     pass
 
 
 class InjectionRegistry(object):
+    """
+    Keeps the injectors providing every key.  The 'generation' is
+    increased whenever an injector is registered or unregistered, so
+    that clients can cache what they looked up as long as it does not
+    change.
+    """
 
     def __init__(self, parent = None, *a, **k):
         super(InjectionRegistry, self).__init__(*a, **k)
         self._key_registry = {}
+        self.generation = 0
 
     def register_key(self, key, injector):
         self._key_registry.setdefault(key, []).append(injector)
+        self.generation += 1
 
     def unregister_key(self, key, injector):
         self._key_registry[key].remove(injector)
         if not self._key_registry[key]:
             del self._key_registry[key]
+        self.generation += 1
 
     def get(self, key, default = None):
         try:
@@ -49,6 +57,27 @@ def get_dependency_for(obj, name, default = None):
         raise DependencyError('Required dependency %s not provided for %s' % (name, str(obj)))
 
 
+class _AccessorCache(object):
+    """
+    Resolves the accessors for a fixed set of dependencies, only
+    looking them up again when the generation of the injection
+    registry changes.
+    """
+
+    def __init__(self, dependencies, *a, **k):
+        super(_AccessorCache, self).__init__(*a, **k)
+        self._dependencies = tuple(dependencies.iteritems())
+        self._generation = -1
+        self._accessors = ()
+
+    def accessors(self):
+        registry = _global_injection_registry
+        if self._generation != registry.generation:
+            self._accessors = tuple([ (name, registry.get(name, default)) for name, default in self._dependencies ])
+            self._generation = registry.generation
+        return self._accessors
+
+
 class dependency(object):
     """
     Data descriptor that provides a given dependency looking as an
@@ -68,11 +97,15 @@ class dependency(object):
     def __init__(self, **k):
         raise len(k) == 1 or AssertionError
         self._dependency_name, self._dependency_default = k.items()[0]
+        self._accessor_cache = _AccessorCache(k)
 
     def __get__(self, obj, cls = None):
         if obj is None:
             obj = cls
-        return get_dependency_for(obj, self._dependency_name, self._dependency_default)
+        (name, accessor), = self._accessor_cache.accessors()
+        if accessor is None:
+            raise DependencyError('Required dependency %s not provided for %s' % (name, str(obj)))
+        return accessor()
 
 
 def depends(**dependencies):
@@ -101,11 +134,17 @@ def depends(**dependencies):
     """
 
     def decorator(func):
+        accessor_cache = _AccessorCache(dependencies)
 
         @wraps(func)
         def wrapper(self, *a, **explicit):
-            deps = dict([ (k, get_dependency_for(self, k, v)) for k, v in dependencies.iteritems() if k not in explicit ])
-            return func(self, *a, **union(deps, explicit))
+            for name, accessor in accessor_cache.accessors():
+                if name not in explicit:
+                    if accessor is None:
+                        raise DependencyError('Required dependency %s not provided for %s' % (name, str(self)))
+                    explicit[name] = accessor()
+
+            return func(self, *a, **explicit)
 
         return wrapper
 
@@ -8,30 +8,71 @@ banking to the C++ code is the best mid-term solution.
 """
 from __future__ import absolute_import
 from .SubjectSlot import Subject
+COMPACT_REGISTRY_SIZE = 32
+
+def device_key(device):
+    """
+    Returns what identifies the given device in the registry. Live
+    hands out a new wrapper every time an object is accessed, which
+    compares equal to the other wrappers of the object, but is not the
+    same. The address of the wrapped object in _live_ptr is the same for
+    all of them. Returns None for objects without one, which the
+    registry then finds by comparing them to its devices.
+    """
+    return getattr(device, '_live_ptr', None)
+
 
 class DeviceBankRegistry(Subject):
+    """
+    Keeps the selected bank of every device by its key. The device is
+    kept too, to tell whether it has been deleted in the meantime
+    (deleted Live objects compare equal to None), in which case its
+    entry is dropped, as another device might now live at its address.
+    Entries of deleted devices are also dropped whenever the registry
+    has doubled in size. Devices without a key are kept under
+    themselves and found by comparing them to the registered devices.
+    """
     __subject_events__ = ('device_bank',)
 
     def __init__(self, *a, **k):
         super(DeviceBankRegistry, self).__init__(*a, **k)
         self._device_bank_registry = {}
         self._device_bank_listeners = []
+        self._compact_size = COMPACT_REGISTRY_SIZE
+
+    @property
+    def size(self):
+        """ Number of devices in the registry """
+        return len(self._device_bank_registry)
 
     def compact_registry(self):
-        newreg = dict(filter(lambda (k, _): k != None, self._device_bank_registry.items()))
-        self._device_bank_registry = newreg
+        self._device_bank_registry = dict(filter(lambda (_, (device, bank)): device != None, self._device_bank_registry.iteritems()))
+        self._compact_size = max(COMPACT_REGISTRY_SIZE, 2 * len(self._device_bank_registry))
 
     def set_device_bank(self, device, bank):
-        if not self._find_device_bank_key(device):
-            key = device
-            old = self._device_bank_registry[key] if key in self._device_bank_registry else 0
-            self._device_bank_registry[key] = old != bank and bank
+        old = self.get_device_bank(device)
+        if old != bank:
+            self._device_bank_registry[self._find_device_bank_key(device)] = (device, bank)
+            if len(self._device_bank_registry) > self._compact_size:
+                self.compact_registry()
             self.notify_device_bank(device, bank)
 
     def get_device_bank(self, device):
-        return self._device_bank_registry.get(self._find_device_bank_key(device), 0)
+        key = self._find_device_bank_key(device)
+        entry = self._device_bank_registry.get(key)
+        if entry != None:
+            if entry[0] != None or device == None:
+                return entry[1]
+            del self._device_bank_registry[key]
+        return 0
 
     def _find_device_bank_key(self, device):
-        for k in self._device_bank_registry.iterkeys():
-            if k == device:
-                return k
\ No newline at end of file
+        key = device_key(device)
+        if key is not None:
+            return key
+        for key, (registered_device, _) in self._device_bank_registry.iteritems():
+            if registered_device == device:
+                return key
+
+        return device
+
@@ -1,7 +1,7 @@
 #Embedded file name: /Users/versonator/Jenkins/live/Binary/Core_Release_64_static/midi-remote-scripts/_Framework/DeviceComponent.py
 from __future__ import absolute_import
 import Live
-from _Generic.Devices import device_parameters_to_map, number_of_parameter_banks, parameter_banks, parameter_bank_names, best_of_parameter_bank
+from _Generic.Devices import device_parameters_to_map, number_of_parameter_banks, parameter_banks, parameter_bank_names, ParameterBankCache
 from .ButtonElement import ButtonElement
 from .ControlSurfaceComponent import ControlSurfaceComponent
 from .DeviceBankRegistry import DeviceBankRegistry
@@ -16,6 +16,7 @@ class DeviceComponent(ControlSurfaceComponent, Subject):
         super(DeviceComponent, self).__init__(*a, **k)
         self._device_bank_registry = device_bank_registry or DeviceBankRegistry()
         self._device = None
+        self._parameter_bank_cache = ParameterBankCache()
         self._parameter_controls = None
         self._bank_up_button = None
         self._bank_down_button = None
@@ -244,6 +245,7 @@ class DeviceComponent(ControlSurfaceComponent, Subject):
             self._device_name_data_source.set_display_string(self._device.name if self.is_enabled() and self._device != None else 'No Device')
 
     def _on_parameters_changed(self):
+        self._parameter_bank_cache.invalidate()
         self.update()
 
     def _on_off_parameter(self):
@@ -283,11 +285,14 @@ class DeviceComponent(ControlSurfaceComponent, Subject):
                 self._bank_down_button.set_light(self._device and can_bank_down)
 
     def _best_of_parameter_bank(self):
-        return best_of_parameter_bank(self._device)
+        return self._parameter_bank_cache.best_of_parameter_bank(self._device)
 
     def _parameter_banks(self):
         return parameter_banks(self._device)
 
+    def _parameter_bank(self, bank_index):
+        return self._parameter_bank_cache.parameter_bank(self._device, bank_index)
+
     def _parameter_bank_names(self):
         return parameter_bank_names(self._device)
 
@@ -301,11 +306,10 @@ class DeviceComponent(ControlSurfaceComponent, Subject):
         bank_name = self._bank_name
         bank = []
         best_of = self._best_of_parameter_bank()
-        banks = self._parameter_banks()
-        if banks:
+        if self._number_of_parameter_banks() > 0:
             if self._bank_index != None and self._is_banking_enabled() or not best_of:
                 index = self._bank_index if self._bank_index != None else 0
-                bank = banks[index]
+                bank = self._parameter_bank(index)
                 bank_name = self._parameter_bank_names()[index]
             else:
                 bank = best_of
@@ -19,8 +19,7 @@ class IdentifiableControlSurface(ControlSurface):
         raise product_id_bytes is not None or AssertionError
         raise len(product_id_bytes) < 12 or AssertionError
         self._product_id_bytes = product_id_bytes
-        self._request_task = self._tasks.add(Task.sequence(Task.wait(self.identity_request_delay), Task.run(self._send_identity_request)))
-        self._request_task.kill()
+        self._request_task = self._tasks.add(Task.TimedCallback(self.identity_request_delay, self._send_identity_request, schedule_timed_message=self.schedule_timed_message, cancel_timed_message=self.cancel_timed_message))
 
     def on_identified(self):
         raise NotImplementedError
@@ -8,7 +8,7 @@ from .Disconnectable import Disconnectable
 from .NotifyingControlElement import NotifyingControlElement
 from .Signal import Signal
 from .SubjectSlot import SubjectEvent
-from .Util import in_range, const, nop
+from .Util import in_range, const, memoize, nop
 MIDI_NOTE_TYPE = 0
 MIDI_CC_TYPE = 1
 MIDI_PB_TYPE = 2
@@ -23,6 +23,12 @@ MIDI_NOTE_ON_STATUS = 144
 MIDI_NOTE_OFF_STATUS = 128
 MIDI_CC_STATUS = 176
 MIDI_PB_STATUS = 224
+_NOTE_AND_CC_FEEDBACK_VALUES = tuple(range(128))
+
+@memoize
+def _pitchbend_feedback_values():
+    return tuple([ (value >> 7 & 127, value & 127) for value in xrange(16384) ])
+
 
 class ParameterSlot(Disconnectable):
     """
@@ -245,15 +251,26 @@ class InputControlElement(NotifyingControlElement):
         value_map = tuple()
         if self._mapping_feedback_delay != 0:
             if self._msg_type != MIDI_PB_TYPE:
-                value_map = tuple(range(128))
+                value_map = _NOTE_AND_CC_FEEDBACK_VALUES
             else:
-                value_pairs = []
-                for value in xrange(16384):
-                    value_pairs.append((value >> 7 & 127, value & 127))
-
-                value_map = tuple(value_pairs)
+                value_map = _pitchbend_feedback_values()
         return value_map
 
+    def connection_signature(self):
+        """
+        Returns a tuple describing everything install_connections
+        depends on.  Whenever it changes, the connections installed for
+        this control in the MIDI map change as well.
+        """
+        return (self._msg_type,
+         self._msg_channel,
+         self._msg_identifier,
+         self._original_channel,
+         self._original_identifier,
+         self._parameter_to_map_to,
+         self._mapping_feedback_delay,
+         self.script_wants_forwarding())
+
     def install_connections(self, install_translation, install_mapping, install_forwarding):
         self._send_delayed_messages_task.kill()
         self._is_mapped = False
@@ -16,6 +16,7 @@ class LogicalDisplaySegment(object):
         self._position_identifier = ()
         self._data_source = None
         self._display_string = None
+        self._encoded_message = None
 
     def disconnect(self):
         self._update_callback = None
@@ -40,10 +41,26 @@ class LogicalDisplaySegment(object):
         Sets position identifier as a tuple of HW related data.
         """
         self._position_identifier = position_identifier
+        self._encoded_message = None
 
     def position_identifier(self):
         return self._position_identifier
 
+    def encoded_message(self, translator):
+        """
+        Returns the display string together with the position identifier
+        followed by the display string translated by 'translator', as a
+        bytearray.  The translation is cached until the display string,
+        the position identifier or the translator change.
+        """
+        display_string = self.display_string()
+        cache = self._encoded_message
+        if cache is None or cache[0] is not translator or cache[1] != display_string:
+            message = bytearray(self._position_identifier or ())
+            message += translator.translate(display_string)
+            self._encoded_message = cache = (translator, display_string, message)
+        return (cache[1], cache[2])
+
     def update(self):
         if self._update_callback:
             self._display_string = self._get_display_string()
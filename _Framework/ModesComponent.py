@@ -13,7 +13,7 @@ from .Dependency import depends
 from .Layer import Layer
 from .Resource import StackingResource
 from .SubjectSlot import subject_slot
-from .Util import is_iterable, is_contextmanager, lazy_attribute, infinite_context_manager, NamedTuple
+from .Util import is_iterable, is_contextmanager, lazy_attribute, infinite_context_manager, NamedTuple, nop
 
 def tomode(thing):
     if thing == None:
@@ -264,8 +264,7 @@ class DelayMode(Mode):
         delay = delay or Defaults.MOMENTARY_DELAY
         self._mode = tomode(mode)
         self._mode_entered = False
-        self._delay_task = parent_task_group.add(Task.sequence(Task.wait(delay), Task.run(self._enter_mode_delayed)))
-        self._delay_task.kill()
+        self._delay_task = parent_task_group.add(Task.TimedCallback(delay, self._enter_mode_delayed))
 
     def _enter_mode_delayed(self):
         self._mode_entered = True
@@ -542,8 +541,7 @@ class ModesComponent(CompoundComponent):
         super(ModesComponent, self).__init__(*a, **k)
         self._last_toggle_value = 0
         self._mode_toggle = None
-        self._mode_toggle_task = self._tasks.add(Task.wait(Defaults.MOMENTARY_DELAY))
-        self._mode_toggle_task.kill()
+        self._mode_toggle_task = self._tasks.add(Task.TimedCallback(Defaults.MOMENTARY_DELAY, nop))
         self._mode_list = []
         self._mode_map = {}
         self._last_selected_mode = None
@@ -664,8 +662,7 @@ class ModesComponent(CompoundComponent):
             if not isinstance(groups, set):
                 groups = set(groups)
             mode = tomode(mode_or_component)
-            task = self._tasks.add(Task.sequence(Task.wait(Defaults.MOMENTARY_DELAY), Task.run(lambda : self._get_mode_behaviour(name).press_delayed(self, name))))
-            task.kill()
+            task = self._tasks.add(Task.TimedCallback(Defaults.MOMENTARY_DELAY, lambda : self._get_mode_behaviour(name).press_delayed(self, name)))
             slot = self.register_slot(listener=partial(self._on_mode_button_value, name), event='value', extra_kws=dict(identify_sender=True))
             self._mode_list.append(name)
             self._mode_map[name] = _ModeEntry(mode=mode, toggle_value=toggle_value, behaviour=behaviour, subject_slot=slot, momentary_task=task, groups=groups)
@@ -34,6 +34,82 @@ class _DisplayCentralResource(StackingResource):
         return list(reversed(map(first, ifilter(filter_client, reversed(self._clients)))))
 
 
+class DisplayTranslator(object):
+    """
+    A translation table compiled into 256-entry lookups, one for byte
+    strings and one for unicode strings, which only differ in how
+    characters above ASCII are looked up.  Characters missing from the
+    table translate to the code of '?'.  When all codes fit in a byte,
+    whole strings are translated with str.translate into a bytearray.
+    """
+
+    def __init__(self, translation_table = None, *a, **k):
+        super(DisplayTranslator, self).__init__(*a, **k)
+        self._table = translation_table
+        self._unknown = unknown = translation_table.get('?', 63)
+        self._str_codes = str_codes = [unknown] * 256
+        self._unicode_codes = unicode_codes = [unknown] * 256
+        for char, code in translation_table.iteritems():
+            if len(char) == 1 and ord(char) < 256:
+                if isinstance(char, str) or ord(char) < 128:
+                    str_codes[ord(char)] = code
+                if isinstance(char, unicode) or ord(char) < 128:
+                    unicode_codes[ord(char)] = code
+
+        self.produces_bytes = all((0 <= code < 256 for code in chain(str_codes, unicode_codes)))
+        if self.produces_bytes:
+            self._str_translation = ''.join(map(chr, str_codes))
+            self._unicode_translation = ''.join(map(chr, unicode_codes))
+
+    def translate_char(self, char):
+        try:
+            code = ord(char)
+        except TypeError:
+            return self._unknown
+
+        if code < 256:
+            if isinstance(char, unicode):
+                return self._unicode_codes[code]
+            return self._str_codes[code]
+        return self._table.get(char, self._unknown)
+
+    def translate(self, string):
+        """
+        Translates a string, or any other sequence of characters.
+        """
+        if self.produces_bytes:
+            if not isinstance(string, basestring):
+                return bytearray(map(self.translate_char, string))
+            elif isinstance(string, unicode):
+                try:
+                    return bytearray(string.encode('latin-1').translate(self._unicode_translation))
+                except UnicodeEncodeError:
+                    return bytearray(map(self.translate_char, string))
+
+            else:
+                return bytearray(string.translate(self._str_translation))
+        return map(self.translate_char, string)
+
+
+_translators = {}
+
+def compile_translation_table(translation_table):
+    """
+    Returns the DisplayTranslator for the given translation table,
+    compiling it only the first time.
+    """
+    try:
+        table, translator = _translators[id(translation_table)]
+        if table is translation_table:
+            return translator
+    except KeyError:
+        pass
+
+    translator = DisplayTranslator(translation_table)
+    _translators[id(translation_table)] = (translation_table, translator)
+    return translator
+
+
 class DisplayError(Exception):
     pass
 
@@ -227,7 +303,7 @@ class PhysicalDisplayElement(DisplayElement, NotifyingControlElement):
     def __init__(self, *a, **k):
         self._central_resource = _DisplayCentralResource(root_display=self, on_received_callback=self._on_central_resource_received, on_lost_callback=self._on_central_resource_lost)
         super(PhysicalDisplayElement, self).__init__(resource_type=self.nested_display_resource_factory(self), *a, **k)
-        self._translation_table = self._ascii_translations
+        self._translator = compile_translation_table(self._ascii_translations)
         self._message_header = None
         self._message_tail = None
         self._message_clear_all = None
@@ -236,6 +312,15 @@ class PhysicalDisplayElement(DisplayElement, NotifyingControlElement):
         self._block_messages = False
         self._send_message_task = self._tasks.add(Task.run(self._send_message))
         self._send_message_task.kill()
+        self._translates_chars_itself = self._translate_char.im_func is not PhysicalDisplayElement._translate_char.im_func
+
+    def _get_translation_table(self):
+        return self._translator._table
+
+    def _set_translation_table(self, translation_table):
+        self._translator = compile_translation_table(translation_table)
+
+    _translation_table = property(_get_translation_table, _set_translation_table)
 
     def nested_display_resource_factory(self, display):
         wrapper = ClientWrapper(wrap=lambda c: (display, c), unwrap=partial(maybe(second)))
@@ -324,17 +409,35 @@ class PhysicalDisplayElement(DisplayElement, NotifyingControlElement):
             self.send_midi(self._message_to_send)
 
     def _translate_char(self, char_to_translate):
-        result = 63
-        if char_to_translate in self._translation_table.keys():
-            result = self._translation_table[char_to_translate]
-        else:
-            result = self._translation_table['?']
-        return result
+        return self._translator.translate_char(char_to_translate)
 
     def _translate_string(self, string):
-        return map(self._translate_char, string)
+        if self._translates_chars_itself:
+            return map(self._translate_char, string)
+        return self._translator.translate(string)
 
     def _build_display_message(self, display):
+        """
+        Returns the position identifiers and translated strings of the
+        segments of the display.  The translation of every segment is
+        cached by the segment, so that only changed segments are
+        translated again.
+        """
+        translator = self._translator
+        if translator.produces_bytes and not self._translates_chars_itself:
+            width_per_segment = display._width_per_segment
+            message = bytearray()
+            for segment in display._logical_segments:
+                display_string, segment_message = segment.encoded_message(translator)
+                if len(display_string) != width_per_segment:
+                    break
+                message += segment_message
+            else:
+                return message
+
+        return self._build_display_message_by_grouping(display)
+
+    def _build_display_message_by_grouping(self, display):
         message_string = display.display_string
         segments = display._logical_segments
         width_per_segment = display._width_per_segment
@@ -342,17 +445,17 @@ class PhysicalDisplayElement(DisplayElement, NotifyingControlElement):
         def wrap_segment_message(message, segment):
             return chain(segment.position_identifier(), self._translate_string(message))
 
-        return chain(*starmap(wrap_segment_message, izip(group(message_string, width_per_segment), segments)))
+        return list(chain(*starmap(wrap_segment_message, izip(group(message_string, width_per_segment), segments))))
 
     def _build_inner_message(self, displays):
-        message = list(self._build_display_message(self))
+        message = self._build_display_message(self)
         for display in displays:
             message[display.display_slice] = self._build_display_message(display)
 
         return message
 
     def _build_message(self, displays):
-        return tuple(chain(self._message_header, self._build_inner_message(displays), self._message_tail))
+        return tuple(self._message_header) + tuple(self._build_inner_message(displays)) + tuple(self._message_tail)
 
 
 class SubDisplayElement(DisplayElement):
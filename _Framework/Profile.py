@@ -1,15 +1,163 @@
 #Embedded file name: /Users/versonator/Jenkins/live/Binary/Core_Release_64_static/midi-remote-scripts/_Framework/Profile.py
 from __future__ import absolute_import
 from functools import wraps, partial
+from heapq import heappush, heapreplace
+from itertools import count
+from timeit import default_timer
 ENABLE_PROFILING = False
+ENABLE_INSTRUMENTATION = True
+SLOW_CALL_THRESHOLD = 0.01
+SLOW_CALL_BUFFER_SIZE = 32
 if ENABLE_PROFILING:
     import cProfile
     PROFILER = cProfile.Profile()
 
-def profile(fn):
+class EntryPointStatistics(object):
+    """
+    Call count and wall time spent in one profiled entry point.  Times
+    are in seconds.
+    """
+
+    def __init__(self, name = None, *a, **k):
+        super(EntryPointStatistics, self).__init__(*a, **k)
+        self.name = name
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def as_dict(self):
+        return {'calls': self.calls,
+         'total_ms': self.total_time * 1000.0,
+         'mean_ms': self.total_time * 1000.0 / self.calls if self.calls else 0.0,
+         'max_ms': self.max_time * 1000.0}
+
+
+class Instrumentation(object):
+    """
+    Lightweight, always-on measurement of the entry points decorated
+    with profile.  Every call costs two clock reads and a few additions.
+    Of the calls taking longer than 'slow_call_threshold' seconds, the
+    'slow_call_buffer_size' slowest are kept, with a description of
+    what was being called, in a min-heap on their duration.
+    """
+
+    def __init__(self, slow_call_threshold = SLOW_CALL_THRESHOLD, slow_call_buffer_size = SLOW_CALL_BUFFER_SIZE, *a, **k):
+        super(Instrumentation, self).__init__(*a, **k)
+        self.slow_call_threshold = slow_call_threshold
+        self.entry_points = {}
+        self.slow_call_buffer_size = slow_call_buffer_size
+        self._slow_calls = []
+        self._slow_call_order = count()
+
+    def entry_point(self, name):
+        """
+        Returns the statistics of the entry point with the given name,
+        creating them if needed.
+        """
+        try:
+            return self.entry_points[name]
+        except KeyError:
+            self.entry_points[name] = statistics = EntryPointStatistics(name)
+            return statistics
+
+    @property
+    def slow_calls(self):
+        """
+        The slowest calls so far as (name, duration, description),
+        slowest first.
+        """
+        return [ (name, duration, description) for duration, _, name, description in sorted(self._slow_calls, reverse=True) ]
+
+    def report_slow_call(self, name, duration, description = None):
+        call = (duration,
+         next(self._slow_call_order),
+         name,
+         description)
+        if len(self._slow_calls) < self.slow_call_buffer_size:
+            heappush(self._slow_calls, call)
+        elif self._slow_calls and duration > self._slow_calls[0][0]:
+            heapreplace(self._slow_calls, call)
+
+    def reset(self):
+        self.entry_points.clear()
+        self._slow_calls = []
+
+    def as_dict(self):
+        return {'entry_points': dict([ (name, statistics.as_dict()) for name, statistics in self.entry_points.iteritems() ]),
+         'slow_calls': [ {'entry_point': name,
+                        'ms': duration * 1000.0,
+                        'description': description} for name, duration, description in self.slow_calls ]}
+
+    def dump(self, stream, as_json = False):
+        """
+        Writes a report to the given stream, as text or as JSON.
+        """
+        if as_json:
+            import json
+            json.dump(self.as_dict(), stream, indent=1, sort_keys=True)
+            stream.write('\n')
+            return
+        stream.write('%-32s %10s %12s %10s %10s\n' % ('entry point', 'calls', 'total ms', 'mean ms', 'max ms'))
+        for name in sorted(self.entry_points):
+            values = self.entry_points[name].as_dict()
+            stream.write('%-32s %10d %12.3f %10.3f %10.3f\n' % (name,
+             values['calls'],
+             values['total_ms'],
+             values['mean_ms'],
+             values['max_ms']))
+
+        slow_calls = self.slow_calls
+        if slow_calls:
+            stream.write('\nslowest calls above %.1f ms:\n' % (self.slow_call_threshold * 1000.0))
+            for name, duration, description in slow_calls:
+                stream.write('%10.3f ms  %s  %s\n' % (duration * 1000.0, name, description or ''))
+
+
+INSTRUMENTATION = Instrumentation()
+
+def _instrumented(fn, describe):
+    statistics = INSTRUMENTATION.entry_point(fn.__name__)
+
+    @wraps(fn)
+    def wrapper(self, *a, **k):
+        start = default_timer()
+        try:
+            return fn(self, *a, **k)
+        finally:
+            duration = default_timer() - start
+            statistics.calls += 1
+            statistics.total_time += duration
+            if duration > statistics.max_time:
+                statistics.max_time = duration
+            if duration > INSTRUMENTATION.slow_call_threshold:
+                INSTRUMENTATION.report_slow_call(statistics.name, duration, _describe_call(describe, self, a, k))
+
+    return wrapper
+
+
+def _describe_call(describe, obj, a, k):
+    if describe is None:
+        return obj.__class__.__name__
+    try:
+        return describe(obj, *a, **k)
+    except Exception:
+        return obj.__class__.__name__
+
+
+def profile(fn = None, describe = None):
     """
     Decorator to mark a function to be profiled. Only mark top level functions
+
+    The calls are always counted and timed by INSTRUMENTATION.  When
+    given, 'describe' is called with the same arguments as the
+    function for calls that turn out to be slow, and its result is
+    kept with them, e.g. the name of the listener being called.  Can be
+    used as @profile or @profile(describe=...).
     """
+    if fn is None:
+        return partial(profile, describe=describe)
+    if ENABLE_INSTRUMENTATION:
+        fn = _instrumented(fn, describe)
     if ENABLE_PROFILING:
 
         @wraps(fn)
@@ -25,16 +173,23 @@ def profile(fn):
         return fn
 
 
-def dump(name = 'default'):
-    raise ENABLE_PROFILING or AssertionError
-    import pstats
-    fname = name + '.profile'
-    PROFILER.dump_stats(fname)
+def dump(name = 'default', as_json = False):
+    """
+    Writes the instrumentation report to '<name>.instrumentation.txt'
+    (or '.json'), and the profiler statistics too when profiling is
+    enabled.
+    """
+    with open('%s.instrumentation.%s' % (name, 'json' if as_json else 'txt'), 'w') as f:
+        INSTRUMENTATION.dump(f, as_json)
+    if ENABLE_PROFILING:
+        import pstats
+        fname = name + '.profile'
+        PROFILER.dump_stats(fname)
 
-    def save_human_data(sort):
-        s = pstats.Stats(fname, stream=open('%s.%s.txt' % (fname, sort), 'w'))
-        s.sort_stats(sort)
-        s.print_stats()
+        def save_human_data(sort):
+            s = pstats.Stats(fname, stream=open('%s.%s.txt' % (fname, sort), 'w'))
+            s.sort_stats(sort)
+            s.print_stats()
 
-    save_human_data('time')
-    save_human_data('cumulative')
\ No newline at end of file
+        save_human_data('time')
+        save_human_data('cumulative')
@@ -1,6 +1,6 @@
 #Embedded file name: /Users/versonator/Jenkins/live/Binary/Core_Release_64_static/midi-remote-scripts/_Framework/SceneComponent.py
 from __future__ import absolute_import
-from .ClipSlotComponent import ClipSlotComponent, find_nearest_color
+from .ClipSlotComponent import ClipSlotComponent, quantizer_for_table
 from .CompoundComponent import CompoundComponent
 from .SubjectSlot import subject_slot
 from .Util import in_range, nop
@@ -20,6 +20,7 @@ class SceneComponent(CompoundComponent):
         self._tracks_to_use_callback = tracks_to_use_callback
         self._color_palette = None
         self._color_table = None
+        self._color_quantizer = None
         for _ in range(num_slots):
             new_slot = self._create_clip_slot()
             self._clip_slots.append(new_slot)
@@ -74,9 +75,10 @@ class SceneComponent(CompoundComponent):
         self._scene_value = None
         self._color_palette = palette
 
-    def set_color_table(self, table):
+    def set_color_table(self, table, use_lookup_cube = False):
         self._scene_value = None
         self._color_table = table
+        self._color_quantizer = quantizer_for_table(table, use_lookup_cube) if table else None
 
     def clip_slot(self, index):
         return self._clip_slots[index]
@@ -165,8 +167,8 @@ class SceneComponent(CompoundComponent):
         value = None
         if self._color_palette:
             value = self._color_palette.get(color, None)
-        if value is None and self._color_table:
-            value = find_nearest_color(self._color_table, color)
+        if value is None and self._color_quantizer:
+            value = self._color_quantizer.nearest(color)
         return value
 
     def _update_launch_button(self):
@@ -21,6 +21,7 @@ class SessionComponent(CompoundComponent):
     _highlighting_callback = None
     _session_component_ends_initialisation = True
     scene_component_type = SceneComponent
+    track_listener_margin = 2
 
     def __init__(self, num_tracks = 0, num_scenes = 0, auto_name = False, enable_skinning = False, *a, **k):
         super(SessionComponent, self).__init__(*a, **k)
@@ -54,6 +55,7 @@ class SessionComponent(CompoundComponent):
             self._next_scene_button = None
             self._prev_scene_button = None
             self._stop_track_clip_buttons = None
+            self._listened_tracks = {}
             self._stop_clip_triggered_value = 127
             self._stop_clip_value = None
             self._highlighting_callback = None
@@ -219,7 +221,7 @@ class SessionComponent(CompoundComponent):
 
     def set_stop_track_clip_buttons(self, buttons):
         self._stop_track_clip_buttons = buttons
-        self._on_stop_track_value.replace_subjects(buttons or [])
+        self._on_stop_track_value.replace_subjects(buttons or [], count())
         self._update_stop_track_clip_buttons()
 
     def set_stop_clip_triggered_value(self, value):
@@ -293,7 +295,7 @@ class SessionComponent(CompoundComponent):
             self._show_highlight = show_highlight
             self._do_show_highlight()
 
-    def set_rgb_mode(self, color_palette, color_table, clip_slots_only = False):
+    def set_rgb_mode(self, color_palette, color_table, clip_slots_only = False, use_lookup_cube = False):
         """
         Put the session into rgb mode by providing a color table and a color palette.
         color_palette is a dictionary, mapping custom Live colors to MIDI ids. This can be
@@ -302,16 +304,18 @@ class SessionComponent(CompoundComponent):
         second is the RGB color is represents. The table will be used to find the nearest
         matching color for a custom color. The table is used if there is no entry in the
         palette.
+        With use_lookup_cube, the nearest colors are looked up in a precomputed cube,
+        which is faster but approximate (see ColorTableQuantizer).
         """
         for y in xrange(self._num_scenes):
             scene = self.scene(y)
             if not clip_slots_only:
                 scene.set_color_palette(color_palette)
-                scene.set_color_table(color_table)
+                scene.set_color_table(color_table, use_lookup_cube)
             for x in xrange(self._num_tracks):
                 slot = scene.clip_slot(x)
                 slot.set_clip_palette(color_palette)
-                slot.set_clip_rgb_table(color_table)
+                slot.set_clip_rgb_table(color_table, use_lookup_cube)
 
     def on_enabled_changed(self):
         self.update()
@@ -453,14 +457,36 @@ class SessionComponent(CompoundComponent):
         self._vertical_paginator.update()
 
     def _reassign_tracks(self):
-        tracks_to_use = self.tracks_to_use()
-        self._on_fired_slot_index_changed.replace_subjects(tracks_to_use, count())
-        self._on_playing_slot_index_changed.replace_subjects(tracks_to_use, count())
+        self._update_track_listeners(self.tracks_to_use())
         self._horizontal_banking.update()
         self._horizontal_paginator.update()
         self._update_stop_all_clips_button()
         self._update_stop_track_clip_buttons()
 
+    def _update_track_listeners(self, tracks_to_use):
+        """
+        Listens to the fired and playing slots of the tracks in view
+        and of 'track_listener_margin' tracks on either side.  Only the
+        tracks that entered or left that window, or that were replaced
+        by another track at their index, are connected or disconnected.
+        """
+        margin = self.track_listener_margin
+        first_index = max(0, self._track_offset - margin)
+        end_index = min(len(tracks_to_use), self._track_offset + self._num_tracks + margin)
+        listened_tracks = self._listened_tracks
+        for index, track in listened_tracks.items():
+            if not in_range(index, first_index, end_index) or tracks_to_use[index] != track:
+                self._on_fired_slot_index_changed.remove_subject(track)
+                self._on_playing_slot_index_changed.remove_subject(track)
+                del listened_tracks[index]
+
+        for index in xrange(first_index, end_index):
+            if index not in listened_tracks:
+                track = tracks_to_use[index]
+                self._on_fired_slot_index_changed.add_subject(track, identifier=index)
+                self._on_playing_slot_index_changed.add_subject(track, identifier=index)
+                listened_tracks[index] = track
+
     @subject_slot('value')
     def _on_stop_all_value(self, value):
         self._stop_all_value(value)
@@ -492,11 +518,11 @@ class SessionComponent(CompoundComponent):
                     self.song().view.selected_scene = all_scenes[index - 1]
 
     @subject_slot_group('value')
-    def _on_stop_track_value(self, value, button):
+    def _on_stop_track_value(self, value, index):
         if self.is_enabled():
-            if value is not 0 or not button.is_momentary():
+            if value is not 0 or not self._stop_track_clip_buttons[index].is_momentary():
                 tracks = self.tracks_to_use()
-                track_index = list(self._stop_track_clip_buttons).index(button) + self.track_offset()
+                track_index = index + self.track_offset()
                 if in_range(track_index, 0, len(tracks)) and tracks[track_index] in self.song().tracks:
                     tracks[track_index].stop_all_clips()
 
@@ -512,12 +538,14 @@ class SessionComponent(CompoundComponent):
     @subject_slot_group('fired_slot_index')
     def _on_fired_slot_index_changed(self, track_index):
         button_index = track_index - self.track_offset()
-        self._update_stop_clips_led(button_index)
+        if in_range(button_index, 0, self._num_tracks):
+            self._update_stop_clips_led(button_index)
 
     @subject_slot_group('playing_slot_index')
     def _on_playing_slot_index_changed(self, track_index):
         button_index = track_index - self.track_offset()
-        self._update_stop_clips_led(button_index)
+        if in_range(button_index, 0, self._num_tracks):
+            self._update_stop_clips_led(button_index)
 
     def _update_stop_clips_led(self, index):
         tracks_to_use = self.tracks_to_use()
@@ -40,11 +40,17 @@ class Signal(object):
     The return value of this function will depend on the combiner.
     The combiner takes a generator of slot results and returns a
     value.  The slots whose results are not evaluated are not called.
+    
+    Slots are dispatched from a tuple snapshot that is only rebuilt
+    when the connections change, and looked up through a dictionary
+    keyed by callback.  With the default combiner no generator is
+    created on notification.
     """
 
     def __init__(self, combiner = default_combiner, sender = None, *a, **k):
         super(Signal, self).__init__(*a, **k)
-        self._slots = []
+        self._slots = ()
+        self._slots_by_callback = {}
         self._combiner = combiner
 
     def connect(self, slot, in_front = False, sender = None):
@@ -60,38 +66,68 @@ class Signal(object):
         If 'sender' is not None, it will be passed as last ordinal
         parameter to the slot when the signal is dispatched.
         """
-        if not callable(slot):
-            raise AssertionError
-            if slot not in self._slots:
-                slot = IdentifyingSlot(sender, slot) if sender is not None else Slot(slot)
-                in_front and self._slots.insert(0, slot)
+        assert callable(slot)
+        connected = self._find_slot(slot)
+        if connected is None:
+            slot = IdentifyingSlot(sender, slot) if sender is not None else Slot(slot)
+            if in_front:
+                self._slots = (slot,) + self._slots
             else:
-                self._slots.append(slot)
+                self._slots = self._slots + (slot,)
+            try:
+                self._slots_by_callback[slot.callback] = slot
+            except TypeError:
+                pass
+
         else:
-            slot = find_if(lambda x: x == slot, self._slots)
+            slot = connected
         return slot
 
     def disconnect(self, slot):
-        if slot in self._slots:
-            self._slots.remove(slot)
+        connected = self._find_slot(slot)
+        if connected is not None:
+            self._slots = tuple([ x for x in self._slots if x is not connected ])
+            try:
+                del self._slots_by_callback[connected.callback]
+            except (KeyError, TypeError):
+                pass
 
     def disconnect_all(self):
-        self._slots = []
+        self._slots = ()
+        self._slots_by_callback = {}
 
     @property
     def count(self):
         return len(self._slots)
 
     def is_connected(self, slot):
-        return slot in self._slots
+        return self._find_slot(slot) is not None
+
+    def _find_slot(self, slot):
+        callback = slot.callback if isinstance(slot, Slot) else slot
+        try:
+            return self._slots_by_callback.get(callback)
+        except TypeError:
+            return find_if(lambda x: x == slot, self._slots)
 
     def __call__(self, *a, **k):
-        return self._combiner(_slot_notification_generator(self._slots, a, k))
+        slots = self._slots
+        if self._combiner is default_combiner:
+            for slot in slots:
+                if slots is self._slots or self._is_still_connected(slot):
+                    slot(*a, **k)
+
+        else:
+            return self._combiner(_slot_notification_generator(self, slots, a, k))
+
+    def _is_still_connected(self, slot):
+        return find_if(lambda x: x is slot, self._slots) is not None
 
 
-def _slot_notification_generator(slots, args, kws):
+def _slot_notification_generator(signal, slots, args, kws):
     for slot in slots:
-        yield slot(*args, **kws)
+        if slots is signal._slots or signal._is_still_connected(slot):
+            yield slot(*args, **kws)
 
 
 def short_circuit_combiner(slot_results):
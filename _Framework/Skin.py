@@ -6,11 +6,49 @@ class SkinColorMissingError(Exception):
     pass
 
 
+class SkinHandle(object):
+    """
+    A skin color path compiled into a small integer, which skins use to
+    find the color in a list instead of hashing the path.  Handles are
+    shared by all skins, so there is only one handle for every path.
+    """
+    __slots__ = ('index', 'path')
+
+    def __init__(self, index = None, path = None, *a, **k):
+        super(SkinHandle, self).__init__(*a, **k)
+        self.index = index
+        self.path = path
+
+    def __repr__(self):
+        return 'SkinHandle(%r)' % self.path
+
+
+_skin_handles = {}
+
+def compile_skin_path(path):
+    """
+    Returns the handle of the given skin color path, to be passed to
+    set_light instead of the path.  Meant to be called when building
+    the script, not when drawing.
+    """
+    if isinstance(path, SkinHandle):
+        return path
+    try:
+        return _skin_handles[path]
+    except KeyError:
+        handle = _skin_handles[path] = SkinHandle(len(_skin_handles), path)
+        return handle
+
+
+_UNRESOLVED = object()
+
+
 class Skin(object):
 
     def __init__(self, colors = None, *a, **k):
         super(Skin, self).__init__(*a, **k)
         self._colors = {}
+        self._colors_by_handle = []
         if colors is not None:
             self._fill_colors(colors)
 
@@ -31,8 +69,25 @@ class Skin(object):
         try:
             return self._colors[key]
         except KeyError:
+            if isinstance(key, SkinHandle):
+                return self.color_for_handle(key)
             raise SkinColorMissingError, 'Skin color missing: %s' % str(key)
 
+    def color_for_handle(self, handle):
+        """
+        Returns the color of the compiled path, which is looked up by
+        path only the first time.
+        """
+        try:
+            color = self._colors_by_handle[handle.index]
+        except IndexError:
+            self._colors_by_handle.extend([_UNRESOLVED] * (handle.index + 1 - len(self._colors_by_handle)))
+            color = _UNRESOLVED
+
+        if color is _UNRESOLVED:
+            color = self._colors_by_handle[handle.index] = self[handle.path]
+        return color
+
     def iteritems(self):
         return self._colors.iteritems()
 
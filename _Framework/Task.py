@@ -2,10 +2,14 @@
 """
 Task management.
 """
+import bisect
 import functools
+import heapq
+import operator
+import time
 import traceback
 from .Dependency import depends
-from .Util import remove_if, find_if, linear as linear_fn, print_message, const
+from .Util import find_if, linear as linear_fn, print_message, const
 
 class TaskError(Exception):
     pass
@@ -14,6 +18,18 @@ class TaskError(Exception):
 KILLED = 0
 RUNNING = 1
 PAUSED = 2
+_last_clock_time = [0.0]
+
+def monotonic_clock():
+    """
+    Returns the current time in seconds.  Python 2 lacks a monotonic
+    clock, so this never goes back in time even if the system clock
+    does.
+    """
+    now = max(time.time(), _last_clock_time[0])
+    _last_clock_time[0] = now
+    return now
+
 
 class Task(object):
 
@@ -44,23 +60,29 @@ class Task(object):
     def pause(self):
         if self._state != KILLED:
             self._state = PAUSED
+            self._state_changed()
         return self
 
     def resume(self):
         if self._state != KILLED:
             self._state = RUNNING
+            self._state_changed()
         return self
 
     def toggle_pause(self):
         if self._state != KILLED:
             self._state = RUNNING if self._state == PAUSED else PAUSED
+            self._state_changed()
         return self
 
     def restart(self):
+        was_killed = self._state == KILLED
+        if not was_killed:
+            self._state_changed()
         self.do_restart()
         self._state = RUNNING
-        if self._task_manager and self._task_manager.find(self) == None:
-            manager = self._task_manager
+        manager = self._task_manager
+        if was_killed and manager and not manager._task_state_changed(self) and manager.find(self) == None:
             self._task_manager = None
             manager.add(self)
         return self
@@ -68,6 +90,7 @@ class Task(object):
     def kill(self):
         self._state = KILLED
         if self._task_manager:
+            self._task_manager._task_state_changed(self)
             for task in self._next:
                 self._task_manager.add(task)
 
@@ -101,6 +124,24 @@ class Task(object):
     def _task_equivalent(self, other):
         return self == other
 
+    def _state_changed(self):
+        if self._task_manager:
+            self._task_manager._task_state_changed(self)
+
+    def _idle_updates(self, delta):
+        """
+        Returns how many of the following updates with the given delta
+        are certain to do nothing but count down, or None if that holds
+        for all of them until the state of the task changes.  A
+        TaskGroup does not update its tasks while they are idle, and
+        calls _skip_updates with the updates they missed when it wakes
+        them up.
+        """
+        return 0
+
+    def _skip_updates(self, count, delta):
+        pass
+
 
 class WrapperTask(Task):
 
@@ -186,7 +227,45 @@ class GeneratorTask(Task):
     generator = property(_get_generator, _set_generator)
 
 
+_RUNNABLE = 0
+_SLEEPING = 1
+_STOPPED = 2
+
+class _TaskSlot(object):
+    """
+    What a TaskGroup knows about one of its tasks: the order it was
+    added in, whether it is runnable, sleeping or stopped (paused or
+    killed), whether it counts as killed and, while it sleeps, the
+    update it fell asleep in and its entry in the group's heap.
+    """
+    __slots__ = ('order', 'task', 'state', 'killed', 'asleep_since', 'wake_entry')
+
+    def __init__(self, order, task):
+        self.order = order
+        self.task = task
+        self.state = _STOPPED
+        self.killed = task.is_killed
+        self.asleep_since = 0
+        self.wake_entry = None
+
+    def __lt__(self, other):
+        return self.order < other.order
+
+
+_slot_order = operator.attrgetter('order')
+
+
 class TaskGroup(Task):
+    """
+    Updates its tasks in the order they were added.  Only the runnable
+    tasks are walked on an update.  Tasks that report through
+    _idle_updates that they will only count down for a while -- waits,
+    delays and groups of them -- are parked in a heap keyed by the
+    update they are due in, paused and killed tasks are not visited at
+    all, and every change of their state wakes them up again.  As long
+    as the delta does not change, this behaves exactly as updating all
+    of them every time.
+    """
     auto_kill = True
     auto_remove = True
     loop = False
@@ -200,49 +279,248 @@ class TaskGroup(Task):
         if loop is not None:
             self.loop = loop
         self._tasks = []
+        self._reset_slots()
+        self._order = 0
+        self._ticks = 0
+        self._last_delta = None
+        self._updating = None
+        self._pass = None
+        self._in_update = False
         for task in tasks:
             self.add(task)
 
+    def _reset_slots(self):
+        self._slots = {}
+        self._runnable = []
+        self._sleeping = []
+        self._dying = []
+        self._live = 0
+
     def clear(self):
+        self._state_changed()
+        for slot in self._slots.values():
+            self._catch_up(slot)
+            slot.state = _STOPPED
+
         for t in self._tasks:
             t._set_parent(None)
 
         self._tasks = []
+        self._reset_slots()
+        self._updating = None
         super(TaskGroup, self).clear()
 
-    @depends(log_message=const(print_message), traceback=const(traceback))
-    def do_update(self, timer, log_message = None, traceback = None):
+    def do_update(self, timer):
         super(TaskGroup, self).do_update(timer)
-        for task in self._tasks:
-            if not task.is_killed:
-                try:
-                    task.update(timer)
-                except Exception:
-                    task.kill()
-                    log_message('Error when executing task')
-                    traceback.print_exc()
-
-        if self.auto_remove:
-            self._tasks = remove_if(lambda t: t.is_killed, self._tasks)
-        all_killed = len(filter(lambda t: t.is_killed, self._tasks)) == self.count
-        if self.auto_kill and all_killed:
-            self.kill()
-        elif self.loop and all_killed:
-            self.restart()
+        if timer != self._last_delta:
+            self._wake_all()
+            self._last_delta = timer
+        self._ticks += 1
+        runnable = self._runnable
+        self._runnable = []
+        sleeping = self._sleeping
+        if sleeping and sleeping[0][0] <= self._ticks:
+            self._wake_due(runnable, timer)
+            runnable.sort(key=_slot_order)
+        self._pass = runnable
+        self._updating = -1
+        self._in_update = True
+        slot = None
+        try:
+            for slot in runnable:
+                if slot.state != _RUNNABLE:
+                    continue
+                task = slot.task
+                self._updating = slot.order
+                if task._state != KILLED:
+                    try:
+                        task.update(timer)
+                    except Exception:
+                        task.kill()
+                        self._log_task_error()
+
+                if slot.state == _RUNNABLE:
+                    if task._state != RUNNING:
+                        slot.state = _STOPPED
+                    else:
+                        idle = task._idle_updates(timer)
+                        if idle == 0:
+                            self._runnable.append(slot)
+                        else:
+                            slot.state = _SLEEPING
+                            slot.asleep_since = self._ticks
+                            if idle is not None:
+                                slot.wake_entry = (self._ticks + idle + 1, slot.order, slot)
+                                heapq.heappush(self._sleeping, slot.wake_entry)
+
+            slot = None
+            self._updating = None
+            if self._dying:
+                self._remove_dying()
+            all_killed = self._live == 0
+            if self.auto_kill and all_killed:
+                self.kill()
+            elif self.loop and all_killed:
+                self.restart()
+        finally:
+            self._updating = None
+            self._pass = None
+            self._in_update = False
+            if slot is not None:
+                self._abandon_pass(runnable, slot)
+
+    def _wake_due(self, runnable, delta):
+        ticks = self._ticks
+        sleeping = self._sleeping
+        while sleeping and sleeping[0][0] <= ticks:
+            entry = heapq.heappop(sleeping)
+            slot = entry[2]
+            if slot.wake_entry is entry:
+                slot.state = _RUNNABLE
+                slot.wake_entry = None
+                skipped = ticks - slot.asleep_since - 1
+                if skipped:
+                    slot.task._skip_updates(skipped, delta)
+                runnable.append(slot)
+
+    @depends(log_message=const(print_message), traceback=const(traceback))
+    def _log_task_error(self, log_message = None, traceback = None):
+        log_message('Error when executing task')
+        traceback.print_exc()
+
+    def _wake(self, slot):
+        if slot.state == _SLEEPING:
+            self._catch_up(slot)
+        slot.state = _RUNNABLE
+        if self._updating is not None and slot.order > self._updating:
+            slots = self._pass
+        else:
+            slots = self._runnable
+        if not slots or slots[-1].order < slot.order:
+            slots.append(slot)
+        else:
+            bisect.insort(slots, slot)
+
+    def _catch_up(self, slot):
+        if slot.state == _SLEEPING:
+            slot.state = _STOPPED
+            slot.wake_entry = None
+            updating = self._updating
+            skipped = self._ticks - slot.asleep_since
+            if updating is not None and slot.order > updating:
+                skipped -= 1
+            if skipped:
+                slot.task._skip_updates(skipped, self._last_delta)
+
+    def _abandon_pass(self, runnable, slot):
+        """
+        An exception escaped the update of the given slot, so the tasks
+        after it missed this update: keep the runnable ones listed and
+        do not count it for the sleeping ones.
+        """
+        for other in runnable:
+            if other.order >= slot.order and other.state == _RUNNABLE and other not in self._runnable:
+                bisect.insort(self._runnable, other)
+
+        for other in self._slots.itervalues():
+            if other.state == _SLEEPING and other.order > slot.order:
+                other.asleep_since += 1
+
+    def _wake_all(self):
+        for slot in self._slots.values():
+            if slot.state == _SLEEPING:
+                self._wake(slot)
+
+        self._sleeping = []
+
+    def _task_state_changed(self, task):
+        """
+        Called by a task of the group when its state changed.  Wakes it
+        up, and the group too unless it is being updated anyway.
+        Returns whether the task belongs to the group.
+        """
+        slot = self._slots.get(task)
+        if slot is not None:
+            killed = task._state == KILLED
+            if killed != slot.killed:
+                slot.killed = killed
+                if killed:
+                    self._live -= 1
+                    if self.auto_remove:
+                        self._dying.append(slot)
+                else:
+                    self._live += 1
+            if slot.state != _RUNNABLE:
+                if not self._in_update:
+                    self._state_changed()
+                self._wake(slot)
+        return slot is not None
+
+    def _remove_dying(self):
+        dead = []
+        for slot in self._dying:
+            task = slot.task
+            if task.is_killed and self._slots.get(task) is slot:
+                self._forget(self._slots.pop(task))
+                dead.append(task)
+
+        self._dying = []
+        if len(dead) == 1:
+            self._tasks.remove(dead[0])
+        elif dead:
+            dead = set(dead)
+            self._tasks = [ t for t in self._tasks if t not in dead ]
+
+    def _forget(self, slot):
+        if not slot.killed:
+            self._live -= 1
+        slot.state = _STOPPED
+        slot.wake_entry = None
+
+    def _idle_updates(self, delta):
+        if self._runnable or delta != self._last_delta:
+            return 0
+        if self._live == 0 and (self.auto_kill or self.loop):
+            return 0
+        sleeping = self._sleeping
+        while sleeping and sleeping[0][2].wake_entry is not sleeping[0]:
+            heapq.heappop(sleeping)
+
+        if sleeping:
+            return max(sleeping[0][0] - self._ticks - 1, 0)
+
+    def _skip_updates(self, count, delta):
+        self._ticks += count
 
     def add(self, task):
         task = totask(task)
         task._set_parent(self)
         self._tasks.append(task)
+        self._order += 1
+        slot = _TaskSlot(self._order, task)
+        self._slots[task] = slot
+        if not slot.killed:
+            self._live += 1
+        elif self.auto_remove:
+            self._dying.append(slot)
+        self._wake(slot)
         if self.is_killed:
             super(TaskGroup, self).restart()
+        else:
+            self._state_changed()
         return task
 
     def remove(self, task):
         self._tasks.remove(task)
+        self._state_changed()
+        slot = self._slots.pop(task)
+        self._catch_up(slot)
+        self._forget(slot)
         task._set_parent(None)
 
     def find(self, task):
+        if task in self._slots:
+            return task
         return find_if(lambda t: t._task_equivalent(task), self._tasks)
 
     def restart(self):
@@ -255,6 +533,182 @@ class TaskGroup(Task):
         return len(self._tasks)
 
 
+class ScheduleTask(Task):
+    """
+    Task that calls callbacks after a given number of updates.  The
+    pending callbacks are kept in a heap ordered by the update they
+    are due at, so an update only costs as much as the callbacks that
+    actually fire.  Callbacks scheduled for the same update are called
+    in the order they were scheduled.  Cancelling is constant time.
+    """
+
+    def __init__(self, *a, **k):
+        super(ScheduleTask, self).__init__(*a, **k)
+        self._heap = []
+        self._ticks = 0
+        self._counter = 0
+
+    def clear(self):
+        self._heap = []
+        super(ScheduleTask, self).clear()
+
+    def schedule(self, delay_in_ticks, callback):
+        """
+        Calls 'callback' in the update that happens 'delay_in_ticks'
+        updates after the current one.  Returns an entry that can be
+        passed to cancel.
+        """
+        self._state_changed()
+        self._counter += 1
+        entry = [self._current_time() + delay_in_ticks, self._counter, callback]
+        heapq.heappush(self._heap, entry)
+        return entry
+
+    def cancel(self, entry):
+        entry[2] = None
+
+    @property
+    def count(self):
+        return len(filter(lambda entry: entry[2] is not None, self._heap))
+
+    def flush(self):
+        """
+        Calls all pending callbacks right away, in the order they are
+        due.
+        """
+        heap = self._heap
+        self._heap = []
+        for entry in sorted(heap):
+            self._call_entry(entry)
+
+    def do_update(self, timer):
+        super(ScheduleTask, self).do_update(timer)
+        self._ticks += 1
+        self.run_due()
+
+    def run_due(self):
+        """
+        Calls the callbacks whose time has come.
+        """
+        now = self._current_time()
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            self._call_entry(heapq.heappop(heap))
+
+    def _current_time(self):
+        return self._ticks
+
+    def _idle_updates(self, delta):
+        if self._heap:
+            return max(self._heap[0][0] - self._ticks - 1, 0)
+
+    def _skip_updates(self, count, delta):
+        self._ticks += count
+
+    @depends(log_message=const(print_message), traceback=const(traceback))
+    def _call_entry(self, entry, log_message = None, traceback = None):
+        callback = entry[2]
+        if callback is not None:
+            entry[2] = None
+            try:
+                callback()
+            except Exception:
+                log_message('Error when executing task')
+                traceback.print_exc()
+
+
+class ClockScheduleTask(ScheduleTask):
+    """
+    Schedule task whose delays are given in seconds of the monotonic
+    clock instead of updates.  Besides on every update, run_due can be
+    called whenever the script gets control -- e.g. when receiving
+    MIDI -- so callbacks are not quantised to the timer period.
+    """
+
+    def _current_time(self):
+        return monotonic_clock()
+
+    def _idle_updates(self, delta):
+        if self._heap:
+            return 0
+
+
+class TimedCallback(Task):
+    """
+    Calls 'callback' once 'delay' seconds have elapsed since the last
+    restart.  Stands in for a sequence(wait(delay), run(callback)) task
+    and lives in a task group like it, but is scheduled with
+    schedule_timed_message, so it is not quantised to the timer period.
+    It only fires while it and all the groups above it are running: a
+    delay that expires while one of them is paused fires on the first
+    update after they are resumed.  Killing the task or removing it
+    from its group cancels it.  Without a schedule_timed_message, it
+    checks the monotonic clock on every update instead.  It starts
+    killed.
+    """
+
+    @depends(schedule_timed_message=const(None), cancel_timed_message=const(None))
+    def __init__(self, delay, callback, schedule_timed_message = None, cancel_timed_message = None, *a, **k):
+        super(TimedCallback, self).__init__(*a, **k)
+        self._delay = delay
+        self._callback = callback
+        self._schedule_timed_message = schedule_timed_message
+        self._cancel_timed_message = cancel_timed_message
+        self._entry = None
+        self._deadline = None
+        self._is_due = False
+        self._state = KILLED
+
+    def do_restart(self):
+        self._cancel()
+        if self._schedule_timed_message is not None:
+            self._entry = self._schedule_timed_message(self._delay, self._on_timeout)
+        else:
+            self._deadline = monotonic_clock() + self._delay
+
+    def do_update(self, delta):
+        super(TimedCallback, self).do_update(delta)
+        if self._is_due or self._deadline is not None and monotonic_clock() >= self._deadline:
+            self._fire()
+
+    def kill(self):
+        self._cancel()
+        return super(TimedCallback, self).kill()
+
+    def _set_parent(self, manager):
+        super(TimedCallback, self)._set_parent(manager)
+        if manager is None:
+            self._cancel()
+
+    def _idle_updates(self, delta):
+        if not self._is_due and self._deadline is None:
+            return None
+        return 0
+
+    def _cancel(self):
+        if self._entry is not None:
+            self._cancel_timed_message(self._entry)
+            self._entry = None
+        self._deadline = None
+        self._is_due = False
+
+    def _on_timeout(self):
+        self._entry = None
+        task = self
+        while task is not None and task._state == RUNNING:
+            task = task._task_manager
+
+        if task is None and self._task_manager is not None:
+            self._fire()
+        elif self._state != KILLED:
+            self._is_due = True
+            self._state_changed()
+
+    def _fire(self):
+        self.kill()
+        self._callback()
+
+
 class WaitTask(Task):
     duration = 1.0
 
@@ -274,6 +728,27 @@ class WaitTask(Task):
     def do_restart(self):
         self.remaining = self.duration
 
+    def _idle_updates(self, delta):
+        if delta <= 0:
+            return 0
+        remaining = self.remaining
+        if remaining > delta * 64:
+            return int(remaining / delta) - 1
+        idle = 0
+        remaining -= delta
+        while remaining > 0:
+            idle += 1
+            remaining -= delta
+
+        return idle
+
+    def _skip_updates(self, count, delta):
+        remaining = self.remaining
+        for _ in xrange(count):
+            remaining -= delta
+
+        self.remaining = remaining
+
 
 class DelayTask(Task):
     duration = 1
@@ -294,6 +769,12 @@ class DelayTask(Task):
             self.kill()
             self.remaining = 0
 
+    def _idle_updates(self, delta):
+        return max(int(self.remaining) - 1, 0)
+
+    def _skip_updates(self, count, delta):
+        self.remaining -= count
+
 
 class TimerTask(WaitTask):
 
@@ -307,6 +788,9 @@ class TimerTask(WaitTask):
     def on_tick(self):
         pass
 
+    def _idle_updates(self, delta):
+        return 0
+
     def on_finish(self):
         pass
 
@@ -368,6 +852,15 @@ class SequenceTask(Task):
         self._iter = iter(self._tasks)
         self._advance_sequence()
 
+    def _idle_updates(self, delta):
+        current = self._current
+        if current is not None and current.is_running:
+            return current._idle_updates(delta)
+        return 0
+
+    def _skip_updates(self, count, delta):
+        self._current._skip_updates(count, delta)
+
 
 def totask(task):
     if not isinstance(task, Task):
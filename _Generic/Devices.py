@@ -571,4 +571,91 @@ def get_parameter_by_name(device, name):
     """ Find the given device's parameter that belongs to the given name """
     for i in device.parameters:
         if i.original_name == name:
-            return i
\ No newline at end of file
+            return i
+
+class ParameterBankCache(object):
+    """ Resolves the parameter banks of a device one bank at a time, as they
+        are asked for, and keeps the resolved banks. Parameters are looked up
+        by name in an index from the original names of the device's parameters
+        to the parameters, which is built on first use. Everything is dropped
+        when asked for another device, and needs to be invalidated when the
+        parameters of the device change. """
+
+    def __init__(self, device_dict = DEVICE_DICT, device_bob_dict = DEVICE_BOB_DICT):
+        self._device_dict = device_dict
+        self._device_bob_dict = device_bob_dict
+        self._device = None
+        self.invalidate()
+
+    def invalidate(self):
+        self._parameters = None
+        self._parameters_by_name = None
+        self._banks = {}
+
+    def parameter_by_name(self, device, name):
+        """ Find the given device's parameter that belongs to the given name """
+        self._set_device(device)
+        if self._parameters_by_name == None:
+            self._parameters_by_name = {}
+            for parameter in reversed(self._device_parameters()):
+                self._parameters_by_name[parameter.original_name] = parameter
+
+        return self._parameters_by_name.get(name)
+
+    def parameter_bank(self, device, bank_index):
+        """ Returns the parameters of the given bank of the device, which has
+            to be smaller than the number of parameter banks """
+        self._set_device(device)
+        if bank_index not in self._banks:
+            self._banks[bank_index] = self._resolve_bank(bank_index)
+        return self._banks[bank_index]
+
+    def best_of_parameter_bank(self, device):
+        self._set_device(device)
+        if device != None:
+            if device.class_name in self._device_bob_dict:
+                bobs = self._device_bob_dict[device.class_name]
+                assert len(bobs) == 1
+                return [ self.parameter_by_name(device, name) for name in bobs[0] ]
+            if device.class_name in MAX_DEVICES:
+                try:
+                    parameter_indices = device.get_bank_parameters(-1)
+                    parameters = self._device_parameters()
+                    return [ (parameters[i] if i != -1 else None) for i in parameter_indices ]
+                except:
+                    return []
+
+        return []
+
+    def _set_device(self, device):
+        if device != self._device or type(device) != type(self._device):
+            self._device = device
+            self.invalidate()
+
+    def _device_parameters(self):
+        if self._parameters == None:
+            self._parameters = tuple(self._device.parameters)
+        return self._parameters
+
+    def _resolve_bank(self, bank_index):
+        device = self._device
+        if device.class_name in self._device_dict:
+            return [ self.parameter_by_name(device, name) for name in self._device_dict[device.class_name][bank_index] ]
+        if device.class_name in MAX_DEVICES:
+            try:
+                banks = device.get_bank_count()
+            except:
+                banks = 0
+
+            if banks != 0:
+                try:
+                    parameter_indices = device.get_bank_parameters(bank_index)
+                except:
+                    parameter_indices = []
+
+                if len(parameter_indices) != 8:
+                    return [ None for i in range(0, 8) ]
+                parameters = self._device_parameters()
+                return [ (parameters[i] if i != -1 else None) for i in parameter_indices ]
+        bank = self._device_parameters()[1 + bank_index * 8:9 + bank_index * 8]
+        return bank + (None,) * (8 - len(bank))
@@ -55,6 +55,8 @@ class MxDCore(object):
     def __init__(self):
         object.__init__(self)
         self.device_contexts = {}
+        self._lom_id_users = {}
+        self._current_lom_ids = {}
         self.manager = None
         self.lom_classes = []
         self._call_handler = {'get_notes': self._object_get_notes_handler,
@@ -128,20 +130,40 @@ class MxDCore(object):
         raise lom_id != 0 or AssertionError
         observers = []
         remotes = []
-        for device_id, device_context in self.device_contexts.iteritems():
-            for object_id, _ in device_context.iteritems():
-                if not isinstance(object_id, int):
-                    continue
-                type = self._get_current_type(device_id, object_id)
-                if type == 'obs':
-                    if self._get_current_lom_id(device_id, object_id) == int(lom_id):
-                        observers.append((device_id, object_id))
-                elif type == 'rmt':
-                    if self._get_current_lom_id(device_id, object_id) == int(lom_id):
-                        remotes.append((device_id, object_id))
+        lom_id = int(lom_id)
+        for device_id, object_id in sorted(self._lom_id_users.get(lom_id, ())):
+            if device_id not in self.device_contexts or object_id not in self.device_contexts[device_id]:
+                continue
+            type = self._get_current_type(device_id, object_id)
+            if type == 'obs':
+                if self._get_current_lom_id(device_id, object_id) == lom_id:
+                    observers.append((device_id, object_id))
+            elif type == 'rmt':
+                if self._get_current_lom_id(device_id, object_id) == lom_id:
+                    remotes.append((device_id, object_id))
 
         return (observers, remotes)
 
+    def _index_lom_id(self, device_id, object_id, lom_id):
+        """
+        remember that the given obj/obs/rmt object refers to lom_id.
+        The index is by id only, the type is checked when it is queried.
+        """
+        self._unindex_lom_id(device_id, object_id)
+        if lom_id != 0:
+            key = (device_id, object_id)
+            self._current_lom_ids[key] = lom_id
+            self._lom_id_users.setdefault(lom_id, set()).add(key)
+
+    def _unindex_lom_id(self, device_id, object_id):
+        key = (device_id, object_id)
+        lom_id = self._current_lom_ids.pop(key, None)
+        if lom_id is not None:
+            users = self._lom_id_users[lom_id]
+            users.discard(key)
+            if not users:
+                del self._lom_id_users[lom_id]
+
     def _get_object_path(self, device_id, lom_object):
         resolver = LomPathCalculator(lom_object, get_current_max_device(device_id))
         return concatenate_strings(resolver.path_components)
@@ -153,6 +175,7 @@ class MxDCore(object):
 
     def _set_current_lom_id(self, device_id, object_id, lom_id, type):
         """set the CURRENT_LOM_ID of obj/obs/rmt objects"""
+        self._index_lom_id(device_id, object_id, lom_id)
         if not self.manager.set_current_lom_id(device_id, object_id, lom_id):
             self.device_contexts[device_id][object_id][ID_KEY] = lom_id
             self._set_current_type(device_id, object_id, type)
@@ -220,6 +243,7 @@ class MxDCore(object):
         for key in device_context.keys():
             if isinstance(key, int):
                 object_context = device_context[key]
+                self._unindex_lom_id(device_id, key)
                 self._observer_uninstall_listener(device_id, key)
                 if len(object_context[PATH_KEY]) > 0:
                     object_context[PATH_KEY] = []
@@ -727,10 +751,12 @@ class MxDCore(object):
 
     def update_observer_listener(self, device_id, object_id):
         self.update_device_context(device_id, object_id)
+        self._index_lom_id(device_id, object_id, self._get_current_lom_id(device_id, object_id))
         self._observer_update_listener(device_id, object_id)
 
     def install_observer_listener(self, device_id, object_id):
         self.update_device_context(device_id, object_id)
+        self._index_lom_id(device_id, object_id, self._get_current_lom_id(device_id, object_id))
         self._observer_install_listener(device_id, object_id)
 
     def uninstall_observer_listener(self, device_id, object_id):
@@ -833,6 +859,7 @@ class MxDCore(object):
 
     def update_remote_timeable(self, device_id, object_id):
         self.update_device_context(device_id, object_id)
+        self._index_lom_id(device_id, object_id, self._get_current_lom_id(device_id, object_id))
         self._remote_update_timeable(device_id, object_id, False)
 
     def reset_all_current_lom_ids(self, device_id):
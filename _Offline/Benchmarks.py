@@ -0,0 +1,258 @@
+"""
+Micro-benchmarks of the framework's hot paths.  Usage::
+
+    python -m _Offline.Benchmarks [name ...]
+
+Without names every benchmark runs.  The framework is imported through
+Headless, so what is measured is the code as the scripts load it.  For
+every case the fastest of REPEAT runs is reported, as the time per
+operation and the number of operations per second.
+"""
+from __future__ import absolute_import
+import sys
+from contextlib import contextmanager
+from timeit import default_timer
+REPEAT = 5
+BENCHMARKS = []
+
+def benchmark(name):
+    """
+    Registers the decorated function as the benchmark of the given
+    name.  It takes no arguments and yields (case, microseconds per
+    operation) pairs.
+    """
+
+    def decorator(function):
+        BENCHMARKS.append((name, function))
+        return function
+
+    return decorator
+
+
+def time_per_operation(function, operations, repeat = REPEAT):
+    """
+    Calls 'function', which performs the given number of operations,
+    'repeat' times and returns the fastest time per operation in
+    microseconds.
+    """
+    best = None
+    for _ in xrange(repeat):
+        start = default_timer()
+        function()
+        elapsed = default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best * 1000000.0 / operations
+
+
+def ticks(task, count, delta = 0.1):
+    """
+    Returns a function that updates the task 'count' times.
+    """
+
+    def run():
+        for _ in xrange(count):
+            task.update(delta)
+
+    return run
+
+
+SYSEX_STREAM = ((240, 71, 127, 21, 98, 0, 1, 0, 247),
+ (240, 71, 127, 21, 92, 0, 1, 0, 247),
+ (240, 71, 127, 21, 92, 0, 1, 1, 247),
+ (240, 71, 127, 21, 98, 0, 1, 0, 247),
+ (240, 71, 127, 21, 92, 0, 1, 0, 247))
+
+@benchmark('sysex')
+def sysex():
+    """
+    receive_midi for a stream of sysex messages as Push gets them from
+    the hardware, the mode and aftertouch mode replies.  Unknown sysex
+    is left out, as logging it would dominate the time.
+    """
+    from .Headless import load_control_surface
+    surface, _ = load_control_surface('Push')
+    stream = SYSEX_STREAM * 100
+
+    def run():
+        for midi_bytes in stream:
+            surface.receive_midi(midi_bytes)
+
+    yield ('Push sysex stream, message', time_per_operation(run, len(stream)))
+    surface.disconnect()
+
+
+@contextmanager
+def stacked_component_guard(surface):
+    """
+    The component guard of an OptimizedControlSurface as it was before
+    the flat one, with every layer a context manager of its own.
+    """
+    if not surface._in_component_guard:
+        with surface._in_component_guard():
+            with surface.setting_listener_caller():
+                with surface._control_surface_injector:
+                    with surface.suppressing_rebuild_requests():
+                        with surface.accumulating_midi_messages():
+                            with surface._ownership_handler_injector:
+                                yield
+                                surface._optimized_ownership_handler.commit_ownership_changes()
+
+    else:
+        with surface._ownership_handler_injector:
+            yield
+            surface._optimized_ownership_handler.commit_ownership_changes()
+
+
+@benchmark('component_guard')
+def component_guard():
+    """
+    Entering and leaving the component guard of APC40, the flat guard
+    against the stacked context managers it replaced, both as the
+    outermost guard and nested in another one.
+    """
+    from .Headless import load_control_surface
+    surface, _ = load_control_surface('APC40')
+    count = 10000
+
+    def enter(guard):
+
+        def run():
+            for _ in xrange(count):
+                with guard():
+                    pass
+
+        return run
+
+    def enter_nested(guard):
+
+        def run():
+            with guard():
+                for _ in xrange(count):
+                    with guard():
+                        pass
+
+        return run
+
+    stacked_guard = lambda : stacked_component_guard(surface)
+    yield ('flat guard, entry', time_per_operation(enter(surface.component_guard), count))
+    yield ('stacked guard, entry', time_per_operation(enter(stacked_guard), count))
+    yield ('flat guard, nested entry', time_per_operation(enter_nested(surface.component_guard), count))
+    yield ('stacked guard, nested entry', time_per_operation(enter_nested(stacked_guard), count))
+    surface.disconnect()
+
+
+@benchmark('signal')
+def signal():
+    """
+    Notifying 1, 8 and 64 listeners, through a Signal and through the
+    notify_value of a subject, the path every button and encoder value
+    takes.
+    """
+    from _Framework.Signal import Signal
+    from _Framework.SubjectSlot import Subject
+
+    class ValueSubject(Subject):
+        __subject_events__ = ('value',)
+
+    count = 10000
+    for listeners in (1, 8, 64):
+        signal = Signal()
+        subject = ValueSubject()
+        for _ in xrange(listeners):
+            listener = lambda value: None
+            signal.connect(listener)
+            subject.add_value_listener(listener)
+
+        def notify_signal():
+            for _ in xrange(count):
+                signal(127)
+
+        def notify_subject():
+            for _ in xrange(count):
+                subject.notify_value(127)
+
+        yield ('%d listeners, Signal call' % listeners, time_per_operation(notify_signal, count))
+        yield ('%d listeners, notify_value' % listeners, time_per_operation(notify_subject, count))
+
+
+@benchmark('live_tasks')
+def live_tasks():
+    """
+    One timer tick of a task group holding 1k and 10k live tasks, once
+    as looping waits like the blinking ones, once as pending delays like
+    the timeouts and once as pending schedule_message callbacks.
+    """
+    from _Framework import Task
+    from _Framework.Util import nop
+    for count in (1000, 10000):
+        group = Task.TaskGroup(auto_kill=False)
+        for _ in xrange(count):
+            group.add(Task.loop(Task.wait(0.3), Task.run(nop)))
+
+        yield ('%d looping tasks, tick' % count, time_per_operation(ticks(group, 10), 10, repeat=3))
+        group = Task.TaskGroup(auto_kill=False)
+        for _ in xrange(count):
+            group.add(Task.sequence(Task.wait(60), Task.run(nop)))
+
+        yield ('%d pending delays, tick' % count, time_per_operation(ticks(group, 10), 10, repeat=3))
+        group = Task.TaskGroup(auto_kill=False)
+        schedule = group.add(Task.ScheduleTask())
+        for _ in xrange(count):
+            schedule.schedule(1000000, nop)
+
+        yield ('%d scheduled messages, tick' % count, time_per_operation(ticks(group, 1000), 1000))
+
+
+def nested_task_groups(depth, fan_out):
+    """
+    Returns a tree of task groups 'depth' levels deep, each group
+    holding 'fan_out' others and the groups at the bottom holding
+    'fan_out' waits that never run out.
+    """
+    from _Framework import Task
+    group = Task.TaskGroup(auto_kill=False)
+    for _ in xrange(fan_out):
+        if depth > 1:
+            group.add(nested_task_groups(depth - 1, fan_out))
+        else:
+            group.add(Task.wait(1000000))
+
+    return group
+
+
+@benchmark('task_groups')
+def task_groups():
+    """
+    TaskGroup.update of nested task groups, as a surface's group holds
+    the groups of its components which hold those of their tasks.
+    The waits at the bottom never run out, so they are parked and only
+    the groups above them are visited.
+    """
+    for depth, fan_out in ((1, 64), (2, 8), (3, 4), (6, 2)):
+        group = nested_task_groups(depth, fan_out)
+        yield ('depth %d, fan-out %d, update' % (depth, fan_out), time_per_operation(ticks(group, 1000), 1000))
+
+
+def run_benchmarks(names = None):
+    from .Headless import install
+    install()
+    for name, function in BENCHMARKS:
+        if not names or name in names:
+            for case, microseconds in function():
+                print '%-16s %-44s %12.3f us %14.0f /s' % (name, case, microseconds, 1000000.0 / microseconds if microseconds else 0.0)
+
+
+def main(arguments):
+    unknown = set(arguments) - set([ name for name, _ in BENCHMARKS ])
+    if unknown:
+        print __doc__
+        print 'Unknown benchmarks: %s' % ', '.join(sorted(unknown))
+        return 2
+    run_benchmarks(arguments)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
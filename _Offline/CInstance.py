@@ -0,0 +1,230 @@
+"""
+Stand-in for the c_instance object Live passes to create_instance.  It
+records the MIDI sent by the script and the other requests made to Live,
+so that they can be inspected after driving the script.
+"""
+from __future__ import absolute_import
+from .LomStub import set_listener_caller, script_function
+NOTE_OFF_STATUS = 128
+NOTE_ON_STATUS = 144
+CC_STATUS = 176
+PITCHBEND_STATUS = 224
+SYSEX_START = 240
+
+class Settable(object):
+    """
+    Object accepting any attribute, used for the playhead, note repeat
+    and full velocity objects Live provides.
+    """
+
+    def __init__(self, **attributes):
+        super(Settable, self).__init__()
+        self.__dict__.update(attributes)
+
+
+class Preferences(object):
+    """
+    Preferences of a script, as returned by c_instance.preferences.
+    Converting it to a string yields what the serializer returned last.
+    """
+
+    def __init__(self, *a, **k):
+        super(Preferences, self).__init__(*a, **k)
+        self._serializer = None
+        self.serialized = ''
+
+    def set_serializer(self, serializer):
+        self._serializer = serializer
+
+    def serialize(self):
+        if self._serializer is not None:
+            self.serialized = self._serializer()
+        return self.serialized
+
+    def __str__(self):
+        return self.serialized
+
+
+class MidiMap(object):
+    """
+    The MIDI map built by a script in build_midi_map, as Live keeps it:
+    the messages forwarded to the script and the ones mapped to
+    parameters.  Messages are keyed by status without channel, channel
+    and note or CC number, which is None for pitch bend.  Note off
+    messages go where the note on messages of the same note go.
+    """
+
+    def __init__(self, *a, **k):
+        super(MidiMap, self).__init__(*a, **k)
+        self.forwarded = set()
+        self.mapped = {}
+
+    def clear(self):
+        self.forwarded.clear()
+        self.mapped.clear()
+
+    def key(self, midi_bytes):
+        status = midi_bytes[0] & 240
+        if status == NOTE_OFF_STATUS:
+            status = NOTE_ON_STATUS
+        identifier = midi_bytes[1] if status != PITCHBEND_STATUS else None
+        return (status, midi_bytes[0] & 15, identifier)
+
+    def is_forwarded(self, midi_bytes):
+        """
+        Whether Live passes the message to the script's receive_midi,
+        which it does for sysex and forwarded messages.
+        """
+        return midi_bytes[0] == SYSEX_START or self.key(midi_bytes) in self.forwarded
+
+    def parameter(self, midi_bytes):
+        """
+        Returns the parameter the message is mapped to, if any.
+        """
+        return self.mapped.get(self.key(midi_bytes))
+
+
+_midi_maps = {}
+
+def _forward_function(status):
+
+    def forward(script_handle, midi_map_handle, channel, identifier = None):
+        _midi_maps[midi_map_handle].forwarded.add((status, channel, identifier))
+        return True
+
+    return forward
+
+
+def _map_function(status):
+
+    def map_midi(midi_map_handle, parameter, channel, identifier = None, *a):
+        if status == PITCHBEND_STATUS:
+            identifier = None
+        _midi_maps[midi_map_handle].mapped[status, channel, identifier] = parameter
+        return True
+
+    return map_midi
+
+
+for _status, _kind in ((NOTE_ON_STATUS, 'note'), (CC_STATUS, 'cc'), (PITCHBEND_STATUS, 'pitchbend')):
+    script_function('Live.MidiMap.forward_midi_%s' % _kind, _forward_function(_status))
+    script_function('Live.MidiMap.map_midi_%s' % _kind, _map_function(_status))
+    script_function('Live.MidiMap.map_midi_%s_with_feedback_map' % _kind, _map_function(_status))
+
+class CInstance(object):
+    """
+    Fake c_instance.  'sent_midi' holds the messages sent by the script
+    in order, 'messages' the texts shown in the status bar and 'log' the
+    lines written to the log file.  'midi_map' is the MIDI map built by
+    the script the last time build_midi_map was called.
+    """
+
+    def __init__(self, song = None, handle = 1, instance_identifier = 0, *a, **k):
+        super(CInstance, self).__init__(*a, **k)
+        self._song = song
+        self._handle = handle
+        self._instance_identifier = instance_identifier
+        self._preferences = {}
+        self.sent_midi = []
+        self.messages = []
+        self.log = []
+        self.rebuild_requests = 0
+        self.rebuild_pending = False
+        self.midi_map = _midi_maps[handle] = MidiMap()
+        self.lock_toggles = 0
+        self.lock_updates = 0
+        self.controlled_track = None
+        self.session_highlight = None
+        self.firmware_version = None
+        self.pad_translation = None
+        self.note_translations = []
+        self.cc_translations = []
+        self.feedback_velocity = None
+        self.feedback_channels = None
+        self.playhead = Settable(notes=[], start_time=0.0, step_length=1.0, velocity=0, wrap_around=False, track=None, enabled=False)
+        self.note_repeat = Settable(enabled=False, repeat_rate=1.0)
+        self.full_velocity = Settable(enabled=False)
+
+    def song(self):
+        return self._song
+
+    def handle(self):
+        return self._handle
+
+    def instance_identifier(self):
+        return self._instance_identifier
+
+    def send_midi(self, midi_bytes):
+        self.sent_midi.append(tuple(midi_bytes))
+
+    def send_midi_many(self, messages):
+        self.sent_midi.extend([ tuple(m) for m in messages ])
+
+    def request_rebuild_midi_map(self):
+        self.rebuild_requests += 1
+        self.rebuild_pending = True
+
+    def build_midi_map(self, surface):
+        """
+        Lets the script build its MIDI map from scratch, as Live does
+        when the script is selected and after the script requested a
+        rebuild.
+        """
+        self.rebuild_pending = False
+        self.midi_map.clear()
+        surface.build_midi_map(self._handle)
+
+    def show_message(self, message):
+        self.messages.append(message)
+
+    def log_message(self, message):
+        self.log.append(message)
+
+    def set_listener_caller(self, caller):
+        set_listener_caller(caller)
+
+    def preferences(self, name):
+        if name not in self._preferences:
+            self._preferences[name] = Preferences()
+        return self._preferences[name]
+
+    def toggle_lock(self):
+        self.lock_toggles += 1
+
+    def update_locks(self):
+        self.lock_updates += 1
+
+    def set_controlled_track(self, track):
+        self.controlled_track = track
+
+    def release_controlled_track(self):
+        self.controlled_track = None
+
+    def set_session_highlight(self, *a):
+        self.session_highlight = a
+
+    def set_firmware_version(self, version):
+        self.firmware_version = version
+
+    def set_pad_translation(self, translation):
+        self.pad_translation = translation
+
+    def set_note_translation(self, *a):
+        self.note_translations.append(a)
+
+    def set_cc_translation(self, *a):
+        self.cc_translations.append(a)
+
+    def set_feedback_velocity(self, velocity):
+        self.feedback_velocity = velocity
+
+    def set_feedback_channels(self, channels):
+        self.feedback_channels = channels
+
+    def clear(self):
+        """
+        Forgets the recorded MIDI, messages and log lines.
+        """
+        del self.sent_midi[:]
+        del self.messages[:]
+        del self.log[:]
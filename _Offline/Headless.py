@@ -0,0 +1,359 @@
+"""
+Loads control surface scripts without Live, against the stand-in
+generated by MakeLive.  Example::
+
+    surface, c_instance = load_control_surface('BCR2000')
+    surface.receive_midi((176, 81, 64))
+    surface.update_display()
+    print c_instance.sent_midi
+
+The scripts in this tree were recovered from compiled files, and the
+decompiler spelled some statements in ways Python does not accept or
+that behave differently: assertions come out as 'raise <condition> or
+AssertionError' or as an 'if' block raising AssertionError that goes on
+with the statements following the assertion, and conditional
+assignments as '<condition> and <target> += <value>'.  The scripts are
+therefore imported through ScriptImporter, which compiles them with
+those statements turned back into what they were, without touching the
+files themselves.  Functions whose control flow the decompiler mangled
+beyond these patterns are repaired with the rewrites in SOURCE_REPAIRS,
+which are applied to the source before it is compiled.  Live's built-in
+MidiRemoteScript module is provided by _Offline.MidiRemoteScript.
+"""
+from __future__ import absolute_import
+import imp
+import keyword
+import os
+import re
+import sys
+import tempfile
+import token
+import tokenize
+from StringIO import StringIO
+from .Repairs import repair_source
+SCRIPTS_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUARD_CONDITION = re.compile('^( *)if (.+):\\s*$')
+GUARD_RAISE = re.compile('^( *)raise AssertionError(?:, (.+?))?\\s*$')
+GUARDED_ASSIGNMENT = re.compile('^( *)([\\w.]+) = ([\\w.]+) is not None and \\3\\s*$')
+GUARDED_ATTRIBUTE_ASSIGNMENT = re.compile('^( *)(([\\w.]+)\\.\\w+) = \\3 (!= None|is not None) and (.+?)\\s*$')
+COMPOUND_KEYWORDS = frozenset(('if', 'elif', 'else', 'for', 'while', 'try', 'except', 'finally', 'with', 'def', 'class'))
+AUGMENTED_ASSIGNMENTS = frozenset(('+=', '-=', '*=', '/=', '%=', '&=', '|=', '^=', '>>=', '<<=', '**=', '//='))
+
+def _logical_lines(source):
+    """
+    Yields the tokens of every logical line of the source.
+    """
+    line = []
+    for tok in tokenize.generate_tokens(StringIO(source).readline):
+        if tok[0] in (tokenize.COMMENT, tokenize.NL):
+            continue
+        if tok[0] in (token.NEWLINE, token.ENDMARKER):
+            if line:
+                yield line
+            line = []
+        elif tok[0] not in (token.INDENT, token.DEDENT):
+            line.append(tok)
+
+
+def _depth_zero(tokens):
+    """
+    Yields the index and token of every token outside of brackets.
+    """
+    depth = 0
+    for index, tok in enumerate(tokens):
+        if tok[1] in ('(', '[', '{'):
+            depth += 1
+        elif tok[1] in (')', ']', '}'):
+            depth -= 1
+        elif depth == 0:
+            yield (index, tok)
+
+
+def _assertion_edits(tokens):
+    if tokens[0][1] != 'raise':
+        return []
+    edits = []
+    implication = None
+    for index, tok in enumerate(tokens[1:-1], 1):
+        if tok[1] == 'or' and tokens[index + 1][1] == 'AssertionError':
+            edits.append((tok[2], tokens[index + 1][3], ''))
+            implication = _implication(tokens, index + 2)
+
+    if implication is not None:
+        edits.append((tokens[0][2], tokens[0][3], 'assert not ('))
+        edits.append((implication[2], implication[3], ') or'))
+    elif edits:
+        edits.append((tokens[0][2], tokens[0][3], 'assert'))
+    return edits
+
+
+def _implication(tokens, closing):
+    """
+    Returns the 'and' token of 'raise <A> and (<B> or AssertionError)',
+    which is how the decompiler spells 'assert not <A> or <B>', given the
+    index of the closing bracket.
+    """
+    if closing >= len(tokens) or tokens[closing][1] != ')':
+        return None
+    depth = 0
+    for index in xrange(closing, 0, -1):
+        if tokens[index][1] == ')':
+            depth += 1
+        elif tokens[index][1] == '(':
+            depth -= 1
+            if depth == 0:
+                if tokens[index - 1][1] == 'and':
+                    return tokens[index - 1]
+                return None
+
+
+def _augmented_assignment_edits(tokens):
+    operators = [ index for index, tok in _depth_zero(tokens) if tok[1] in AUGMENTED_ASSIGNMENTS ]
+    if not operators:
+        return []
+    connectives = [ index for index, tok in _depth_zero(tokens[:operators[0]]) if tok[1] in ('and', 'or') ]
+    if not connectives:
+        return []
+    connective = tokens[connectives[-1]]
+    if connective[1] == 'and':
+        return [(tokens[0][2], tokens[0][2], 'if '), (connective[2], connective[3], ':')]
+    return [(tokens[0][2], tokens[0][2], 'if not ('), (connective[2], connective[3], '):')]
+
+
+def _indentation(line):
+    return len(line) - len(line.lstrip(' '))
+
+
+def _split_conditional_statement(line):
+    """
+    Returns the condition and the rest of '<condition> and <call>' or
+    '<target> = <condition> and <value>', where the value is a name or
+    a constant, as (condition, call, target), with target None for the
+    former, or None if the line is neither.
+    """
+    statement = line.strip()
+    try:
+        tokens = [ tok for tok in tokenize.generate_tokens(StringIO(statement + '\n').readline) if tok[0] not in (token.NEWLINE, token.ENDMARKER, tokenize.NL, tokenize.COMMENT) ]
+    except tokenize.TokenError:
+        return None
+
+    if not tokens or tokens[0][1] != 'not' and keyword.iskeyword(tokens[0][1]):
+        return None
+    target = None
+    assignments = [ index for index, tok in _depth_zero(tokens) if tok[1] == '=' ]
+    if assignments:
+        if len(assignments) != 1:
+            return None
+        target = statement[:tokens[assignments[0]][2][1]].strip()
+        tokens = tokens[assignments[0] + 1:]
+    top_level = list(_depth_zero(tokens))
+    if any((tok[1] in ('or', 'if', 'lambda') for _, tok in top_level)):
+        return None
+    connectives = [ index for index, tok in top_level if tok[1] == 'and' ]
+    if not connectives:
+        return None
+    connective = tokens[connectives[-1]]
+    condition = statement[tokens[0][2][1]:connective[2][1]].strip()
+    rest = statement[connective[3][1]:].strip()
+    if target is None:
+        if tokens[-1][1] != ')':
+            return None
+    elif len(tokens) - connectives[-1] != 2 or tokens[-1][0] not in (token.NAME, token.NUMBER):
+        return None
+    return (condition, rest, target)
+
+
+def _fix_conditional_statements(block, indent):
+    """
+    The decompiler nests the statements following an 'if' statement in
+    a guard block into the 'if' statement, which it then spells as
+    '<condition> and <call>' or '<target> = <condition> and <value>'.
+    Turns the first such statement that is followed by other statements
+    of the block back into an 'if' statement with the rest of the block
+    as its body, which is done again for the body.
+    """
+    index = 0
+    while index < len(block):
+        line = block[index]
+        following = [ other for other in block[index + 1:] if other.strip() ]
+        if line.strip() and _indentation(line) == indent and following:
+            split = _split_conditional_statement(line)
+            next_line = following[0].strip()
+            if split is not None and (split[2] is None or next_line.split(' ')[0].rstrip(':') not in COMPOUND_KEYWORDS):
+                condition, rest, target = split
+                if target is None:
+                    block[index] = '%sif %s and (%s or True):\n' % (' ' * indent, condition, rest)
+                else:
+                    block[index] = '%sif %s:\n' % (' ' * indent, condition)
+                for other in xrange(index + 1, len(block)):
+                    if block[other].strip():
+                        if target is not None:
+                            block[other] = '%s%s = %s; %s' % (' ' * (indent + 4), target, rest, block[other].lstrip(' '))
+                            target = None
+                        else:
+                            block[other] = '    ' + block[other]
+
+                indent += 4
+        index += 1
+
+    return block
+
+
+def _fix_guard_blocks(lines):
+    """
+    Turns 'if <condition>: raise AssertionError' blocks that go on after
+    the raise back into an assertion followed by the rest of the block,
+    unless an elif or else clause depends on the block, repairing the
+    'if' statements nested into the rest with
+    _fix_conditional_statements, and
+    '<target> = <name> is not None and <name>' and
+    '<name>.<attribute> = <name> != None and <value>' back into
+    conditional assignments.  The number of lines stays the same.
+    """
+    index = 0
+    while index < len(lines) - 2:
+        match = GUARD_CONDITION.match(lines[index])
+        raised = GUARD_RAISE.match(lines[index + 1])
+        if match and raised and raised.group(1) == match.group(1) + '    ' and _indentation(lines[index + 2]) == len(raised.group(1)) and lines[index + 2].strip():
+            indent = len(match.group(1))
+            end = index + 2
+            while end < len(lines) and (not lines[end].strip() or _indentation(lines[end]) > indent):
+                end += 1
+
+            if end >= len(lines) or not lines[end].lstrip().startswith(('elif', 'else')):
+                message = ', ' + raised.group(2) if raised.group(2) else ''
+                lines[index] = '%sassert not (%s)%s\n' % (match.group(1), match.group(2), message)
+                lines[index + 1:end] = ['\n'] + _fix_conditional_statements([ line[4:] if line.strip() else line for line in lines[index + 2:end] ], indent)
+        else:
+            match = GUARDED_ASSIGNMENT.match(lines[index])
+            if match:
+                lines[index] = '%sif %s is not None: %s = %s\n' % (match.group(1),
+                 match.group(3),
+                 match.group(2),
+                 match.group(3))
+            match = GUARDED_ATTRIBUTE_ASSIGNMENT.match(lines[index])
+            if match:
+                lines[index] = '%sif %s %s: %s = %s\n' % (match.group(1),
+                 match.group(3),
+                 match.group(4),
+                 match.group(2),
+                 match.group(5))
+        index += 1
+
+    return lines
+
+
+def fix_decompiled_source(source):
+    """
+    Returns the source with the decompiled assertions and conditional
+    augmented assignments turned back into Python.
+    """
+    source = ''.join(_fix_guard_blocks(source.splitlines(True)))
+    edits = []
+    for tokens in _logical_lines(source):
+        edits.extend(_assertion_edits(tokens))
+        edits.extend(_augmented_assignment_edits(tokens))
+
+    if not edits:
+        return source
+    lines = source.splitlines(True)
+    for (start_row, start_column), (end_row, end_column), replacement in sorted(edits, reverse=True):
+        start = lines[start_row - 1]
+        end = lines[end_row - 1]
+        if end_row != start_row:
+            lines[start_row:end_row] = []
+        lines[start_row - 1] = start[:start_column] + replacement + end[end_column:]
+
+    return ''.join(lines)
+
+
+class ScriptImporter(object):
+    """
+    Import hook compiling the modules below SCRIPTS_DIRECTORY with
+    fix_decompiled_source.
+    """
+
+    def __init__(self, directory = SCRIPTS_DIRECTORY, *a, **k):
+        super(ScriptImporter, self).__init__(*a, **k)
+        self._directory = os.path.abspath(directory)
+        self._found = {}
+
+    def find_module(self, fullname, path = None):
+        name = fullname.rpartition('.')[2]
+        for directory in path if path is not None else sys.path:
+            directory = os.path.abspath(directory or '.')
+            if not directory.startswith(self._directory):
+                continue
+            package = os.path.join(directory, name)
+            init = os.path.join(package, '__init__.py')
+            if os.path.isfile(init):
+                self._found[fullname] = (init, package)
+                return self
+            module = package + '.py'
+            if os.path.isfile(module):
+                self._found[fullname] = (module, None)
+                return self
+
+    def load_module(self, fullname):
+        if fullname in sys.modules:
+            return sys.modules[fullname]
+        file_name, package = self._found.pop(fullname)
+        with open(file_name, 'rU') as f:
+            source = fix_decompiled_source(repair_source(os.path.relpath(file_name, SCRIPTS_DIRECTORY), f.read()))
+        module = imp.new_module(fullname)
+        module.__file__ = file_name
+        module.__loader__ = self
+        if package is not None:
+            module.__path__ = [package]
+            module.__package__ = fullname
+        else:
+            module.__package__ = fullname.rpartition('.')[0]
+        sys.modules[fullname] = module
+        try:
+            exec compile(source, file_name, 'exec', 0, True) in module.__dict__
+        except:
+            del sys.modules[fullname]
+            raise
+
+        return module
+
+
+_live_directory = [None]
+
+def install(documentation = None):
+    """
+    Generates the Live stand-in into a temporary directory, unless that
+    already happened, and makes it and the scripts importable.
+    """
+    if _live_directory[0] is None:
+        from .MakeLive import make_live, DEFAULT_DOCUMENTATION
+        directory = tempfile.mkdtemp(prefix='offline_live_')
+        make_live(documentation or DEFAULT_DOCUMENTATION, directory)
+        sys.path.insert(0, directory)
+        from . import MidiRemoteScript
+        sys.modules.setdefault('MidiRemoteScript', MidiRemoteScript)
+        if SCRIPTS_DIRECTORY not in sys.path:
+            sys.path.append(SCRIPTS_DIRECTORY)
+        sys.meta_path.insert(0, ScriptImporter())
+        _live_directory[0] = directory
+    return _live_directory[0]
+
+
+def load_control_surface(name, song = None, **song_options):
+    """
+    Creates the control surface script of the given name for a fake
+    c_instance and builds its MIDI map, as Live does when the script is
+    selected.  Returns the script and the c_instance.  Unless a song is
+    given, one is made by LiveSet.make_song with 'song_options'.
+    """
+    install()
+    from .CInstance import CInstance
+    from .LiveSet import make_application, make_song
+    make_application()
+    if song is None:
+        song = make_song(**song_options)
+    c_instance = CInstance(song=song)
+    module = __import__(name)
+    surface = module.create_instance(c_instance)
+    c_instance.build_midi_map(surface)
+    return (surface, c_instance)
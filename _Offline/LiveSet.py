@@ -0,0 +1,92 @@
+"""
+Builds populated Live sets out of the generated Live classes, with
+tracks, clip slots, scenes, mixer devices and devices, for driving
+control surface scripts offline.
+"""
+from __future__ import absolute_import
+import Live
+
+def make_parameter(name = 'Parameter', value = 0.0, min = 0.0, max = 1.0, is_quantized = False, canonical_parent = None, value_items = ()):
+    parameter = Live.DeviceParameter.DeviceParameter(name=name, original_name=name, value=value, min=min, max=max, default_value=value, is_quantized=is_quantized, is_enabled=True, automation_state=Live.DeviceParameter.AutomationState.none, canonical_parent=canonical_parent)
+    parameter.value_items = tuple(value_items)
+    parameter.script('str_for_value', lambda value: '%.2f' % value)
+    return parameter
+
+
+def make_device(name = 'Device', class_name = 'PluginDevice', num_parameters = 8, canonical_parent = None):
+    device = Live.Device.Device(name=name, class_name=class_name, class_display_name=class_name, type=Live.Device.DeviceType.audio_effect, canonical_parent=canonical_parent)
+    device.parameters = tuple([make_parameter('Device On', 1.0, is_quantized=True, canonical_parent=device)] + [ make_parameter('%s %d' % (name, index + 1), canonical_parent=device) for index in xrange(num_parameters) ])
+    device.view = Live.Device.Device.View(canonical_parent=device, is_collapsed=False)
+    return device
+
+
+def make_mixer_device(num_sends = 2, canonical_parent = None):
+    mixer = Live.MixerDevice.MixerDevice(canonical_parent=canonical_parent, crossfade_assign=Live.MixerDevice.MixerDevice.crossfade_assignments.NONE)
+    mixer.volume = make_parameter('Track Volume', 0.85, canonical_parent=mixer)
+    mixer.panning = make_parameter('Track Panning', 0.0, -1.0, 1.0, canonical_parent=mixer)
+    mixer.track_activator = make_parameter('Speaker On', 1.0, is_quantized=True, canonical_parent=mixer)
+    mixer.sends = tuple([ make_parameter('Send %s' % chr(ord('A') + index), canonical_parent=mixer) for index in xrange(num_sends) ])
+    mixer.crossfader = make_parameter('Crossfade', 0.0, -1.0, 1.0, canonical_parent=mixer)
+    mixer.cue_volume = make_parameter('Cue Volume', 0.85, canonical_parent=mixer)
+    mixer.song_tempo = make_parameter('Song Tempo', 120.0, 20.0, 999.0, canonical_parent=mixer)
+    return mixer
+
+
+def make_clip(name = 'Clip', length = 4.0, canonical_parent = None):
+    clip = Live.Clip.Clip(name=name, length=length, loop_start=0.0, loop_end=length, start_marker=0.0, end_marker=length, looping=True, is_midi_clip=True, is_audio_clip=False, color=0, playing_position=0.0, canonical_parent=canonical_parent)
+    clip.view = Live.Clip.Clip.View(canonical_parent=clip)
+    clip.script('get_notes', lambda *a: ())
+    return clip
+
+
+def make_clip_slot(has_clip = False, canonical_parent = None):
+    clip_slot = Live.ClipSlot.ClipSlot(has_stop_button=True, color=None, playing_status=0, canonical_parent=canonical_parent)
+    if has_clip:
+        clip_slot.clip = make_clip(canonical_parent=clip_slot)
+        clip_slot.has_clip = True
+    return clip_slot
+
+
+def make_track(name = 'Track', num_scenes = 8, num_sends = 2, num_devices = 1, can_be_armed = True, clips = (), canonical_parent = None):
+    track = Live.Track.Track(name=name, color=0, can_be_armed=can_be_armed, has_audio_input=False, has_midi_input=True, has_audio_output=True, is_visible=True, fold_state=0, playing_slot_index=-1, fired_slot_index=-1, current_monitoring_state=Live.Track.Track.monitoring_states.AUTO, current_input_routing='All Ins', current_input_sub_routing='All Channels', output_meter_level=0.0, output_meter_left=0.0, output_meter_right=0.0, canonical_parent=canonical_parent)
+    track.mixer_device = make_mixer_device(num_sends, canonical_parent=track)
+    track.clip_slots = tuple([ make_clip_slot(index in clips, canonical_parent=track) for index in xrange(num_scenes) ])
+    track.devices = tuple([ make_device('%s Device %d' % (name, index + 1), canonical_parent=track) for index in xrange(num_devices) ])
+    track.view = Live.Track.Track.View(canonical_parent=track, selected_device=track.devices[0] if track.devices else None, device_insert_mode=Live.Track.DeviceInsertMode.default)
+    return track
+
+
+def make_song(num_tracks = 8, num_scenes = 8, num_returns = 2, clips = ()):
+    """
+    Returns a song with the given number of MIDI tracks, scenes and
+    return tracks.  'clips' is a collection of (track index, scene
+    index) pairs of the clip slots that contain a clip.
+    """
+    song = Live.Song.Song(tempo=120.0, signature_numerator=4, signature_denominator=4, current_song_time=0.0, is_playing=False, record_mode=False, overdub=False, metronome=False, loop=False, loop_start=0.0, loop_length=16.0, swing_amount=0.0, clip_trigger_quantization=Live.Song.Quantization.q_bar, midi_recording_quantization=Live.Song.RecordingQuantization.rec_q_no_q, session_record_status=Live.Song.SessionRecordStatus.off, exclusive_arm=True, exclusive_solo=True)
+    song.tracks = tuple([ make_track('%d-MIDI' % (index + 1), num_scenes, num_returns, clips=[ scene for track, scene in clips if track == index ], canonical_parent=song) for index in xrange(num_tracks) ])
+    song.visible_tracks = song.tracks
+    song.return_tracks = tuple([ make_track('%s-Return' % chr(ord('A') + index), 0, num_returns, can_be_armed=False, canonical_parent=song) for index in xrange(num_returns) ])
+    song.master_track = make_track('Master', 0, 0, can_be_armed=False, canonical_parent=song)
+    song.scenes = tuple([ Live.Scene.Scene(name=str(index + 1), color=0, tempo=-1.0, canonical_parent=song) for index in xrange(num_scenes) ])
+    for index, scene in enumerate(song.scenes):
+        scene.clip_slots = tuple([ track.clip_slots[index] for track in song.tracks ])
+
+    song.view = Live.Song.Song.View(canonical_parent=song, selected_track=song.tracks[0] if song.tracks else song.master_track, selected_scene=song.scenes[0] if song.scenes else None, follow_song=False, draw_mode=True)
+    song.script('get_beats_loop_length', lambda *a: None)
+    song.script('get_current_beats_song_time', lambda : Live.Song.BeatTime(bars=1, beats=1, sub_division=1, ticks=0))
+    return song
+
+
+def make_application(major_version = 9, minor_version = 1, bugfix_version = 4):
+    """
+    Sets up the application returned by Live.Application.get_application
+    with a view showing the session and the given version.
+    """
+    application = Live.Application.get_application()
+    application.view = Live.Application.Application.View(canonical_parent=application, focused_document_view='Session', browse_mode=False)
+    application.view.script('is_view_visible', lambda identifier, main_window_only = True: identifier != 'Arranger')
+    application.browser = Live.Browser.Browser(canonical_parent=application)
+    application.script('get_major_version', lambda : major_version)
+    application.script('get_minor_version', lambda : minor_version)
+    application.script('get_bugfix_version', lambda : bugfix_version)
+    return application
@@ -0,0 +1,245 @@
+"""
+Runtime support for the offline stand-in of the Live module.
+
+The modules generated by MakeLive only declare the classes, properties
+and methods found in the API documentation.  Everything they need to
+behave like Live objects -- property storage, listeners, scriptable
+method results and enumerations -- lives here.
+"""
+from __future__ import absolute_import
+_listener_caller = [None]
+
+def set_listener_caller(caller):
+    """
+    Installs the function that is used to call listeners, as
+    c_instance.set_listener_caller does in Live.  Passing None calls
+    listeners directly.
+    """
+    _listener_caller[0] = caller
+
+
+class LomListener(object):
+    """
+    Wraps a listener the way Live hands it to the listener caller.
+    """
+
+    def __init__(self, subject = None, property_name = None, callback = None, *a, **k):
+        super(LomListener, self).__init__(*a, **k)
+        self.subject = subject
+        self.property_name = property_name
+        self.callback = callback
+        self.name = '%s.%s' % (subject.__class__.__name__, property_name if isinstance(property_name, str) else property_name[0])
+
+    def __call__(self):
+        return self.callback()
+
+    def disconnect(self):
+        self.subject._remove_listener(self.property_name, self.callback)
+
+
+def _listener_key(property_name, args):
+    """
+    Listeners taking arguments besides the listener, like the view
+    visibility listeners of the application, are keyed by them too.
+    """
+    if len(args) > 1:
+        return (property_name,) + tuple(args[:-1])
+    return property_name
+
+
+def _make_listener_methods(property_name):
+
+    def add_listener(self, *a):
+        self._add_listener(_listener_key(property_name, a), a[-1])
+
+    def remove_listener(self, *a):
+        self._remove_listener(_listener_key(property_name, a), a[-1])
+
+    def has_listener(self, *a):
+        return self._has_listener(_listener_key(property_name, a), a[-1])
+
+    add_listener.__name__ = 'add_%s_listener' % property_name
+    remove_listener.__name__ = 'remove_%s_listener' % property_name
+    has_listener.__name__ = '%s_has_listener' % property_name
+    return (add_listener, remove_listener, has_listener)
+
+
+class LomClass(type):
+    """
+    Metaclass that adds the add/remove/has listener methods for every
+    property named in __listenable__.
+    """
+
+    def __init__(cls, name, bases, dct):
+        super(LomClass, cls).__init__(name, bases, dct)
+        for property_name in dct.get('__listenable__', ()):
+            add_listener, remove_listener, has_listener = _make_listener_methods(property_name)
+            for method in (add_listener, remove_listener, has_listener):
+                if method.__name__ not in dct:
+                    setattr(cls, method.__name__, method)
+
+
+class LomObject(object):
+    """
+    Base class of all generated Live classes.  Properties can be set
+    from the constructor or later on, and setting a property to a new
+    value notifies its listeners.  Method results can be scripted with
+    'script'.
+    """
+    __metaclass__ = LomClass
+    __listenable__ = ()
+
+    def __init__(self, *a, **properties):
+        super(LomObject, self).__init__()
+        self._lom_listeners = {}
+        self._lom_handlers = {}
+        for name, value in properties.iteritems():
+            setattr(self, name, value)
+
+    def script(self, method_name, handler):
+        """
+        Makes calls to 'method_name' return the result of 'handler',
+        which is called with the same arguments.
+        """
+        self._lom_handlers[method_name] = handler
+
+    def notify(self, property_name, *args):
+        """
+        Calls the listeners of the given property, or of the ones
+        connected with the given arguments.
+        """
+        property_name = _listener_key(property_name, args + (None,))
+        listeners = self._lom_listeners.get(property_name)
+        if listeners:
+            caller = _listener_caller[0]
+            for listener in tuple(listeners):
+                if caller is not None:
+                    caller(LomListener(self, property_name, listener))
+                else:
+                    listener()
+
+    def _call(self, method_name, default, a, k):
+        handler = self._lom_handlers.get(method_name)
+        if handler is not None:
+            return handler(*a, **k)
+        return default
+
+    def _add_listener(self, property_name, listener):
+        listeners = self._lom_listeners.setdefault(property_name, [])
+        if listener in listeners:
+            raise RuntimeError('Listener already connected')
+        listeners.append(listener)
+
+    def _remove_listener(self, property_name, listener):
+        listeners = self._lom_listeners.get(property_name, [])
+        if listener not in listeners:
+            raise RuntimeError('Listener not connected')
+        listeners.remove(listener)
+
+    def _has_listener(self, property_name, listener):
+        return listener in self._lom_listeners.get(property_name, ())
+
+
+def lom_property(name, default = None):
+    """
+    Property storing its value in the object and notifying the
+    listeners of 'name' when it changes.
+    """
+    attribute = '_lom_' + name
+
+    def getter(self):
+        return getattr(self, attribute, default)
+
+    def setter(self, value):
+        old_value = getattr(self, attribute, default)
+        setattr(self, attribute, value)
+        if old_value is not value and old_value != value:
+            self.notify(name)
+
+    return property(getter, setter)
+
+
+def lom_method(name, default = None):
+    """
+    Method returning 'default' unless it has been scripted.
+    """
+
+    def method(self, *a, **k):
+        return self._call(name, default, a, k)
+
+    method.__name__ = name
+    return method
+
+
+def lom_function(name, default = None):
+    """
+    Module level function returning 'default' unless it has been
+    scripted with script_function.
+    """
+
+    def function(*a, **k):
+        handler = _function_handlers.get(name)
+        if handler is not None:
+            return handler(*a, **k)
+        return default
+
+    function.__name__ = name.split('.')[-1]
+    return function
+
+
+_function_handlers = {}
+
+def script_function(name, handler):
+    """
+    Makes calls to the module level function with the given dotted
+    name, e.g. 'Live.MidiMap.forward_midi_cc', return the result of
+    'handler'.
+    """
+    _function_handlers[name] = handler
+
+
+class LomEnumValue(int):
+    """
+    Value of a Live enumeration, an int that knows its name.
+    """
+
+    def __new__(cls, value, name = None, qualified_name = None):
+        self = super(LomEnumValue, cls).__new__(cls, value)
+        self.name = name
+        self.qualified_name = qualified_name
+        return self
+
+    def __repr__(self):
+        return self.qualified_name
+
+    __str__ = __repr__
+
+
+class LomEnum(object):
+    """
+    Base class of the generated enumerations.  'values' maps the value
+    numbers to the enumeration values.
+    """
+    values = {}
+
+
+class LomVector(list):
+    """
+    Base class of the Live vector types.
+    """
+    pass
+
+
+_singletons = {}
+
+def singleton(cls):
+    """
+    Returns the single instance of 'cls', e.g. the application.
+    """
+    if cls not in _singletons:
+        _singletons[cls] = cls()
+    return _singletons[cls]
+
+
+def reset_singletons():
+    _singletons.clear()
@@ -0,0 +1,254 @@
+"""
+Generates an offline stand-in of the Live module from the API
+documentation in doc/, so that control surface scripts can be loaded
+and driven without Live.  Usage::
+
+    python -m _Offline.MakeLive [documentation.xml] [output directory]
+
+The output directory receives a 'Live' package with one module per
+documented Live module.  The generated classes derive from the types in
+LomStub, which provides property storage, listeners and scriptable
+method results.  The documentation does not give the numbers of the
+enumeration values, so they are numbered in documentation order.
+"""
+from __future__ import absolute_import
+import os
+import re
+import sys
+from HTMLParser import HTMLParser
+from xml.etree import ElementTree
+DEFAULT_DOCUMENTATION = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'doc', 'Live9.1.4.xml')
+LISTENER_METHOD = re.compile('^(add|remove)_(\\w+)_listener$|^(\\w+)_has_listener$')
+RETURN_TYPE = re.compile('->\\s*(\\w+)\\s*:')
+RETURN_DEFAULTS = {'None': 'None',
+ 'bool': 'False',
+ 'int': '0',
+ 'float': '0.0',
+ 'list': '[]',
+ 'tuple': '()',
+ 'str': "''"}
+FUNCTION_DEFAULTS = {'Live.MidiMap': {'bool': 'True'}}
+VECTOR_CLASSES = ('Vector', 'IntVector', 'StringVector', 'BrowserItemVector')
+EXCEPTION_CLASSES = ('LimitationError',)
+INDENT = '    '
+
+class Node(object):
+    """
+    A documented entity, i.e. a module, class, enumeration, property,
+    method, function or enumeration value.
+    """
+
+    def __init__(self, kind = None, name = None, *a, **k):
+        super(Node, self).__init__(*a, **k)
+        self.kind = kind
+        self.name = name
+        self.doc = ''
+        self.children = []
+        self.by_name = {}
+
+    def add(self, node):
+        self.children.append(node)
+        self.by_name[node.name] = node
+
+    def nodes_of_kind(self, *kinds):
+        return [ c for c in self.children if c.kind in kinds ]
+
+    @property
+    def return_type(self):
+        match = RETURN_TYPE.search(self.doc)
+        if match:
+            return match.group(1)
+
+
+def _clean_text(text):
+    return ' '.join(HTMLParser().unescape(text or '').split())
+
+
+def parse_documentation(path):
+    """
+    Reads the documentation and returns the tree of documented
+    entities, rooted at a node for the 'Live' module.
+    """
+    root = Node('Module', 'Live')
+    nodes = {'Live': root}
+    last = None
+    for element in ElementTree.parse(path).getroot():
+        if element.tag == 'Doc':
+            if last is not None:
+                last.doc = _clean_text(element.text)
+            continue
+        qualified_name = (element.text or '').strip()
+        if qualified_name.endswith('()'):
+            qualified_name = qualified_name[:-2]
+        if qualified_name in nodes:
+            last = nodes[qualified_name]
+            continue
+        parent_name, _, name = qualified_name.rpartition('.')
+        parent = nodes.get(parent_name)
+        if parent is None:
+            last = None
+            continue
+        kind = element.tag
+        if kind == 'Sub-Class':
+            kind = 'Class'
+        last = Node(kind, name)
+        nodes[qualified_name] = last
+        parent.add(last)
+
+    return root
+
+
+def _is_enumeration(node):
+    return bool(node.nodes_of_kind('Value'))
+
+
+def _property_default(name):
+    if name.startswith(('is_', 'has_', 'can_')) or name in ('mute', 'solo', 'arm', 'muted', 'looping'):
+        return 'False'
+    if name.endswith('s') and not name.endswith(('_status', 'ss')):
+        return '()'
+    if name == 'name':
+        return "''"
+
+
+def _docstring(doc, indent):
+    doc = doc.replace('\\', '\\\\').replace('"""', '\\"\\"\\"')
+    return '%s"""\n%s%s\n%s"""' % (indent,
+     indent,
+     doc,
+     indent)
+
+
+def _write_enumeration(lines, node, qualified_name, indent):
+    lines.append('%sclass %s(LomEnum):' % (indent, node.name))
+    inner = indent + INDENT
+    if node.doc:
+        lines.append(_docstring(node.doc, inner))
+    values = node.nodes_of_kind('Value')
+    for number, value in enumerate(values):
+        lines.append('%s%s = LomEnumValue(%d, %r, %r)' % (inner,
+         value.name,
+         number,
+         value.name,
+         '%s.%s' % (qualified_name, value.name)))
+
+    lines.append('%svalues = dict([ (int(v), v) for v in (%s,) ])' % (inner, ', '.join([ v.name for v in values ])))
+    lines.append('')
+
+
+def _write_class(lines, node, qualified_name, indent):
+    if _is_enumeration(node):
+        return _write_enumeration(lines, node, qualified_name, indent)
+    inner = indent + INDENT
+    if node.name in VECTOR_CLASSES:
+        lines.append('%sclass %s(LomVector):' % (indent, node.name))
+        lines.append(_docstring(node.doc or node.name, inner))
+        lines.append('')
+        return
+    if node.name in EXCEPTION_CLASSES:
+        lines.append('%sclass %s(Exception):' % (indent, node.name))
+        lines.append(_docstring(node.doc or node.name, inner))
+        lines.append('')
+        return
+    lines.append('%sclass %s(LomObject):' % (indent, node.name))
+    if node.doc:
+        lines.append(_docstring(node.doc, inner))
+    listenable = []
+    methods = []
+    for child in node.nodes_of_kind('Method'):
+        match = LISTENER_METHOD.match(child.name)
+        if match:
+            property_name = match.group(2) or match.group(3)
+            if property_name not in listenable:
+                listenable.append(property_name)
+        else:
+            methods.append(child)
+
+    lines.append('%s__listenable__ = %r' % (inner, tuple(listenable)))
+    for child in node.nodes_of_kind('Class'):
+        _write_class(lines, child, '%s.%s' % (qualified_name, child.name), inner)
+
+    for child in node.nodes_of_kind('Property'):
+        lines.append('%s%s = lom_property(%r, %s)' % (inner,
+         child.name,
+         child.name,
+         _property_default(child.name)))
+
+    for child in methods:
+        if child.name in ('__init__',):
+            continue
+        lines.append('%s%s = lom_method(%r, %s)' % (inner,
+         child.name,
+         child.name,
+         RETURN_DEFAULTS.get(child.return_type, 'None')))
+
+    lines.append('')
+
+
+def _write_function(lines, node, module_name):
+    if node.name == 'get_application':
+        lines.append('def get_application():')
+        lines.append('%sreturn singleton(Application)' % INDENT)
+        lines.append('')
+        return
+    defaults = dict(RETURN_DEFAULTS)
+    defaults.update(FUNCTION_DEFAULTS.get(module_name, {}))
+    lines.append('%s = lom_function(%r, %s)' % (node.name,
+     '%s.%s' % (module_name, node.name),
+     defaults.get(node.return_type, 'None')))
+
+
+def generate_module(node, module_name):
+    """
+    Returns the source of the stand-in for the given Live module.
+    """
+    lines = ['"""',
+     'Offline stand-in for %s, generated by _Offline.MakeLive.' % module_name,
+     'Do not edit.',
+     '"""',
+     'from __future__ import absolute_import',
+     'from _Offline.LomStub import LomObject, LomEnum, LomEnumValue, LomVector, lom_property, lom_method, lom_function, singleton',
+     '']
+    for child in node.nodes_of_kind('Class'):
+        _write_class(lines, child, '%s.%s' % (module_name, child.name), '')
+
+    for child in node.nodes_of_kind('Built-In'):
+        _write_function(lines, child, module_name)
+
+    return '\n'.join(lines) + '\n'
+
+
+def generate_package(root):
+    """
+    Returns a dictionary mapping file names to the sources of the
+    'Live' package.
+    """
+    files = {}
+    modules = root.nodes_of_kind('Module')
+    for module in modules:
+        files[module.name + '.py'] = generate_module(module, 'Live.' + module.name)
+
+    files['__init__.py'] = '"""\nOffline stand-in for Live, generated by _Offline.MakeLive.\nDo not edit.\n"""\nfrom __future__ import absolute_import\n' + ''.join([ 'from . import %s\n' % m.name for m in modules ])
+    return files
+
+
+def make_live(documentation = DEFAULT_DOCUMENTATION, output_directory = '.'):
+    """
+    Writes the 'Live' package into 'output_directory' and returns the
+    path of the package.
+    """
+    package = os.path.join(output_directory, 'Live')
+    if not os.path.isdir(package):
+        os.makedirs(package)
+    for file_name, source in generate_package(parse_documentation(documentation)).iteritems():
+        with open(os.path.join(package, file_name), 'w') as f:
+            f.write(source)
+
+    return package
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    documentation = arguments[0] if len(arguments) > 0 else DEFAULT_DOCUMENTATION
+    output_directory = arguments[1] if len(arguments) > 1 else '.'
+    print make_live(documentation, output_directory)
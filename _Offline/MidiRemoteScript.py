@@ -0,0 +1,5 @@
+"""
+Stand-in for Live's built-in MidiRemoteScript module.  The scripts in
+this tree import it without using anything from it, so it is empty;
+Headless.install makes it importable under its own name.
+"""
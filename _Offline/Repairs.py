@@ -0,0 +1,389 @@
+"""
+Rewrites of the functions whose control flow the decompiler mangled
+beyond what Headless.fix_decompiled_source repairs, typically an 'if'
+statement whose condition was merged into a preceding assertion, or an
+assertion that ended up guarding an 'else' clause.  SOURCE_REPAIRS maps
+the path of a script file, relative to the scripts directory, to pairs
+of the mangled text and what it was before compiling.  They are applied
+to the source when a script is imported, leaving the files untouched.
+A rewrite whose mangled text is not found, because the file was fixed
+in the meantime, is skipped.
+"""
+from __future__ import absolute_import
+import os
+SOURCE_REPAIRS = {'_Framework/ControlSurfaceComponent.py': (("""
+        if self._recursive_is_enabled:
+            is_enabled = self._explicit_is_enabled
+            self._is_enabled = is_enabled != self._is_enabled and is_enabled
+            self._internal_on_enabled_changed()
+            self.on_enabled_changed()
+""", """
+        is_enabled = self._recursive_is_enabled and self._explicit_is_enabled
+        if is_enabled != self._is_enabled:
+            self._is_enabled = is_enabled
+            self._internal_on_enabled_changed()
+            self.on_enabled_changed()
+"""),),
+ '_Framework/ComboElement.py': (("""
+        if not (element == self._wrapped_control and (priority is None or 1 - priority + int(priority) > self.priority_increment)):
+            raise AssertionError, 'Attempting to increase the priority over a whole unit. ' + 'Make sure the combo element is not inside another combo element'
+            priority = DEFAULT_PRIORITY if priority is None else priority
+            return priority + self.priority_increment
+        return priority
+""", """
+        if element == self._wrapped_control:
+            assert priority is None or 1 - priority + int(priority) > self.priority_increment, 'Attempting to increase the priority over a whole unit. ' + 'Make sure the combo element is not inside another combo element'
+            priority = DEFAULT_PRIORITY if priority is None else priority
+            return priority + self.priority_increment
+        return priority
+"""),),
+ '_Framework/CompoundElement.py': (("""
+        if not element not in self._nested_control_elements:
+            raise AssertionError
+            self._nested_control_elements[element] = False
+            if self._listen_nested_requests > 0:
+                self._on_nested_control_element_value.add_subject(element)
+            priority = self._is_resource_based and self.resource.owner and self.get_control_element_priority(element, self.resource.max_priority)
+            nested_client = self._get_nested_client(self.resource.owner)
+            element.resource.grab(nested_client, priority=priority)
+        elif not self._is_resource_based:
+            with self._disable_notify_owner_on_button_ownership_change():
+                element.notify_ownership_change(self, True)
+""", """
+        assert element not in self._nested_control_elements
+        self._nested_control_elements[element] = False
+        if self._listen_nested_requests > 0:
+            self._on_nested_control_element_value.add_subject(element)
+        if self._is_resource_based:
+            if self.resource.owner:
+                priority = self.get_control_element_priority(element, self.resource.max_priority)
+                nested_client = self._get_nested_client(self.resource.owner)
+                element.resource.grab(nested_client, priority=priority)
+        else:
+            with self._disable_notify_owner_on_button_ownership_change():
+                element.notify_ownership_change(self, True)
+"""),),
+ '_Framework/ControlSurface.py': (("""
+        if not type in (MIDI_CC_TYPE, MIDI_NOTE_TYPE):
+            raise AssertionError
+            raise from_identifier in range(128) or AssertionError
+            raise from_channel in range(16) or AssertionError
+            raise to_identifier in range(128) or AssertionError
+            raise to_channel in range(16) or AssertionError
+            type == MIDI_CC_TYPE and self._c_instance.set_cc_translation(from_identifier, from_channel, to_identifier, to_channel)
+        elif type == MIDI_NOTE_TYPE:
+""", """
+        assert type in (MIDI_CC_TYPE, MIDI_NOTE_TYPE)
+        assert from_identifier in range(128)
+        assert from_channel in range(16)
+        assert to_identifier in range(128)
+        assert to_channel in range(16)
+        if type == MIDI_CC_TYPE:
+            self._c_instance.set_cc_translation(from_identifier, from_channel, to_identifier, to_channel)
+        elif type == MIDI_NOTE_TYPE:
+"""), ("""
+        if not self._in_build_midi_map:
+            raise AssertionError
+            raise control != None and parameter != None or AssertionError
+            raise isinstance(parameter, Live.DeviceParameter.DeviceParameter) or AssertionError
+            raise isinstance(control, InputControlElement) or AssertionError
+            raise isinstance(feedback_delay, int) or AssertionError
+            if not isinstance(feedback_map, tuple):
+                raise AssertionError
+                success = False
+                feedback_rule = None
+                feedback_rule = control.message_type() is MIDI_NOTE_TYPE and Live.MidiMap.NoteFeedbackRule()
+                feedback_rule.note_no = control.message_identifier()
+                feedback_rule.vel_map = feedback_map
+            elif control.message_type() is MIDI_CC_TYPE:
+                feedback_rule = Live.MidiMap.CCFeedbackRule()
+                feedback_rule.cc_no = control.message_identifier()
+                feedback_rule.cc_value_map = feedback_map
+            elif control.message_type() is MIDI_PB_TYPE:
+                feedback_rule = Live.MidiMap.PitchBendFeedbackRule()
+                feedback_rule.value_pair_map = feedback_map
+            if not feedback_rule != None:
+                raise AssertionError
+                feedback_rule.channel = control.message_channel()
+                feedback_rule.delay_in_ms = feedback_delay
+                success = control.message_type() is MIDI_NOTE_TYPE and Live.MidiMap.map_midi_note_with_feedback_map(midi_map_handle, parameter, control.message_channel(), control.message_identifier(), feedback_rule)
+            elif control.message_type() is MIDI_CC_TYPE:
+                success = Live.MidiMap.map_midi_cc_with_feedback_map(midi_map_handle, parameter, control.message_channel(), control.message_identifier(), control.message_map_mode(), feedback_rule, not control.needs_takeover(), control.mapping_sensitivity)
+            elif control.message_type() is MIDI_PB_TYPE:
+                success = Live.MidiMap.map_midi_pitchbend_with_feedback_map(midi_map_handle, parameter, control.message_channel(), feedback_rule, not control.needs_takeover())
+            success and Live.MidiMap.send_feedback_for_parameter(midi_map_handle, parameter)
+        return success
+""", """
+        assert self._in_build_midi_map
+        assert control != None and parameter != None
+        assert isinstance(parameter, Live.DeviceParameter.DeviceParameter)
+        assert isinstance(control, InputControlElement)
+        assert isinstance(feedback_delay, int)
+        assert isinstance(feedback_map, tuple)
+        success = False
+        feedback_rule = None
+        if control.message_type() is MIDI_NOTE_TYPE:
+            feedback_rule = Live.MidiMap.NoteFeedbackRule()
+            feedback_rule.note_no = control.message_identifier()
+            feedback_rule.vel_map = feedback_map
+        elif control.message_type() is MIDI_CC_TYPE:
+            feedback_rule = Live.MidiMap.CCFeedbackRule()
+            feedback_rule.cc_no = control.message_identifier()
+            feedback_rule.cc_value_map = feedback_map
+        elif control.message_type() is MIDI_PB_TYPE:
+            feedback_rule = Live.MidiMap.PitchBendFeedbackRule()
+            feedback_rule.value_pair_map = feedback_map
+        assert feedback_rule != None
+        feedback_rule.channel = control.message_channel()
+        feedback_rule.delay_in_ms = feedback_delay
+        if control.message_type() is MIDI_NOTE_TYPE:
+            success = Live.MidiMap.map_midi_note_with_feedback_map(midi_map_handle, parameter, control.message_channel(), control.message_identifier(), feedback_rule)
+        elif control.message_type() is MIDI_CC_TYPE:
+            success = Live.MidiMap.map_midi_cc_with_feedback_map(midi_map_handle, parameter, control.message_channel(), control.message_identifier(), control.message_map_mode(), feedback_rule, not control.needs_takeover(), control.mapping_sensitivity)
+        elif control.message_type() is MIDI_PB_TYPE:
+            success = Live.MidiMap.map_midi_pitchbend_with_feedback_map(midi_map_handle, parameter, control.message_channel(), feedback_rule, not control.needs_takeover())
+        if success:
+            Live.MidiMap.send_feedback_for_parameter(midi_map_handle, parameter)
+        return success
+"""), ("""
+        if not self._in_build_midi_map:
+            raise AssertionError
+            raise control != None or AssertionError
+            if not isinstance(control, InputControlElement):
+                raise AssertionError
+                success = False
+                success = control.message_type() is MIDI_NOTE_TYPE and Live.MidiMap.forward_midi_note(self._c_instance.handle(), midi_map_handle, control.message_channel(), control.message_identifier())
+            elif control.message_type() is MIDI_CC_TYPE:
+                success = Live.MidiMap.forward_midi_cc(self._c_instance.handle(), midi_map_handle, control.message_channel(), control.message_identifier())
+            elif control.message_type() is MIDI_PB_TYPE:
+                success = Live.MidiMap.forward_midi_pitchbend(self._c_instance.handle(), midi_map_handle, control.message_channel())
+            else:
+                raise control.message_type() == MIDI_SYSEX_TYPE or AssertionError
+                success = True
+            forwarding_keys = success and control.identifier_bytes()
+            for key in forwarding_keys:
+""", """
+        assert self._in_build_midi_map
+        assert control != None
+        assert isinstance(control, InputControlElement)
+        success = False
+        if control.message_type() is MIDI_NOTE_TYPE:
+            success = Live.MidiMap.forward_midi_note(self._c_instance.handle(), midi_map_handle, control.message_channel(), control.message_identifier())
+        elif control.message_type() is MIDI_CC_TYPE:
+            success = Live.MidiMap.forward_midi_cc(self._c_instance.handle(), midi_map_handle, control.message_channel(), control.message_identifier())
+        elif control.message_type() is MIDI_PB_TYPE:
+            success = Live.MidiMap.forward_midi_pitchbend(self._c_instance.handle(), midi_map_handle, control.message_channel())
+        else:
+            assert control.message_type() == MIDI_SYSEX_TYPE
+            success = True
+        if success:
+            forwarding_keys = control.identifier_bytes()
+            for key in forwarding_keys:
+"""), ("""
+        raise list((track_offset,
+         scene_offset,
+         width,
+         height)).count(-1) != 4 and (width > 0 or AssertionError)
+        if not height > 0:
+            raise AssertionError
+""", """
+        if list((track_offset,
+         scene_offset,
+         width,
+         height)).count(-1) != 4:
+            assert width > 0
+            assert height > 0
+"""),),
+ '_Framework/DisplayDataSource.py':(("""
+                unit_db = resulting_string.find('.') != -1
+                resulting_string = len(resulting_string.strip()) > length and unit_db and resulting_string[:-2]
+""", """
+                unit_db = resulting_string.find('.') != -1
+                if len(resulting_string.strip()) > length and unit_db:
+                    resulting_string = resulting_string[:-2]
+"""), ("""
+        resulting_string = len(resulting_string) < length and resulting_string.ljust(length)
+""", """
+        if len(resulting_string) < length:
+            resulting_string = resulting_string.ljust(length)
+""")),
+ '_Framework/InputControlElement.py': (("""
+        upper_bound = self._msg_type < MIDI_SYSEX_TYPE and (16384 if self._msg_type == MIDI_PB_TYPE else 128)
+        if not in_range(value, 0, upper_bound):
+            raise AssertionError
+""", """
+        if self._msg_type < MIDI_SYSEX_TYPE:
+            upper_bound = 16384 if self._msg_type == MIDI_PB_TYPE else 128
+            assert in_range(value, 0, upper_bound)
+"""),),
+ '_Framework/Layer.py':(("""
+            names = layer._control_to_names[control_element]
+            control_element = grabbed or None
+""", """
+            names = layer._control_to_names[control_element]
+            if not grabbed:
+                control_element = None
+"""),),
+ '_Framework/LogicalDisplaySegment.py':(("""
+        separator = self._data_source != None and self._data_source.separator + self.separator
+        width = self._width - len(separator)
+        if not width >= 0:
+            raise AssertionError
+            return self._data_source.adjust_string(width) + separator
+        else:
+            return ' ' * self._width
+""", """
+        if self._data_source != None:
+            separator = self._data_source.separator + self.separator
+            width = self._width - len(separator)
+            assert width >= 0
+            return self._data_source.adjust_string(width) + separator
+        else:
+            return ' ' * self._width
+"""),),
+ '_Framework/MixerComponent.py': (("""
+        if not isinstance(new_offset, int):
+            raise AssertionError
+            raise new_offset >= 0 or AssertionError
+            new_offset != self._track_offset and self._offset_can_start_after_tracks |= new_offset > len(self.tracks_to_use()) - 1
+            self._track_offset = new_offset
+            self._reassign_tracks()
+""", """
+        assert isinstance(new_offset, int)
+        assert new_offset >= 0
+        if new_offset != self._track_offset:
+            self._offset_can_start_after_tracks |= new_offset > len(self.tracks_to_use()) - 1
+            self._track_offset = new_offset
+            self._reassign_tracks()
+"""),),
+ '_Framework/Util.py': (("""
+        if not len(keys) <= self._dimensions:
+            raise AssertionError, 'Too many dimensions'
+            return len(keys) == self._dimensions and self._extractor(*keys)
+        else:
+""", """
+        assert len(keys) <= self._dimensions, 'Too many dimensions'
+        if len(keys) == self._dimensions:
+            return self._extractor(*keys)
+        else:
+"""),),
+ '_Framework/SessionComponent.py': (("""
+            if num_tracks > 0:
+                self._show_highlight = num_scenes > 0
+                self._mixer = None
+                self._track_slots = self.register_slot_manager()
+                self._selected_scene = self.register_component(self._create_scene())
+                self._scenes = self.register_components(*[ self._create_scene() for _ in xrange(num_scenes) ])
+                if self._session_component_ends_initialisation:
+                    self._end_initialisation()
+                auto_name and self._auto_name()
+            enable_skinning and self._enable_skinning()
+""", """
+            self._show_highlight = num_tracks > 0 and num_scenes > 0
+            self._mixer = None
+            self._track_slots = self.register_slot_manager()
+            self._selected_scene = self.register_component(self._create_scene())
+            self._scenes = self.register_components(*[ self._create_scene() for _ in xrange(num_scenes) ])
+            if self._session_component_ends_initialisation:
+                self._end_initialisation()
+            if auto_name:
+                self._auto_name()
+            if enable_skinning:
+                self._enable_skinning()
+"""), ("""
+        if not track_offset >= 0:
+            raise AssertionError
+            raise scene_offset >= 0 or AssertionError
+            track_increment = 0
+            scene_increment = 0
+            self._is_linked() and SessionComponent._perform_offset_change(track_offset - self._track_offset, scene_offset - self._scene_offset)
+        else:
+""", """
+        assert track_offset >= 0
+        assert scene_offset >= 0
+        track_increment = 0
+        scene_increment = 0
+        if self._is_linked():
+            SessionComponent._perform_offset_change(track_offset - self._track_offset, scene_offset - self._scene_offset)
+        else:
+"""), ("""
+        if not track_increment != 0:
+            offsets_changed = scene_increment != 0
+            offsets_changed and self._track_offset += track_increment
+            self._scene_offset += scene_increment
+            raise self._track_offset >= 0 or AssertionError
+            if not self._scene_offset >= 0:
+                raise AssertionError
+                if self._mixer != None:
+                    self._mixer.set_track_offset(self.track_offset())
+                self._reassign_tracks()
+                self._reassign_scenes()
+                self.notify_offset()
+                self.width() > 0 and self.height() > 0 and self._do_show_highlight()
+""", """
+        offsets_changed = track_increment != 0 or scene_increment != 0
+        if offsets_changed:
+            self._track_offset += track_increment
+            self._scene_offset += scene_increment
+            assert self._track_offset >= 0
+            assert self._scene_offset >= 0
+            if self._mixer != None:
+                self._mixer.set_track_offset(self.track_offset())
+            self._reassign_tracks()
+            self._reassign_scenes()
+            self.notify_offset()
+            if self.width() > 0 and self.height() > 0:
+                self._do_show_highlight()
+"""),),
+ 'Push/TouchStripElement.py': (("""
+        if not behaviour:
+            behaviour = DEFAULT_BEHAVIOUR
+            self._behaviour = behaviour != self._behaviour and behaviour
+            self._touch_slot.listener = behaviour.handle_touch
+""", """
+        behaviour = behaviour or DEFAULT_BEHAVIOUR
+        if behaviour != self._behaviour:
+            self._behaviour = behaviour
+            self._touch_slot.listener = behaviour.handle_touch
+"""),),
+ 'Push/Setting.py': (("""
+        if not values:
+            self.values = []
+            self._preferences = preferences if preferences != None else {}
+            default_value = name in self._preferences and self._preferences[name] in values and self._preferences[name]
+        self._preferences[name] = None
+""", """
+        self.values = values or []
+        self._preferences = preferences if preferences != None else {}
+        if name in self._preferences and self._preferences[name] in values:
+            default_value = self._preferences[name]
+        self._preferences[name] = None
+"""), ("""
+        if not value in self.values:
+            raise AssertionError
+            self._preferences[self.name] = self._preferences[self.name] != value and value
+            self.on_value_changed(value)
+            self.notify_value(self.value)
+""", """
+        assert value in self.values
+        if self._preferences[self.name] != value:
+            self._preferences[self.name] = value
+            self.on_value_changed(value)
+            self.notify_value(self.value)
+""")),
+ 'Push/MessageBoxComponent.py': (("""
+            display = line_slice is not None and display.subdisplay[line_slice]
+""", """
+            if line_slice is not None:
+                display = display.subdisplay[line_slice]
+"""),)}
+
+def repair_source(relative_path, source):
+    """
+    Returns the source of the script file at the given path, relative
+    to the scripts directory, with the rewrites for it applied.
+    """
+    for mangled, repaired in SOURCE_REPAIRS.get(relative_path.replace(os.sep, '/'), ()):
+        source = source.replace(mangled, repaired, 1)
+
+    return source
@@ -0,0 +1,219 @@
+"""
+Replays recorded MIDI input into a control surface script loaded by
+Headless and measures how long it takes.  Usage::
+
+    python -m _Offline.Replay <script> [trace] [output]
+    python -m _Offline.Replay --check
+
+The trace defaults to the canned one for the script in traces/.  Every
+incoming message the script's MIDI map forwards is passed to
+receive_midi at its recorded time, and update_display is called every
+Defaults.TIMER_DELAY seconds of trace time, as Live's timer does.
+Messages the MIDI map does not forward are handled by Live, so they are
+only counted, and the MIDI map is rebuilt whenever the script requests
+it, as Live does.  The report gives the p50 and p99 latency of
+both, the number of outgoing messages and the net number of allocated
+objects per tick.  If 'output' is given, the outgoing MIDI is written
+there, one message per line prefixed with its tick, so that changes in
+what a script sends show up as diffs.
+
+With --check, every trace in traces/ is replayed into the script it
+is named after and the exit status is non-zero if any of them fails
+to load or raises while replaying.
+
+A trace is a text file with one message per line: the time in
+milliseconds followed by the MIDI bytes, all in decimal.  Empty lines
+and lines starting with '#' are ignored.
+"""
+from __future__ import absolute_import
+import gc
+import os
+import sys
+import traceback
+from timeit import default_timer
+TRACES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traces')
+
+def load_trace(path):
+    """
+    Returns the messages of the trace as a list of (time in seconds,
+    MIDI bytes) pairs, sorted by time.
+    """
+    messages = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                fields = map(int, line.split())
+                messages.append((fields[0] / 1000.0, tuple(fields[1:])))
+
+    messages.sort(key=lambda message: message[0])
+    return messages
+
+
+def default_trace(script_name):
+    return os.path.join(TRACES_DIRECTORY, script_name + '.trace')
+
+
+def percentile(samples, fraction):
+    """
+    Returns the sample below which the given fraction of the samples
+    lies, using the nearest rank.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = int(round(fraction * (len(ordered) - 1)))
+    return ordered[rank]
+
+
+class ReplayReport(object):
+    """
+    Measurements of a replay.  Latencies are in milliseconds.
+    """
+
+    def __init__(self, *a, **k):
+        super(ReplayReport, self).__init__(*a, **k)
+        self.message_latencies = []
+        self.messages_not_forwarded = 0
+        self.tick_latencies = []
+        self.messages_sent_per_tick = []
+        self.allocations_per_tick = []
+
+    @property
+    def messages_received(self):
+        return len(self.message_latencies)
+
+    @property
+    def ticks(self):
+        return len(self.tick_latencies)
+
+    @property
+    def messages_sent(self):
+        return sum(self.messages_sent_per_tick)
+
+    def as_dict(self):
+        ticks = self.ticks or 1
+        return {'messages_received': self.messages_received,
+         'messages_not_forwarded': self.messages_not_forwarded,
+         'ticks': self.ticks,
+         'message_p50_ms': percentile(self.message_latencies, 0.5),
+         'message_p99_ms': percentile(self.message_latencies, 0.99),
+         'tick_p50_ms': percentile(self.tick_latencies, 0.5),
+         'tick_p99_ms': percentile(self.tick_latencies, 0.99),
+         'messages_sent': self.messages_sent,
+         'messages_sent_per_tick': float(self.messages_sent) / ticks,
+         'allocations_per_tick': float(sum(self.allocations_per_tick)) / ticks}
+
+    def __str__(self):
+        values = self.as_dict()
+        return '\n'.join([ '%-24s %s' % (key, '%.4f' % values[key] if isinstance(values[key], float) else values[key]) for key in sorted(values) ])
+
+
+def replay(surface, c_instance, messages, timer_delay = None):
+    """
+    Feeds the forwarded messages into the surface, calling
+    update_display at every timer tick, and returns a ReplayReport together with the list
+    of (tick, MIDI bytes) pairs the surface sent.  Garbage collection
+    is disabled while replaying, so that the allocation counts are not
+    reset by collections.
+    """
+    if timer_delay is None:
+        from _Framework.Defaults import TIMER_DELAY
+        timer_delay = TIMER_DELAY
+    report = ReplayReport()
+    sent = []
+    c_instance.clear()
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        tick = 0
+        allocations = gc.get_count()[0]
+        sent_before = 0
+        for time, midi_bytes in messages:
+            while (tick + 1) * timer_delay <= time:
+                start = default_timer()
+                surface.update_display()
+                report.tick_latencies.append((default_timer() - start) * 1000.0)
+                if c_instance.rebuild_pending:
+                    c_instance.build_midi_map(surface)
+                tick += 1
+                sent.extend([ (tick, m) for m in c_instance.sent_midi[sent_before:] ])
+                report.messages_sent_per_tick.append(len(c_instance.sent_midi) - sent_before)
+                sent_before = len(c_instance.sent_midi)
+                count = gc.get_count()[0]
+                report.allocations_per_tick.append(count - allocations)
+                allocations = count
+
+            if not c_instance.midi_map.is_forwarded(midi_bytes):
+                report.messages_not_forwarded += 1
+                continue
+            start = default_timer()
+            surface.receive_midi(midi_bytes)
+            report.message_latencies.append((default_timer() - start) * 1000.0)
+            if c_instance.rebuild_pending:
+                c_instance.build_midi_map(surface)
+
+        sent.extend([ (tick, m) for m in c_instance.sent_midi[sent_before:] ])
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return (report, sent)
+
+
+def write_sent_midi(path, sent):
+    with open(path, 'w') as f:
+        for tick, midi_bytes in sent:
+            f.write('%d %s\n' % (tick, ' '.join(map(str, midi_bytes))))
+
+
+def shipped_traces():
+    """
+    Returns the (script name, trace path) pairs of the canned traces.
+    """
+    return [ (os.path.splitext(name)[0], os.path.join(TRACES_DIRECTORY, name)) for name in sorted(os.listdir(TRACES_DIRECTORY)) if name.endswith('.trace') ]
+
+
+def check_traces():
+    """
+    Replays every canned trace into its script and returns the names
+    of the scripts that failed to load or raised while replaying.
+    """
+    from .Headless import load_control_surface
+    failed = []
+    for script_name, trace in shipped_traces():
+        try:
+            surface, c_instance = load_control_surface(script_name)
+            report, _ = replay(surface, c_instance, load_trace(trace))
+            surface.disconnect()
+        except Exception:
+            traceback.print_exc()
+            failed.append(script_name)
+            print '%-24s FAILED' % script_name
+        else:
+            print '%-24s ok (%d messages, %d ticks)' % (script_name, report.messages_received + report.messages_not_forwarded, report.ticks)
+
+    return failed
+
+
+def main(arguments):
+    if not arguments:
+        print __doc__
+        return 2
+    if arguments[0] == '--check':
+        return 1 if check_traces() else 0
+    from .Headless import load_control_surface
+    script_name = arguments[0]
+    trace = arguments[1] if len(arguments) > 1 else default_trace(script_name)
+    surface, c_instance = load_control_surface(script_name)
+    report, sent = replay(surface, c_instance, load_trace(trace))
+    print report
+    if len(arguments) > 2:
+        write_sent_midi(arguments[2], sent)
+    surface.disconnect()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))